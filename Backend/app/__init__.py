@@ -2,4 +2,11 @@
 
 __all__ = ["create_app"]
 
-from app.main import create_app
+
+def __getattr__(name: str):
+    # Lazy so importing a submodule (app.config, a process-pool worker) does not pull in FastAPI and the SDK.
+    if name == "create_app":
+        from app.main import create_app
+
+        return create_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,6 @@
 """Application configuration and env loading."""
 
+from functools import lru_cache
 from pathlib import Path
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -44,13 +45,119 @@ class Settings(BaseSettings):
     openai_api_key: str = ""
     api_key: str = ""
 
+    # Shared upstream HTTP pool (one per process, built in the app lifespan)
+    openai_http2: bool = True
+    openai_max_connections: int = 100
+    openai_max_keepalive_connections: int = 20
+    openai_keepalive_expiry: float = 30.0
+    openai_connect_timeout: float = 10.0
+    openai_timeout: float = 600.0
+    openai_max_retries: int = 2  # SDK-level retries; forced to 0 when the governor or resilience layer is on
+
+    # Opt-in result cache for POST /api/images/generate
+    image_cache_enabled: bool = False
+    image_cache_memory_mb: int = 64
+    image_cache_dir: str = ".cache/images"  # empty string disables the disk tier
+    image_cache_ttl_seconds: int = 86400
+
+    # Share one upstream call between identical concurrent generate requests
+    coalesce_requests: bool = True
+
+    # Client-side rate governor (token buckets per model + AIMD concurrency)
+    rate_limit_enabled: bool = True
+    upstream_rate_limits: dict[str, dict[str, float]] = {}  # e.g. {"gpt-image-1.5": {"rpm": 250, "ipm": 250}}
+    upstream_initial_concurrency: int = 8
+    upstream_max_concurrency: int = 64
+    upstream_max_queue_seconds: float = 120.0
+
+    # Fair share of upstream capacity: the tenant is looked up from the API key (Authorization: Bearer or
+    # X-API-Key) in tenant_api_keys, and X-Priority picks interactive or bulk (batch and image jobs default to
+    # bulk). Callers without a known key are the default tenant at bulk priority, unless trust_client_headers
+    # is set (a trusted gateway sets the headers): then tenant_header names the tenant and X-Priority applies
+    tenant_api_keys: dict[str, str] = {}  # e.g. {"sk-acme-123": "acme"}
+    trust_client_headers: bool = False
+    tenant_header: str = "X-Tenant-ID"
+    tenant_weights: dict[str, float] = {}  # e.g. {"acme": 3, "studio": 1}; unlisted tenants weigh 1
+
+    # Retries, deadlines and circuit breakers around upstream calls
+    resilience_enabled: bool = True
+    upstream_max_attempts: int = 3
+    upstream_retry_base_delay: float = 0.5
+    upstream_retry_max_delay: float = 8.0
+    upstream_deadlines: dict[str, float] = {}  # e.g. {"images.generate": 25}; see ENDPOINT_DEADLINES
+    breaker_failure_threshold: int = 5
+    breaker_reset_seconds: float = 30.0
+
+    # POST /api/images/batch fan-out
+    image_batch_concurrency: int = 4
+    image_batch_max_concurrency: int = 16
+    # Open SSE partial-image streams per process; further requests get 429
+    image_stream_max_concurrency: int = 8
+
+    # Completed videos kept on local disk for repeat downloads
+    video_store_dir: str = ".cache/videos"  # empty string disables the store
+    video_store_max_mb: int = 1024
+    # When set (e.g. /_videos/), stored videos are handed to nginx via X-Accel-Redirect
+    video_store_accel_prefix: str = ""
+
+    # Background status polling of video jobs (adaptive between min and max)
+    video_poll_min_interval: float = 2.0
+    video_poll_max_interval: float = 30.0
+
+    # Durable image jobs (POST /api/images/jobs); an empty db path disables the queue
+    image_jobs_db: str = ".cache/image_jobs.sqlite3"
+    image_jobs_dir: str = ".cache/image_jobs"
+    image_job_workers: int = 4
+    image_job_lease_seconds: float = 120.0
+    image_job_max_attempts: int = 3
+
+    # Edit sessions (/api/images/sessions): each version of the working image kept locally under a short id,
+    # so edit steps refer to it instead of uploading it again; an empty db path disables them
+    edit_sessions_db: str = ".cache/edit_sessions.sqlite3"
+    edit_sessions_dir: str = ".cache/edit_sessions"
+    edit_session_ttl_seconds: float = 86400.0
+    edit_session_max_versions: int = 100
+
+    # Resized/re-encoded image variants (?width=&height=&format=&quality=); 0 workers disables
+    derivative_workers: int = 2
+    derivative_cache_memory_mb: int = 32
+    derivative_cache_dir: str = ".cache/derivatives"  # empty string keeps variants in memory only
+
+    # Edit inputs and video references: EXIF-rotate, downscale to the model's size and re-encode before upload,
+    # cached by content hash (runs on the derivative workers when there are any)
+    reference_normalize: bool = True
+    reference_cache_memory_mb: int = 32
+    reference_cache_dir: str = ".cache/references"  # empty string keeps normalised references in memory only
+
+    # After startup, spawn derivative workers and open the upstream connection in the background
+    warm_up: bool = True
+
+    # URL-form image results (instead of b64_json): shared pool, per-host cap, whole-download deadline and size cap
+    image_fetch_timeout: float = 30.0
+    image_fetch_max_mb: int = 50
+    image_fetch_max_connections: int = 32
+    image_fetch_per_host: int = 8
+
+    # State shared by worker processes (video job status and poller leases, per-worker stats):
+    # memory:// keeps it in this process; sqlite:///path serves every worker on the host (on /dev/shm for RAM);
+    # redis://host:6379/0 (rediss:// for TLS) serves several hosts and also shares generated-image cache entries
+    shared_state_url: str = "memory://"
+    # Number of worker processes serving the app (uvicorn --workers and gunicorn read WEB_CONCURRENCY too);
+    # each worker keeps 1/web_concurrency of the upstream quotas
+    web_concurrency: int = 1
+    stats_publish_interval: float = 5.0
+
+    # Multipart uploads (image edit, video reference): whole-body cap, 0 disables
+    max_upload_mb: int = 50
+
     @property
     def effective_openai_key(self) -> str:
         """OpenAI key from OPENAI_API_KEY or API_KEY."""
         return self.openai_api_key or self.api_key or ""
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Load env files then return settings. Call once at startup."""
+    """Load env files and parse settings once per process; get_settings.cache_clear() forces a re-read."""
     _load_dotenv_into_environ()
     return Settings()
@@ -1,8 +1,31 @@
 """FastAPI dependency injection."""
 
-from openai import OpenAI
+import asyncio
+from pathlib import Path
+from typing import Literal
+
+import httpx
+from fastapi import Header, HTTPException, Request
+from openai import AsyncOpenAI, OpenAI
 
 from app.config import Settings, get_settings
+from app.services.derivatives import DerivativeService
+from app.services.edit_sessions import EditSessionStore
+from app.services.fair_share import BULK, DEFAULT_TENANT, INTERACTIVE, Caller
+from app.services.image_cache import ImageCache
+from app.services.image_fetch import ImageFetcher
+from app.services.image_jobs import ImageJobQueue
+from app.services.image_service import IMAGE_MODEL_LIMITS, AsyncImageService
+from app.services.rate_limit import UpstreamGovernor
+from app.services.references import ReferencePreparer
+from app.services.resilience import Resilience
+from app.services.shared_state import SharedState, open_shared_state
+from app.services.singleflight import SingleFlight
+from app.services.video_jobs import VideoJobTracker
+from app.services.video_service import VIDEO_MODEL_LIMITS
+from app.services.video_store import VideoStore
+
+_MISSING_KEY = "Set OPENAI_API_KEY or API_KEY in the environment or in a .env file at the repo root."
 
 
 def get_openai_client(settings: Settings | None = None) -> OpenAI:
@@ -11,7 +34,303 @@ def get_openai_client(settings: Settings | None = None) -> OpenAI:
         settings = get_settings()
     key = settings.effective_openai_key
     if not key:
-        raise ValueError(
-            "Set OPENAI_API_KEY or API_KEY in the environment or in a .env file at the repo root."
-        )
+        raise ValueError(_MISSING_KEY)
     return OpenAI(api_key=key)
+
+
+def build_async_openai_client(settings: Settings) -> AsyncOpenAI | None:
+    """
+    Build the process-wide AsyncOpenAI client on a pooled (HTTP/2 when enabled) httpx client.
+    Returns None when no API key is configured so the app can still start and serve /health.
+    """
+    key = settings.effective_openai_key
+    if not key:
+        return None
+    http_client = httpx.AsyncClient(
+        http2=settings.openai_http2,
+        limits=httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_keepalive_connections,
+            keepalive_expiry=settings.openai_keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(settings.openai_timeout, connect=settings.openai_connect_timeout),
+    )
+    own_retries = settings.rate_limit_enabled or settings.resilience_enabled
+    max_retries = 0 if own_retries else settings.openai_max_retries
+    return AsyncOpenAI(api_key=key, http_client=http_client, max_retries=max_retries)
+
+
+def get_app_settings(request: Request) -> Settings:
+    """Return the settings loaded once in the app lifespan."""
+    return request.app.state.settings
+
+
+def get_async_openai_client(request: Request) -> AsyncOpenAI:
+    """Return the shared AsyncOpenAI client created in the app lifespan."""
+    client = request.app.state.openai_client
+    if client is None:
+        raise ValueError(_MISSING_KEY)
+    return client
+
+
+def build_shared_state(settings: Settings) -> SharedState:
+    """Open the cross-process state named by SHARED_STATE_URL (memory:// by default)."""
+    return open_shared_state(settings.shared_state_url)
+
+
+def get_shared_state(request: Request) -> SharedState:
+    return request.app.state.shared_state
+
+
+def build_image_cache(settings: Settings, shared: SharedState | None = None) -> ImageCache | None:
+    """
+    Build the generate-result cache, or None when IMAGE_CACHE_ENABLED is off. Workers on one host already
+    share the disk tier; a cluster-wide shared state (Redis) is added as a third tier for other hosts.
+    """
+    if not settings.image_cache_enabled:
+        return None
+    return ImageCache(
+        max_memory_bytes=settings.image_cache_memory_mb * 1024 * 1024,
+        directory=Path(settings.image_cache_dir) if settings.image_cache_dir else None,
+        ttl_seconds=settings.image_cache_ttl_seconds,
+        shared=shared if shared is not None and shared.scope == "cluster" else None,
+    )
+
+
+def get_image_cache(request: Request) -> ImageCache | None:
+    """Return the shared image cache, or None when caching is disabled."""
+    return request.app.state.image_cache
+
+
+def build_image_fetcher(settings: Settings) -> ImageFetcher:
+    """Build the shared downloader for URL-form image results."""
+    return ImageFetcher(
+        timeout=settings.image_fetch_timeout,
+        max_bytes=settings.image_fetch_max_mb * 1024 * 1024,
+        max_connections=settings.image_fetch_max_connections,
+        per_host=settings.image_fetch_per_host,
+    )
+
+
+def get_image_fetcher(request: Request) -> ImageFetcher | None:
+    return request.app.state.image_fetcher
+
+
+def build_image_jobs(
+    settings: Settings,
+    client: AsyncOpenAI | None,
+    governor: UpstreamGovernor | None,
+    resilience: Resilience | None,
+    fetcher: ImageFetcher | None = None,
+) -> ImageJobQueue | None:
+    """Build the durable image job queue, or None without an API key or when IMAGE_JOBS_DB is empty."""
+    if client is None or not settings.image_jobs_db:
+        return None
+    return ImageJobQueue(
+        # Jobs are not bound by the request timeout: each upstream call may take as long as a lease.
+        AsyncImageService(
+            client,
+            governor=governor,
+            resilience=resilience,
+            fetcher=fetcher,
+            deadline=settings.image_job_lease_seconds,
+        ),
+        Path(settings.image_jobs_db),
+        Path(settings.image_jobs_dir),
+        workers=settings.image_job_workers,
+        lease_seconds=settings.image_job_lease_seconds,
+        max_attempts=settings.image_job_max_attempts,
+    )
+
+
+def get_image_jobs(request: Request) -> ImageJobQueue:
+    """Return the image job queue; raises when it is not available (503 when IMAGE_JOBS_DB is empty)."""
+    queue = request.app.state.image_jobs
+    if queue is None:
+        if request.app.state.openai_client is None:
+            raise ValueError(_MISSING_KEY)
+        raise HTTPException(status_code=503, detail="Image jobs are disabled (IMAGE_JOBS_DB is empty)")
+    return queue
+
+
+def build_edit_sessions(settings: Settings) -> EditSessionStore | None:
+    """Build the edit session store, or None when EDIT_SESSIONS_DB is empty."""
+    if not settings.edit_sessions_db:
+        return None
+    return EditSessionStore(
+        Path(settings.edit_sessions_db),
+        Path(settings.edit_sessions_dir),
+        ttl_seconds=settings.edit_session_ttl_seconds,
+        max_versions=settings.edit_session_max_versions,
+    )
+
+
+def get_edit_sessions(request: Request) -> EditSessionStore:
+    """Return the edit session store; 503 when EDIT_SESSIONS_DB is empty."""
+    store = request.app.state.edit_sessions
+    if store is None:
+        raise HTTPException(status_code=503, detail="Edit sessions are disabled (EDIT_SESSIONS_DB is empty)")
+    return store
+
+
+def build_image_stream_slots(settings: Settings) -> asyncio.Semaphore:
+    """Bound the number of partial-image streams held open at once."""
+    return asyncio.Semaphore(settings.image_stream_max_concurrency)
+
+
+def get_image_stream_slots(request: Request) -> asyncio.Semaphore:
+    return request.app.state.image_stream_slots
+
+
+def build_derivatives(settings: Settings) -> DerivativeService | None:
+    """Build the image variant renderer, or None when DERIVATIVE_WORKERS is 0."""
+    if settings.derivative_workers <= 0:
+        return None
+    cache = ImageCache(
+        max_memory_bytes=settings.derivative_cache_memory_mb * 1024 * 1024,
+        directory=Path(settings.derivative_cache_dir) if settings.derivative_cache_dir else None,
+        ttl_seconds=settings.image_cache_ttl_seconds,
+        suffix=".bin",
+    )
+    return DerivativeService(workers=settings.derivative_workers, cache=cache)
+
+
+def get_derivatives(request: Request) -> DerivativeService | None:
+    return request.app.state.derivatives
+
+
+def build_references(settings: Settings, derivatives: DerivativeService | None) -> ReferencePreparer | None:
+    """Build the reference image normaliser (on the derivative pool if any), or None when REFERENCE_NORMALIZE is off."""
+    if not settings.reference_normalize:
+        return None
+    cache = ImageCache(
+        max_memory_bytes=settings.reference_cache_memory_mb * 1024 * 1024,
+        directory=Path(settings.reference_cache_dir) if settings.reference_cache_dir else None,
+        ttl_seconds=settings.image_cache_ttl_seconds,
+        suffix=".bin",
+    )
+    return ReferencePreparer(cache=cache, pool=derivatives, flight=build_single_flight(settings, "references"))
+
+
+def get_references(request: Request) -> ReferencePreparer | None:
+    return request.app.state.references
+
+
+def build_single_flight(settings: Settings, name: str) -> SingleFlight | None:
+    """Build a request coalescer, or None when COALESCE_REQUESTS is off."""
+    return SingleFlight(name) if settings.coalesce_requests else None
+
+
+def get_image_flight(request: Request) -> SingleFlight | None:
+    return request.app.state.image_flight
+
+
+def get_video_flight(request: Request) -> SingleFlight | None:
+    return request.app.state.video_flight
+
+
+def build_video_store(settings: Settings) -> VideoStore | None:
+    """Build the completed-video store, or None when VIDEO_STORE_DIR is empty."""
+    if not settings.video_store_dir:
+        return None
+    return VideoStore(
+        Path(settings.video_store_dir),
+        settings.video_store_max_mb * 1024 * 1024,
+        accel_prefix=settings.video_store_accel_prefix,
+    )
+
+
+def get_video_store(request: Request) -> VideoStore | None:
+    return request.app.state.video_store
+
+
+def build_video_tracker(
+    settings: Settings, client: AsyncOpenAI | None, shared: SharedState | None = None
+) -> VideoJobTracker | None:
+    """Build the background video job tracker on the shared client; job states go through shared across workers."""
+    if client is None:
+        return None
+    return VideoJobTracker(
+        client,
+        min_interval=settings.video_poll_min_interval,
+        max_interval=settings.video_poll_max_interval,
+        shared=shared if shared is not None and shared.scope != "process" else None,
+    )
+
+
+def get_video_tracker(request: Request) -> VideoJobTracker:
+    tracker = request.app.state.video_tracker
+    if tracker is None:
+        raise ValueError(_MISSING_KEY)
+    return tracker
+
+
+def build_governor(settings: Settings) -> UpstreamGovernor | None:
+    """Build the upstream rate governor, or None when RATE_LIMIT_ENABLED is off; quotas are split by WEB_CONCURRENCY."""
+    if not settings.rate_limit_enabled:
+        return None
+    return UpstreamGovernor(
+        {**IMAGE_MODEL_LIMITS, **VIDEO_MODEL_LIMITS, **settings.upstream_rate_limits},
+        default_limits={"rpm": 60},
+        concurrency=(settings.upstream_initial_concurrency, 1, settings.upstream_max_concurrency),
+        max_wait=settings.upstream_max_queue_seconds,
+        share=1.0 / max(1, settings.web_concurrency),
+        tenant_weights={**{t: 1.0 for t in settings.tenant_api_keys.values()}, **settings.tenant_weights},
+    )
+
+
+def get_governor(request: Request) -> UpstreamGovernor | None:
+    return request.app.state.governor
+
+
+def _caller(request: Request, priority: str | None, default_priority: str) -> Caller:
+    """
+    Tenant and priority of a request. X-Priority and the tenant header are client-chosen, so they are only
+    honoured for callers authenticated via tenant_api_keys, or for everyone with trust_client_headers (a
+    gateway in front sets them); any other caller is the default tenant at bulk priority.
+    """
+    settings: Settings = request.app.state.settings
+    auth = request.headers.get("authorization", "")
+    key = auth[7:].strip() if auth[:7].lower() == "bearer " else request.headers.get("x-api-key")
+    tenant = settings.tenant_api_keys.get(key) if key else None
+    if tenant is not None:
+        return Caller(tenant, priority or default_priority)
+    if not settings.trust_client_headers:
+        return Caller(DEFAULT_TENANT, BULK)
+    if settings.tenant_header:
+        tenant = request.headers.get(settings.tenant_header, "").strip()[:64] or None
+    return Caller(tenant or DEFAULT_TENANT, priority or default_priority)
+
+
+def get_caller(
+    request: Request,
+    x_priority: Literal["interactive", "bulk"] | None = Header(None, description="Upstream queue priority class"),
+) -> Caller:
+    """Tenant and priority of the request's upstream calls (interactive unless X-Priority says otherwise)."""
+    return _caller(request, x_priority, INTERACTIVE)
+
+
+def get_bulk_caller(
+    request: Request,
+    x_priority: Literal["interactive", "bulk"] | None = Header(None, description="Upstream queue priority class"),
+) -> Caller:
+    """Like get_caller, for routes whose work is bulk unless X-Priority says otherwise (batch, queued jobs)."""
+    return _caller(request, x_priority, BULK)
+
+
+def build_resilience(settings: Settings) -> Resilience | None:
+    """Build the retry/deadline/breaker layer, or None when RESILIENCE_ENABLED is off."""
+    if not settings.resilience_enabled:
+        return None
+    return Resilience(
+        max_attempts=settings.upstream_max_attempts,
+        base_delay=settings.upstream_retry_base_delay,
+        max_delay=settings.upstream_retry_max_delay,
+        deadlines=settings.upstream_deadlines,
+        failure_threshold=settings.breaker_failure_threshold,
+        reset_seconds=settings.breaker_reset_seconds,
+    )
+
+
+def get_resilience(request: Request) -> Resilience | None:
+    return request.app.state.resilience
@@ -1,19 +1,130 @@
 """FastAPI application factory and lifecycle."""
 
+import asyncio
+import json
+import time
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 
 from app.config import get_settings
+from app.dependencies import (
+    build_async_openai_client,
+    build_governor,
+    build_derivatives,
+    build_edit_sessions,
+    build_image_cache,
+    build_image_fetcher,
+    build_image_jobs,
+    build_image_stream_slots,
+    build_references,
+    build_resilience,
+    build_shared_state,
+    build_single_flight,
+    build_video_store,
+    build_video_tracker,
+)
+from app.metrics import CONTENT_TYPE_LATEST, STATS_COLLECTOR, MetricsMiddleware, latest_metrics
+from app.services.shared_state import SharedStateError, worker_id
+from app.uploads import UploadLimitMiddleware
+from app.warmup import WarmUp
 from app.routers import api_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Load env on startup; no persistent resources to tear down."""
-    get_settings()
-    yield
+    """Load settings once and build the shared per-process components; tear them down on shutdown."""
+    settings = get_settings()
+    app.state.settings = settings
+    app.state.shared_state = build_shared_state(settings)
+    app.state.openai_client = build_async_openai_client(settings)
+    app.state.governor = build_governor(settings)
+    app.state.resilience = build_resilience(settings)
+    app.state.image_cache = build_image_cache(settings, app.state.shared_state)
+    app.state.image_fetcher = build_image_fetcher(settings)
+    app.state.derivatives = build_derivatives(settings)
+    app.state.references = build_references(settings, app.state.derivatives)
+    app.state.image_flight = build_single_flight(settings, "images.generate")
+    app.state.image_stream_slots = build_image_stream_slots(settings)
+    app.state.video_flight = build_single_flight(settings, "videos.create")
+    app.state.video_store = build_video_store(settings)
+    app.state.video_tracker = build_video_tracker(settings, app.state.openai_client, app.state.shared_state)
+    app.state.image_jobs = build_image_jobs(
+        settings, app.state.openai_client, app.state.governor, app.state.resilience, app.state.image_fetcher
+    )
+    if app.state.image_jobs is not None:
+        app.state.image_jobs.start()
+    app.state.edit_sessions = build_edit_sessions(settings)
+    app.state.warmup = WarmUp() if settings.warm_up else None
+    warmup_task = asyncio.create_task(app.state.warmup.run(app.state)) if app.state.warmup is not None else None
+    stats_task = None
+    if app.state.shared_state.scope != "process":
+        stats_task = asyncio.create_task(_publish_stats(app, settings.stats_publish_interval))
+    try:
+        yield
+    finally:
+        if warmup_task is not None:
+            warmup_task.cancel()
+        if stats_task is not None:
+            stats_task.cancel()
+        if app.state.image_jobs is not None:
+            await app.state.image_jobs.close()
+        if app.state.edit_sessions is not None:
+            app.state.edit_sessions.close()
+        if app.state.video_tracker is not None:
+            await app.state.video_tracker.close()
+        if app.state.derivatives is not None:
+            app.state.derivatives.close()
+        await app.state.image_fetcher.aclose()
+        if app.state.openai_client is not None:
+            await app.state.openai_client.close()
+        if stats_task is not None:
+            try:
+                await app.state.shared_state.delete(_STATS_PREFIX + worker_id())
+            except SharedStateError:
+                pass
+        await app.state.shared_state.close()
+
+
+def _component_stats(app: FastAPI) -> dict:
+    state = app.state
+    components = {
+        "warmup": getattr(state, "warmup", None),
+        "shared_state": getattr(state, "shared_state", None),
+        "governor": getattr(state, "governor", None),
+        "resilience": getattr(state, "resilience", None),
+        "image_cache": getattr(state, "image_cache", None),
+        "image_fetcher": getattr(state, "image_fetcher", None),
+        "derivatives": getattr(state, "derivatives", None),
+        "references": getattr(state, "references", None),
+        "image_flight": getattr(state, "image_flight", None),
+        "image_jobs": getattr(state, "image_jobs", None),
+        "edit_sessions": getattr(state, "edit_sessions", None),
+        "video_flight": getattr(state, "video_flight", None),
+        "video_store": getattr(state, "video_store", None),
+        "video_tracker": getattr(state, "video_tracker", None),
+    }
+    return {name: c.stats() for name, c in components.items() if c is not None}
+
+
+_STATS_PREFIX = "stats:worker:"
+
+
+def _worker_snapshot(app: FastAPI) -> dict:
+    return {"updated_at": time.time(), "stats": _component_stats(app)}
+
+
+async def _publish_stats(app: FastAPI, interval: float) -> None:
+    """Keep this worker's /stats in the shared state (expiring if the worker dies) for /stats/workers."""
+    key = _STATS_PREFIX + worker_id()
+    while True:
+        try:
+            await app.state.shared_state.set(key, json.dumps(_worker_snapshot(app)).encode(), ttl=interval * 3)
+        except SharedStateError:
+            pass
+        await asyncio.sleep(interval)
 
 
 def create_app() -> FastAPI:
@@ -33,6 +144,8 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.add_middleware(UploadLimitMiddleware)
+    app.add_middleware(MetricsMiddleware)
     app.include_router(api_router)
 
     @app.get("/", tags=["health"])
@@ -43,6 +156,31 @@ def create_app() -> FastAPI:
     def health() -> dict:
         return {"status": "ok"}
 
+    @app.get("/stats", tags=["health"])
+    def stats() -> dict:
+        """Runtime counters of in-process components (caches, coalescers, ...)."""
+        return _component_stats(app)
+
+    @app.get("/stats/workers", tags=["health"])
+    async def worker_stats() -> dict:
+        """
+        /stats of every live worker process sharing SHARED_STATE_URL, keyed by host:pid and refreshed every
+        STATS_PUBLISH_INTERVAL seconds (the answering worker's entry is current). One entry with memory://.
+        """
+        workers = {worker_id(): _worker_snapshot(app)}
+        shared = app.state.shared_state
+        if shared.scope != "process":
+            entries = await shared.scan(_STATS_PREFIX)
+            for key, value in entries.items():
+                workers.setdefault(key.removeprefix(_STATS_PREFIX), json.loads(value))
+        return dict(sorted(workers.items()))
+
+    @app.get("/metrics", tags=["health"], response_class=Response, include_in_schema=False)
+    def metrics() -> Response:
+        """Prometheus exposition of latency histograms, in-flight gauges and component counters."""
+        return Response(content=latest_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+    STATS_COLLECTOR.source = lambda: _component_stats(app)
     return app
 
 
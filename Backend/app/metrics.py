@@ -0,0 +1,173 @@
+"""Prometheus metrics: HTTP and upstream latency histograms, in-flight gauges, payload sizes, errors."""
+
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest, multiprocess
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import REGISTRY, Collector, CollectorRegistry
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+__all__ = [
+    "CONTENT_TYPE_LATEST",
+    "STATS_COLLECTOR",
+    "MetricsMiddleware",
+    "latest_metrics",
+    "observe_queue_wait",
+    "time_stage",
+    "time_upstream",
+]
+
+# Image calls run 5-60 s, video creates ~1 s, local stages a few ms: one bucket set covers all three.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 45, 60, 120)
+SIZE_BUCKETS = (1 << 10, 16 << 10, 128 << 10, 512 << 10, 1 << 20, 4 << 20, 16 << 20, 64 << 20)
+
+HTTP_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time to first response byte per route", ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+# Gauges are summed over live workers when several processes share PROMETHEUS_MULTIPROC_DIR.
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being handled", multiprocess_mode="livesum")
+HTTP_REQUEST_BYTES = Histogram(
+    "http_request_size_bytes", "Declared request body size per route", ["route"], buckets=SIZE_BUCKETS
+)
+HTTP_RESPONSE_BYTES = Histogram(
+    "http_response_size_bytes", "Declared response body size per route", ["route"], buckets=SIZE_BUCKETS
+)
+UPSTREAM_SECONDS = Histogram(
+    "upstream_request_duration_seconds", "OpenAI call latency per attempt", ["endpoint", "model"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_IN_FLIGHT = Gauge(
+    "upstream_requests_in_flight", "OpenAI calls awaiting a response", ["endpoint"], multiprocess_mode="livesum"
+)
+UPSTREAM_ERRORS = Counter(
+    "upstream_errors_total", "Failed OpenAI call attempts by upstream status (or error type)", ["endpoint", "status"]
+)
+UPSTREAM_QUEUE_SECONDS = Histogram(
+    "upstream_queue_seconds", "Time calls waited for upstream capacity, by priority class and tenant",
+    ["priority", "tenant"], buckets=LATENCY_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "local_stage_duration_seconds", "Backend-side work on the request path (decode, upload read, ...)", ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+@contextmanager
+def time_upstream(endpoint: str, model: str | None) -> Iterator[None]:
+    """Time one upstream attempt; failures are counted by upstream status code."""
+    in_flight = UPSTREAM_IN_FLIGHT.labels(endpoint)
+    in_flight.inc()
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        status = getattr(e, "status_code", None)
+        UPSTREAM_ERRORS.labels(endpoint, str(status) if status is not None else type(e).__name__).inc()
+        raise
+    finally:
+        in_flight.dec()
+        UPSTREAM_SECONDS.labels(endpoint, model or "-").observe(time.perf_counter() - start)
+
+
+def observe_queue_wait(priority: str, tenant: str, seconds: float) -> None:
+    UPSTREAM_QUEUE_SECONDS.labels(priority, tenant).observe(seconds)
+
+
+@contextmanager
+def time_stage(stage: str) -> Iterator[None]:
+    """Time a local processing stage so upstream time and Backend overhead can be told apart."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no per-request task or body wrapping) recording latency to the
+    response start, in-flight requests and declared payload sizes, labelled by route template.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+                route = _route(scope)
+                HTTP_SECONDS.labels(scope["method"], route, status).observe(time.perf_counter() - start)
+                for name, value in message.get("headers", ()):
+                    if name == b"content-length":
+                        HTTP_RESPONSE_BYTES.labels(route).observe(int(value))
+                        break
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    HTTP_REQUEST_BYTES.labels(_route(scope)).observe(int(value))
+                    break
+
+
+def _route(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class StatsCollector(Collector):
+    """Exports the numeric counters from /stats (caches, governor, breakers, ...) as gauges."""
+
+    def __init__(self) -> None:
+        self.source = None
+
+    def collect(self):
+        family = GaugeMetricFamily(
+            "backend_component_stat", "Counters of in-process components (see /stats)", labels=["component", "key", "stat"]
+        )
+        if self.source is not None:
+            for component, stats in self.source().items():
+                for key, stat, value in _flatten(stats):
+                    family.add_metric([component, key, stat], value)
+        yield family
+
+
+def _flatten(stats: dict, key: str = "") -> Iterator[tuple[str, str, float]]:
+    for name, value in stats.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{key}.{name}" if key else name)
+        elif isinstance(value, bool):
+            continue
+        elif isinstance(value, (int, float)):
+            yield key, name, float(value)
+
+
+STATS_COLLECTOR = StatsCollector()
+REGISTRY.register(STATS_COLLECTOR)
+
+
+def latest_metrics() -> bytes:
+    """
+    Exposition for /metrics. Under PROMETHEUS_MULTIPROC_DIR (multi-worker mode) histograms, counters and
+    gauges are merged from every worker's files; the component stats are those of the answering worker.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return generate_latest()
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(STATS_COLLECTOR)
+    return generate_latest(registry)
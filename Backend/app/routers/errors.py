@@ -0,0 +1,34 @@
+"""Map upstream and service exceptions to HTTP errors."""
+
+import math
+
+from fastapi import HTTPException
+from openai import APIConnectionError, APIStatusError, RateLimitError
+
+from app.services.image_fetch import ImageFetchError
+from app.services.rate_limit import UpstreamQueueTimeout, parse_reset
+from app.services.resilience import CircuitOpenError, DeadlineExceeded
+
+
+def _retry_after(seconds: float | None) -> dict[str, str] | None:
+    return {"Retry-After": str(math.ceil(seconds))} if seconds else None
+
+
+def to_http_exception(e: Exception, default_status: int = 400) -> HTTPException:
+    """HTTPException for an error raised by a service call; unknown errors get default_status."""
+    if isinstance(e, UpstreamQueueTimeout):
+        return HTTPException(status_code=429, detail=str(e), headers=_retry_after(e.retry_after))
+    if isinstance(e, RateLimitError):
+        retry_after = parse_reset(e.response.headers.get("retry-after"))
+        return HTTPException(status_code=429, detail=str(e), headers=_retry_after(retry_after))
+    if isinstance(e, CircuitOpenError):
+        return HTTPException(status_code=503, detail=str(e), headers=_retry_after(e.retry_after))
+    if isinstance(e, DeadlineExceeded):
+        return HTTPException(status_code=504, detail=str(e))
+    if isinstance(e, ImageFetchError):
+        return HTTPException(status_code=504 if e.timed_out else 502, detail=str(e))
+    if isinstance(e, APIConnectionError):
+        return HTTPException(status_code=502, detail=f"Upstream connection failed: {e}")
+    if isinstance(e, APIStatusError) and e.status_code >= 500:
+        return HTTPException(status_code=502, detail=f"Upstream error: {e}")
+    return HTTPException(status_code=default_status, detail=str(e))
@@ -1,78 +1,664 @@
 """Image generation and editing endpoints."""
 
-import io
+import asyncio
+import base64
+import binascii
+import contextlib
+import json
+import sys
+import time
+from collections.abc import AsyncIterator
 
-from fastapi import APIRouter, Depends, Form, HTTPException, UploadFile
-from fastapi.responses import Response
-from openai import OpenAI
+from typing import Literal
 
-from app.dependencies import get_openai_client
-from app.schemas.images import GenerateImageRequest
-from app.services.image_service import ImageService
+from fastapi import APIRouter, Depends, Form, Header, HTTPException, Query, Request, UploadFile
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from openai import APIError, AsyncOpenAI
+from pydantic import ValidationError
+from starlette.datastructures import UploadFile as StarletteUploadFile
+
+from app.config import Settings
+from app.dependencies import (
+    get_app_settings,
+    get_async_openai_client,
+    get_derivatives,
+    get_edit_sessions,
+    get_image_jobs,
+    get_image_stream_slots,
+    get_bulk_caller,
+    get_caller,
+    get_governor,
+    get_references,
+    get_resilience,
+    get_image_cache,
+    get_image_fetcher,
+    get_image_flight,
+)
+from app.metrics import time_stage
+from app.routers.errors import to_http_exception
+from app.schemas.images import (
+    BatchImageRequest,
+    BatchImageResult,
+    CreateEditSessionRequest,
+    EditSessionResponse,
+    EditSessionStepResponse,
+    EditSessionVersion,
+    GenerateImageRequest,
+    ImageBase64Response,
+    ImageJobResponse,
+    ImageJobStatusResponse,
+    RevertEditSessionRequest,
+)
+from app.services.derivatives import DerivativeService, DerivativeSpec, supported_formats
+from app.services.edit_sessions import EditSession, EditSessionNotFound, EditSessionStore, EditVersion
+from app.services.image_cache import ImageCache, cache_key
+from app.services.image_fetch import ImageFetcher
+from app.services.image_jobs import ImageJobQueue
+from app.services.fair_share import Caller
+from app.services.image_service import AsyncImageService
+from app.services.rate_limit import UpstreamGovernor
+from app.services.references import ReferencePreparer
+from app.services.resilience import Resilience, UpstreamError
+from app.services.singleflight import SingleFlight
+from app.uploads import image_upload
 
 router = APIRouter()
 
+SSE_HEARTBEAT_SECONDS = 15
+
+
+def _image_service(
+    client: AsyncOpenAI = Depends(get_async_openai_client),
+    governor: UpstreamGovernor | None = Depends(get_governor),
+    resilience: Resilience | None = Depends(get_resilience),
+    references: ReferencePreparer | None = Depends(get_references),
+    fetcher: ImageFetcher | None = Depends(get_image_fetcher),
+    caller: Caller = Depends(get_caller),
+) -> AsyncImageService:
+    return AsyncImageService(
+        client, governor=governor, resilience=resilience, references=references, fetcher=fetcher, caller=caller
+    )
+
+
+def _bulk_image_service(
+    service: AsyncImageService = Depends(_image_service),
+    caller: Caller = Depends(get_bulk_caller),
+) -> AsyncImageService:
+    return service.for_caller(caller)
+
 
-def _image_service(client: OpenAI = Depends(get_openai_client)) -> ImageService:
-    return ImageService(client)
+def _derivative_spec(
+    width: int | None = Query(None, ge=16, le=4096, description="Fit within this width (never upscales)"),
+    height: int | None = Query(None, ge=16, le=4096, description="Fit within this height (never upscales)"),
+    format: Literal["png", "jpeg", "webp", "avif"] | None = Query(None, description="Output encoding"),
+    quality: int | None = Query(None, ge=1, le=100, description="Encoder quality for jpeg/webp/avif"),
+) -> DerivativeSpec | None:
+    if width is None and height is None and format is None and quality is None:
+        return None
+    if format is not None and format not in supported_formats():
+        raise HTTPException(status_code=400, detail=f"Output format {format} is not available on this server")
+    return DerivativeSpec(width=width, height=height, format=format or "png", quality=quality)
+
+
+def _wants_json(accept: str | None) -> bool:
+    return "application/json" in (accept or "").lower()
+
+
+def _json_image(
+    b64: str, revised_prompt: str | None = None, media_type: str = "image/png", headers: dict | None = None
+) -> Response:
+    """
+    ImageBase64Response body. The base64 text is spliced in as-is: its alphabet needs no JSON escaping,
+    so the multi-MB string skips json.dumps and is assembled into the body with one join.
+    """
+    rest = json.dumps({"mediaType": media_type, "revisedPrompt": revised_prompt}, separators=(",", ":"))
+    body = b"".join((b'{"imageBase64":"', b64.encode("ascii"), b'",', rest[1:].encode("utf-8")))
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _image_response(
+    data: bytes,
+    spec: DerivativeSpec | None,
+    derivatives: DerivativeService | None,
+    headers: dict | None = None,
+    *,
+    as_json: bool = False,
+) -> Response:
+    """Return the PNG as-is, or the requested variant of it; as ImageBase64Response JSON when as_json."""
+    media_type = "image/png"
+    if spec is not None:
+        if derivatives is None:
+            raise HTTPException(status_code=400, detail="Image variants are disabled (DERIVATIVE_WORKERS=0)")
+        try:
+            data = await derivatives.render(data, spec)
+        except Exception:
+            raise HTTPException(status_code=502, detail="Could not decode the generated image")
+        media_type = spec.media_type
+    if as_json:
+        with time_stage("b64_encode"):
+            b64 = base64.b64encode(data).decode("ascii")
+        return _json_image(b64, media_type=media_type, headers=headers)
+    return Response(content=data, media_type=media_type, headers=headers)
 
 
 @router.post(
     "/generate",
     response_class=Response,
-    responses={200: {"content": {"image/png": {}}}},
+    responses={200: {"content": {"image/png": {}}, "model": ImageBase64Response}},
     summary="Generate image from prompt",
 )
 async def generate_image(
     body: GenerateImageRequest,
-    service: ImageService = Depends(_image_service),
+    service: AsyncImageService = Depends(_image_service),
+    cache: ImageCache | None = Depends(get_image_cache),
+    flight: SingleFlight | None = Depends(get_image_flight),
+    caller: Caller = Depends(get_caller),
+    cache_control: str | None = Header(None, description="no-cache skips the cache lookup; no-store also skips storing"),
+    spec: DerivativeSpec | None = Depends(_derivative_spec),
+    derivatives: DerivativeService | None = Depends(get_derivatives),
+    accept: str | None = Header(None, description="application/json returns ImageBase64Response instead of PNG"),
 ) -> Response:
     """
-    Generate a single image from a text prompt. Returns PNG bytes.
+    Generate a single image from a text prompt. Returns PNG bytes, or with Accept: application/json
+    {"imageBase64", "mediaType", "revisedPrompt"} carrying upstream's base64 as-is (no decode/re-encode).
     Uses gpt-image-1.5 by default; supports dall-e-2, dall-e-3, etc.
+    width/height/format/quality query parameters return a resized or re-encoded variant instead.
+    When the result cache is enabled, identical requests are served from it (X-Cache header).
+    Identical requests from the same tenant already in flight share one upstream call unless Cache-Control asks
+    for a fresh image.
     """
+    as_json = _wants_json(accept)
+    directives = {d.strip().lower() for d in (cache_control or "").split(",")}
+    fresh = bool(directives & {"no-cache", "no-store"})
+    key = cache_key(body) if cache is not None or flight is not None else None
+    if cache is not None and not fresh:
+        cached = await cache.get(key)
+        if cached is not None:
+            return await _image_response(cached, spec, derivatives, {"X-Cache": "HIT"}, as_json=as_json)
+    options = {"model": body.model, "size": body.size, "quality": body.quality, "n": body.n, "style": body.style}
+    store = cache is not None and "no-store" not in directives
+
+    async def generate() -> bytes:
+        data = await service.generate(body.prompt, **options)
+        if store:
+            await cache.put(key, data)
+        return data
+
+    async def generate_b64() -> tuple[str, str | None]:
+        b64, revised_prompt = await service.generate_b64(body.prompt, **options)
+        if store:
+            with time_stage("b64_decode"):
+                data = base64.b64decode(b64)
+            await cache.put(key, data)
+        return b64, revised_prompt
+
+    # Followers only join a call scheduled under their own tenant's share and priority class.
+    # JSON without a variant forwards upstream's base64; separate flight key since the result type differs.
+    passthrough = as_json and spec is None
+    flight_key = f"{caller.tenant}:{caller.priority}:{key}"
+    call, flight_key = (generate_b64, f"{flight_key}:b64") if passthrough else (generate, flight_key)
     try:
-        data = service.generate(
-            body.prompt,
-            model=body.model,
-            size=body.size,
-            quality=body.quality,
-            n=body.n,
-            style=body.style,
-        )
+        if flight is not None and not fresh:
+            result = await flight.do(flight_key, call)
+        else:
+            result = await call()
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    return Response(content=data, media_type="image/png")
+    except (APIError, UpstreamError) as e:
+        raise to_http_exception(e)
+    headers = {"X-Cache": "MISS"} if cache is not None else None
+    if passthrough:
+        b64, revised_prompt = result
+        return _json_image(b64, revised_prompt, headers=headers)
+    return await _image_response(result, spec, derivatives, headers, as_json=as_json)
+
+
+def _sse(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+@router.post(
+    "/generate/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+    summary="Generate image with progressive partial frames (Server-Sent Events)",
+)
+async def generate_image_stream(
+    body: GenerateImageRequest,
+    partial_images: int = Query(2, ge=0, le=3, description="Partial frames to send before the final image"),
+    service: AsyncImageService = Depends(_image_service),
+    slots: asyncio.Semaphore = Depends(get_image_stream_slots),
+) -> StreamingResponse:
+    """
+    Generate one image with a gpt-image model and stream it as it renders: a `partial_image`
+    event (index, b64_json) per partial frame, then `completed` (b64_json) with the final PNG.
+    Upstream errors before the first frame map to HTTP status codes; later ones arrive as an
+    `error` event. Returns 429 when IMAGE_STREAM_MAX_CONCURRENCY streams are already open.
+    """
+    if slots.locked():
+        raise HTTPException(status_code=429, detail="Too many image streams in progress", headers={"Retry-After": "5"})
+    await slots.acquire()
+    events = service.generate_stream(
+        body.prompt, model=body.model, size=body.size, quality=body.quality, partial_images=partial_images
+    )
+    try:
+        first = await anext(events)
+    except BaseException as e:
+        slots.release()
+        await events.aclose()
+        if isinstance(e, ValueError):
+            raise HTTPException(status_code=400, detail=str(e))
+        if isinstance(e, (APIError, UpstreamError)):
+            raise to_http_exception(e)
+        if isinstance(e, StopAsyncIteration):
+            raise HTTPException(status_code=502, detail="Upstream stream ended without an image")
+        raise
+
+    async def frames() -> AsyncIterator[str]:
+        event = first
+        pending: asyncio.Future | None = None
+        try:
+            while True:
+                kind = event.pop("type")
+                yield _sse(kind, event)
+                if kind == "completed":
+                    return
+                pending = asyncio.ensure_future(anext(events))
+                while not (await asyncio.wait({pending}, timeout=SSE_HEARTBEAT_SECONDS))[0]:
+                    yield ": keep-alive\n\n"
+                try:
+                    event = pending.result()
+                except StopAsyncIteration:
+                    yield _sse("error", {"detail": "Upstream stream ended without the final image"})
+                    return
+                except Exception as e:
+                    yield _sse("error", {"detail": str(e) or type(e).__name__})
+                    return
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+                with contextlib.suppress(BaseException):
+                    await pending
+            await events.aclose()
+            slots.release()
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/cache/stats", summary="Image result cache counters")
+async def image_cache_stats(cache: ImageCache | None = Depends(get_image_cache)) -> dict:
+    """Hit, miss and eviction counters for the generate cache (enabled: false when off)."""
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
 
 
 @router.post(
     "/edit",
     response_class=Response,
-    responses={200: {"content": {"image/png": {}}}},
+    responses={200: {"content": {"image/png": {}}, "model": ImageBase64Response}},
     summary="Edit image(s) with prompt",
 )
 async def edit_image(
     prompt: str = Form(..., description="Edit instruction (e.g. replace object in first image with object from second)"),
     model: str = Form("gpt-image-1.5"),
     files: list[UploadFile] = [],
-    service: ImageService = Depends(_image_service),
+    service: AsyncImageService = Depends(_image_service),
+    spec: DerivativeSpec | None = Depends(_derivative_spec),
+    derivatives: DerivativeService | None = Depends(get_derivatives),
+    accept: str | None = Header(None, description="application/json returns ImageBase64Response instead of PNG"),
 ) -> Response:
     """
     Edit one or more images with a text instruction. Send as multipart form:
-    prompt, optional model, and one or more image files. Returns the edited image as PNG.
+    prompt, optional model, and one or more PNG/JPEG/WebP files. Returns the edited image as PNG
+    (or the variant selected by width/height/format/quality); with Accept: application/json, as
+    {"imageBase64", "mediaType"} with upstream's base64 passed through.
     """
     if not files:
         raise HTTPException(status_code=400, detail="At least one image file is required")
-    buffers: list[io.BytesIO] = []
-    for f in files:
-        if not f.content_type or not f.content_type.startswith("image/"):
-            raise HTTPException(
-                status_code=400,
-                detail=f"File {f.filename or '?'} is not an image",
+    images = [await image_upload(f) for f in files]
+    as_json = _wants_json(accept)
+    try:
+        if as_json and spec is None:
+            return _json_image(await service.edit_b64(prompt, images, model=model))
+        data = await service.edit(prompt, images, model=model)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (APIError, UpstreamError) as e:
+        raise to_http_exception(e)
+    return await _image_response(data, spec, derivatives, as_json=as_json)
+
+
+@router.post(
+    "/batch",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+    summary="Generate many images with bounded concurrency",
+)
+async def batch_generate_images(
+    body: BatchImageRequest,
+    service: AsyncImageService = Depends(_bulk_image_service),
+    settings: Settings = Depends(get_app_settings),
+) -> StreamingResponse:
+    """
+    Generate every item with at most `concurrency` upstream calls in flight. Streams one
+    NDJSON line (BatchImageResult) per item as soon as it finishes, so lines arrive in
+    completion order; use `index` to match them to the request. A failed item yields an
+    error line and does not stop the rest of the batch.
+    """
+    limit = min(body.concurrency or settings.image_batch_concurrency, settings.image_batch_max_concurrency)
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(index: int, item: GenerateImageRequest) -> BatchImageResult:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                images = await service.generate_all_b64(
+                    item.prompt,
+                    model=item.model,
+                    size=item.size,
+                    quality=item.quality,
+                    n=item.n,
+                    style=item.style,
+                )
+            except Exception as e:
+                return BatchImageResult(
+                    index=index, status="error", error=str(e), seconds=round(time.perf_counter() - start, 3)
+                )
+            return BatchImageResult(
+                index=index,
+                status="ok",
+                images=images,
+                seconds=round(time.perf_counter() - start, 3),
             )
-        buffers.append(io.BytesIO(await f.read()))
+
+    async def lines() -> AsyncIterator[bytes]:
+        tasks = [asyncio.create_task(run(i, item)) for i, item in enumerate(body.items)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                result = await finished
+                yield result.model_dump_json().encode("utf-8") + b"\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/jobs",
+    response_model=ImageJobResponse,
+    status_code=202,
+    summary="Queue image generation",
+)
+async def create_image_job(
+    body: GenerateImageRequest,
+    queue: ImageJobQueue = Depends(get_image_jobs),
+    caller: Caller = Depends(get_bulk_caller),
+) -> ImageJobResponse:
+    """
+    Queue a generation and return immediately with a job id (same flow as videos: poll
+    /jobs/{id}/status, then download). Jobs are stored in SQLite and survive restarts.
+    """
+    job_id = await queue.submit(body.model_dump(), caller)
+    return ImageJobResponse(job_id=job_id)
+
+
+@router.get(
+    "/jobs/{job_id}/status",
+    response_model=ImageJobStatusResponse,
+    summary="Get image job status",
+)
+async def get_image_job_status(
+    job_id: str,
+    queue: ImageJobQueue = Depends(get_image_jobs),
+) -> ImageJobStatusResponse:
+    """Return the job's state from the queue; 404 for an unknown id."""
+    job = await queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Image job not found")
+    return ImageJobStatusResponse(
+        job_id=job.job_id, status=job.status, images=job.images, attempts=job.attempts, error=job.error
+    )
+
+
+@router.get(
+    "/jobs/{job_id}/download",
+    response_class=Response,
+    responses={200: {"content": {"image/png": {}}}},
+    summary="Download a finished image job result",
+)
+async def download_image_job(
+    job_id: str,
+    index: int = Query(0, ge=0, description="Which of the job's n images"),
+    queue: ImageJobQueue = Depends(get_image_jobs),
+    spec: DerivativeSpec | None = Depends(_derivative_spec),
+    derivatives: DerivativeService | None = Depends(get_derivatives),
+) -> Response:
+    """
+    Return image `index` of a completed job from local storage (or the variant selected by
+    width/height/format/quality). Returns 400 while the job is not completed.
+    """
+    job = await queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Image job not found")
+    if job.status != "completed":
+        raise HTTPException(status_code=400, detail=f"Image job is {job.status}")
+    if index >= job.images:
+        raise HTTPException(status_code=404, detail=f"Image job has {job.images} image(s)")
+    path = queue.result_path(job_id, index)
+    if spec is None:
+        return FileResponse(path, media_type="image/png")
+    data = await asyncio.to_thread(path.read_bytes)
+    return await _image_response(data, spec, derivatives)
+
+
+def _session_version(request: Request, session_id: str, version: EditVersion) -> EditSessionVersion:
+    return EditSessionVersion(
+        version=version.version,
+        parent=version.parent,
+        prompt=version.prompt,
+        model=version.model,
+        mediaType=version.media_type,
+        bytes=version.bytes,
+        url=request.app.url_path_for("get_edit_session_version", session_id=session_id, version=version.version),
+    )
+
+
+def _session_response(request: Request, session: EditSession) -> EditSessionResponse:
+    return EditSessionResponse(
+        session_id=session.session_id,
+        head=session.head,
+        versions=[_session_version(request, session.session_id, v) for v in session.versions],
+    )
+
+
+async def _load_session(store: EditSessionStore, session_id: str) -> EditSession:
+    try:
+        return await store.get(session_id)
+    except EditSessionNotFound:
+        raise HTTPException(status_code=404, detail="Edit session not found")
+
+
+def _decode_image_base64(text: str) -> bytes:
+    if text.startswith("data:"):
+        text = text.partition(",")[2]
+    try:
+        return base64.b64decode(text, validate=True)
+    except binascii.Error:
+        raise HTTPException(status_code=400, detail="imageBase64 is not valid base64")
+
+
+@router.post(
+    "/sessions",
+    response_model=EditSessionResponse,
+    status_code=201,
+    summary="Start an edit session",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": CreateEditSessionRequest.model_json_schema()},
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "file": {"type": "string", "format": "binary"},
+                            "imageBase64": {"type": "string"},
+                        },
+                    }
+                },
+            },
+        }
+    },
+)
+async def create_edit_session(
+    request: Request,
+    store: EditSessionStore = Depends(get_edit_sessions),
+    settings: Settings = Depends(get_app_settings),
+) -> EditSessionResponse:
+    """
+    Upload the image to work on once: as JSON {"imageBase64"} (the frontend's field, a data: URL works too),
+    or as multipart with a `file` part (PNG/JPEG/WebP) or an `imageBase64` field. It becomes version 0 of a
+    new session; edit steps then refer to it by session id.
+    """
+    if request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            body = CreateEditSessionRequest.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors()])
+        data = _decode_image_base64(body.imageBase64)
+    else:
+        # Fields and parts may be as large as the upload cap, not Starlette's 1 MB default.
+        max_part_size = settings.max_upload_mb << 20 if settings.max_upload_mb > 0 else sys.maxsize
+        async with request.form(max_files=1, max_fields=4, max_part_size=max_part_size) as form:
+            file, text = form.get("file"), form.get("imageBase64")
+            if isinstance(file, StarletteUploadFile):
+                data = await file.read()
+            elif isinstance(text, str) and text:
+                data = _decode_image_base64(text)
+            else:
+                raise HTTPException(status_code=400, detail="Send the image as a file or as imageBase64")
+    try:
+        session = await store.create(data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _session_response(request, session)
+
+
+@router.post(
+    "/sessions/{session_id}/edit",
+    response_model=EditSessionStepResponse,
+    summary="Edit the session's working image",
+)
+async def edit_in_session(
+    request: Request,
+    session_id: str,
+    prompt: str = Form(..., description="Edit instruction"),
+    model: str = Form("gpt-image-1.5"),
+    base: int | None = Form(None, ge=0, description="Version to edit; the head by default"),
+    files: list[UploadFile] = [],
+    service: AsyncImageService = Depends(_image_service),
+    store: EditSessionStore = Depends(get_edit_sessions),
+) -> EditSessionStepResponse:
+    """
+    Edit a stored version (the head unless `base` is given) without uploading it again. Optional `files`
+    are sent after it as further input images (e.g. a product to insert). The result is stored as the new
+    head, and only its metadata comes back; fetch the image from `version.url`, e.g. with
+    `?width=512&format=webp` for a preview.
+    """
+    session = await _load_session(store, session_id)
     try:
-        data = service.edit(prompt, buffers, model=model)
+        parent = store.version(session, base)
+    except EditSessionNotFound:
+        raise HTTPException(status_code=404, detail=f"Edit session has no version {base}")
+    images = [await store.open(session_id, parent), *[await image_upload(f) for f in files]]
+    try:
+        data = await service.edit(prompt, images, model=model)
+        version = await store.add(session_id, parent.version, data, prompt=prompt, model=model)
+    except EditSessionNotFound:
+        raise HTTPException(status_code=404, detail="Edit session not found")
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    return Response(content=data, media_type="image/png")
\ No newline at end of file
+    except (APIError, UpstreamError) as e:
+        raise to_http_exception(e)
+    return EditSessionStepResponse(
+        session_id=session_id, head=version.version, version=_session_version(request, session_id, version)
+    )
+
+
+@router.get(
+    "/sessions/{session_id}",
+    response_model=EditSessionResponse,
+    summary="Get an edit session's history",
+)
+async def get_edit_session(
+    request: Request,
+    session_id: str,
+    store: EditSessionStore = Depends(get_edit_sessions),
+) -> EditSessionResponse:
+    """Every version of the session with the prompt that produced it, and the current head."""
+    return _session_response(request, await _load_session(store, session_id))
+
+
+@router.get(
+    "/sessions/{session_id}/versions/{version}",
+    response_class=Response,
+    responses={200: {"content": {"image/png": {}, "image/jpeg": {}, "image/webp": {}}}},
+    summary="Download one version of an edit session",
+)
+async def get_edit_session_version(
+    session_id: str,
+    version: int,
+    store: EditSessionStore = Depends(get_edit_sessions),
+    spec: DerivativeSpec | None = Depends(_derivative_spec),
+    derivatives: DerivativeService | None = Depends(get_derivatives),
+) -> Response:
+    """The stored image as-is, or the variant selected by width/height/format/quality."""
+    session = await _load_session(store, session_id)
+    try:
+        stored = store.version(session, version)
+    except EditSessionNotFound:
+        raise HTTPException(status_code=404, detail=f"Edit session has no version {version}")
+    path = store.path(session_id, stored)
+    if spec is None:
+        return FileResponse(path, media_type=stored.media_type)
+    data = await asyncio.to_thread(path.read_bytes)
+    return await _image_response(data, spec, derivatives)
+
+
+@router.post(
+    "/sessions/{session_id}/revert",
+    response_model=EditSessionResponse,
+    summary="Make an earlier version the head",
+)
+async def revert_edit_session(
+    request: Request,
+    session_id: str,
+    body: RevertEditSessionRequest,
+    store: EditSessionStore = Depends(get_edit_sessions),
+) -> EditSessionResponse:
+    """The next edit starts from `version`; later versions stay in the history and can be reverted to."""
+    try:
+        session = await store.revert(session_id, body.version)
+    except EditSessionNotFound:
+        raise HTTPException(status_code=404, detail=f"Edit session or version {body.version} not found")
+    return _session_response(request, session)
+
+
+@router.delete("/sessions/{session_id}", status_code=204, summary="Delete an edit session")
+async def delete_edit_session(
+    session_id: str,
+    store: EditSessionStore = Depends(get_edit_sessions),
+) -> Response:
+    """Remove the session and all of its stored images."""
+    try:
+        await store.delete(session_id)
+    except EditSessionNotFound:
+        raise HTTPException(status_code=404, detail="Edit session not found")
+    return Response(status_code=204)
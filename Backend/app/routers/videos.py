@@ -1,25 +1,75 @@
 """Video generation and remix endpoints."""
 
-import io
+import asyncio
+import hashlib
+import json
+from collections.abc import AsyncIterator
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
-from fastapi.responses import Response
-from openai import OpenAI
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, UploadFile, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from openai import APIError, APIStatusError, AsyncOpenAI
+from starlette.background import BackgroundTask
 
-from app.dependencies import get_openai_client
+from app.dependencies import (
+    get_async_openai_client,
+    get_caller,
+    get_governor,
+    get_references,
+    get_resilience,
+    get_video_flight,
+    get_video_store,
+    get_video_tracker,
+)
+from app.routers.errors import to_http_exception
 from app.schemas.videos import (
     CreateVideoRequest,
     RemixVideoRequest,
     VideoJobResponse,
     VideoStatusResponse,
 )
-from app.services.video_service import VideoService
+from app.services.fair_share import Caller
+from app.services.rate_limit import UpstreamGovernor
+from app.services.references import ReferencePreparer
+from app.services.resilience import Resilience, UpstreamError
+from app.services.singleflight import SingleFlight
+from app.services.video_jobs import VideoJobNotFound, VideoJobTracker
+from app.services.video_service import AsyncVideoService, RangeNotSatisfiable
+from app.services.video_store import VideoStore
+from app.uploads import image_upload
 
 router = APIRouter()
 
+SSE_HEARTBEAT_SECONDS = 15
+
+
+def _video_service(
+    client: AsyncOpenAI = Depends(get_async_openai_client),
+    governor: UpstreamGovernor | None = Depends(get_governor),
+    resilience: Resilience | None = Depends(get_resilience),
+    references: ReferencePreparer | None = Depends(get_references),
+    caller: Caller = Depends(get_caller),
+) -> AsyncVideoService:
+    return AsyncVideoService(client, governor=governor, resilience=resilience, references=references, caller=caller)
+
 
-def _video_service(client: OpenAI = Depends(get_openai_client)) -> VideoService:
-    return VideoService(client)
+async def _tee_to_store(
+    chunks: AsyncIterator[bytes], store: VideoStore, job_id: str, expected_size: int | None
+) -> AsyncIterator[bytes]:
+    """Yield chunks to the client while writing them to the store; keep the file only if complete."""
+    # Opened on the first iteration, so a response that never starts (client already gone) leaves no .part file.
+    writer = store.writer(job_id, expected_size)
+    if writer is None:
+        async for chunk in chunks:
+            yield chunk
+        return
+    try:
+        async for chunk in chunks:
+            await asyncio.to_thread(writer.write, chunk)
+            yield chunk
+    except BaseException:
+        writer.abort()
+        raise
+    await asyncio.to_thread(writer.commit)
 
 
 @router.post(
@@ -29,21 +79,34 @@ def _video_service(client: OpenAI = Depends(get_openai_client)) -> VideoService:
 )
 async def create_video(
     body: CreateVideoRequest,
-    service: VideoService = Depends(_video_service),
+    service: AsyncVideoService = Depends(_video_service),
+    flight: SingleFlight | None = Depends(get_video_flight),
+    tracker: VideoJobTracker = Depends(get_video_tracker),
+    caller: Caller = Depends(get_caller),
 ) -> VideoJobResponse:
     """
     Start a video generation job. Returns job_id. Poll GET /videos/jobs/{id}/status
     until status is completed, then GET /videos/jobs/{id}/download to get the MP4.
+    Identical requests from the same tenant already in flight share the same upstream job.
     """
-    try:
-        job_id = service.create(
+
+    async def create() -> str:
+        return await service.create(
             body.prompt,
             model=body.model,
             seconds=body.seconds,
             size=body.size,
         )
+
+    try:
+        if flight is not None:
+            digest = hashlib.sha256(body.model_dump_json().encode("utf-8")).hexdigest()
+            job_id = await flight.do(f"{caller.tenant}:{caller.priority}:{digest}", create)
+        else:
+            job_id = await create()
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise to_http_exception(e)
+    tracker.track(job_id)
     return VideoJobResponse(job_id=job_id)
 
 
@@ -58,23 +121,25 @@ async def create_video_with_reference(
     seconds: str = Form("4"),
     size: str = Form("720x1280"),
     reference: UploadFile = File(...),
-    service: VideoService = Depends(_video_service),
+    service: AsyncVideoService = Depends(_video_service),
+    tracker: VideoJobTracker = Depends(get_video_tracker),
 ) -> VideoJobResponse:
     """
     Start a video generation job with an image reference. Send as multipart form.
     Same flow as POST /videos/generate: poll status then download.
     """
-    ref_bytes = await reference.read()
+    ref = await image_upload(reference)
     try:
-        job_id = service.create(
+        job_id = await service.create(
             prompt,
             model=model,
             seconds=seconds,
             size=size,
-            input_reference=io.BytesIO(ref_bytes),
+            input_reference=ref,
         )
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise to_http_exception(e)
+    tracker.track(job_id)
     return VideoJobResponse(job_id=job_id)
 
 
@@ -85,34 +150,132 @@ async def create_video_with_reference(
 )
 async def get_video_status(
     job_id: str,
-    service: VideoService = Depends(_video_service),
+    tracker: VideoJobTracker = Depends(get_video_tracker),
 ) -> VideoStatusResponse:
-    """Return current status: pending, completed, or failed."""
+    """
+    Return the last known status from the background poller (no upstream call once tracked).
+    For push updates instead of polling, use /jobs/{id}/events (SSE) or /jobs/{id}/ws. 404 for an unknown id.
+    """
     try:
-        status = service.get_status(job_id)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    return VideoStatusResponse(job_id=job_id, status=status)
+        state = await tracker.get(job_id)
+    except VideoJobNotFound:
+        raise HTTPException(status_code=404, detail="Video job not found")
+    return VideoStatusResponse(job_id=job_id, status=state.status, progress=state.progress, error=state.error)
+
+
+@router.get(
+    "/jobs/{job_id}/events",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+    summary="Stream video job status (Server-Sent Events)",
+)
+async def video_status_events(
+    job_id: str,
+    tracker: VideoJobTracker = Depends(get_video_tracker),
+) -> StreamingResponse:
+    """Send a `status` event now and on every change; the stream ends when the job completes or fails."""
+    try:
+        state = await tracker.get(job_id)
+    except VideoJobNotFound:
+        raise HTTPException(status_code=404, detail="Video job not found")
+    queue = tracker.watch(job_id)
+
+    async def events() -> AsyncIterator[str]:
+        current = state
+        try:
+            while True:
+                yield f"event: status\ndata: {json.dumps(current.to_dict())}\n\n"
+                if current.done:
+                    return
+                while True:
+                    try:
+                        current = await asyncio.wait_for(queue.get(), SSE_HEARTBEAT_SECONDS)
+                        break
+                    except TimeoutError:
+                        yield ": keep-alive\n\n"
+        finally:
+            tracker.unwatch(job_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/jobs/{job_id}/ws")
+async def video_status_ws(websocket: WebSocket, job_id: str) -> None:
+    """Send the status as JSON now and on every change; closes when the job completes or fails (4404: unknown id)."""
+    tracker: VideoJobTracker | None = websocket.app.state.video_tracker
+    if tracker is None:
+        await websocket.close(code=1011)
+        return
+    await websocket.accept()
+    try:
+        state = await tracker.get(job_id)
+    except VideoJobNotFound:
+        await websocket.close(code=4404, reason="Video job not found")
+        return
+    queue = tracker.watch(job_id)
+    try:
+        while True:
+            await websocket.send_json(state.to_dict())
+            if state.done:
+                break
+            state = await queue.get()
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        tracker.unwatch(job_id, queue)
 
 
 @router.get(
     "/jobs/{job_id}/download",
-    response_class=Response,
-    responses={200: {"content": {"video/mp4": {}}}},
+    response_class=StreamingResponse,
+    responses={200: {"content": {"video/mp4": {}}}, 206: {"content": {"video/mp4": {}}}},
     summary="Download completed video",
 )
 async def download_video(
     job_id: str,
-    service: VideoService = Depends(_video_service),
+    range: str | None = Header(None, description="Optional single byte range, e.g. bytes=0-1048575"),
+    store: VideoStore | None = Depends(get_video_store),
+    service: AsyncVideoService = Depends(_video_service),
 ) -> Response:
-    """Download the video file when status is completed. Returns 400 if not ready or failed."""
+    """
+    Stream the video file when status is completed; bytes are forwarded as they arrive.
+    Supports Range requests (206) for seeking and resuming. Returns 400 if not ready.
+    Videos already in the local store are served from disk with no upstream call.
+    """
+    path = store.get(job_id) if store is not None else None
+    if path is not None:
+        if store.accel_prefix:
+            return Response(media_type="video/mp4", headers={"X-Accel-Redirect": store.accel_prefix + path.name})
+        return FileResponse(path, media_type="video/mp4")
     try:
-        data = service.download(job_id)
+        download = await service.open_download(job_id, byte_range=range)
+    except RangeNotSatisfiable as e:
+        headers = {"Content-Range": f"bytes */{e.size}"} if e.size is not None else None
+        raise HTTPException(status_code=416, detail=str(e), headers=headers)
+    except (APIError, UpstreamError) as e:
+        if isinstance(e, APIStatusError) and e.status_code == 416:
+            raise HTTPException(status_code=416, detail="Requested range not satisfiable")
+        raise to_http_exception(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except RuntimeError as e:
         raise HTTPException(status_code=422, detail=str(e))
-    return Response(content=data, media_type="video/mp4")
+    body = download.chunks()
+    if store is not None and download.status_code == 200:
+        length = download.headers.get("Content-Length")
+        body = _tee_to_store(body, store, job_id, int(length) if length else None)
+    return StreamingResponse(
+        body,
+        status_code=download.status_code,
+        media_type="video/mp4",
+        headers=download.headers,
+        background=BackgroundTask(download.aclose),
+    )
 
 
 @router.post(
@@ -122,14 +285,16 @@ async def download_video(
 )
 async def remix_video(
     body: RemixVideoRequest,
-    service: VideoService = Depends(_video_service),
+    service: AsyncVideoService = Depends(_video_service),
+    tracker: VideoJobTracker = Depends(get_video_tracker),
 ) -> VideoJobResponse:
     """
     Start a remix job from an existing video (job_id). Returns new job_id;
     poll status and download the same way as for generate.
     """
     try:
-        job_id = service.remix(body.video_id, body.prompt)
+        job_id = await service.remix(body.video_id, body.prompt)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise to_http_exception(e)
+    tracker.track(job_id)
     return VideoJobResponse(job_id=job_id)
@@ -1,10 +1,32 @@
 """Request/response schemas."""
 
-from app.schemas.images import GenerateImageRequest
+from app.schemas.images import (
+    BatchImageRequest,
+    BatchImageResult,
+    CreateEditSessionRequest,
+    EditSessionResponse,
+    EditSessionStepResponse,
+    EditSessionVersion,
+    GenerateImageRequest,
+    ImageBase64Response,
+    ImageJobResponse,
+    ImageJobStatusResponse,
+    RevertEditSessionRequest,
+)
 from app.schemas.videos import CreateVideoRequest, RemixVideoRequest, VideoJobResponse, VideoStatusResponse
 
 __all__ = [
+    "BatchImageRequest",
+    "BatchImageResult",
+    "CreateEditSessionRequest",
+    "EditSessionResponse",
+    "EditSessionStepResponse",
+    "EditSessionVersion",
     "GenerateImageRequest",
+    "ImageBase64Response",
+    "ImageJobResponse",
+    "ImageJobStatusResponse",
+    "RevertEditSessionRequest",
     "CreateVideoRequest",
     "RemixVideoRequest",
     "VideoJobResponse",
@@ -12,3 +12,86 @@ class GenerateImageRequest(BaseModel):
     quality: str | None = Field(default=None, description="e.g. hd, standard, high, medium, low")
     n: int = Field(default=1, ge=1, le=4, description="Number of images (DALL-E 3 only supports 1)")
     style: str | None = Field(default=None, description="DALL-E 3: vivid | natural")
+
+
+class ImageBase64Response(BaseModel):
+    """JSON body of POST /images/generate and /images/edit when the request sends Accept: application/json."""
+
+    imageBase64: str = Field(..., description="Base64-encoded image, as the frontend's imageBase64")
+    mediaType: str = Field(default="image/png", description="Type of the encoded image (variants may differ)")
+    revisedPrompt: str | None = Field(default=None, description="Prompt as rewritten by the model, when reported")
+
+
+class BatchImageRequest(BaseModel):
+    """Request body for POST /images/batch."""
+
+    items: list[GenerateImageRequest] = Field(..., min_length=1, max_length=100, description="Prompts to generate")
+    concurrency: int | None = Field(
+        default=None, ge=1, description="Max items in flight; capped by the server (IMAGE_BATCH_MAX_CONCURRENCY)"
+    )
+
+
+class BatchImageResult(BaseModel):
+    """One NDJSON line of the POST /images/batch response, emitted as each item finishes."""
+
+    index: int = Field(..., description="Position of the item in the request")
+    status: str = Field(..., description="ok | error")
+    images: list[str] = Field(default_factory=list, description="Base64-encoded PNGs (n per item)")
+    error: str | None = None
+    seconds: float = Field(..., description="Time spent on this item")
+
+
+class ImageJobResponse(BaseModel):
+    """Response after queueing an image job (202)."""
+
+    job_id: str = Field(..., description="Image job ID; use for status and download")
+
+
+class ImageJobStatusResponse(BaseModel):
+    """Response for GET /images/jobs/{id}/status."""
+
+    job_id: str
+    status: str = Field(..., description="queued | running | completed | failed")
+    images: int = Field(default=0, description="Number of PNGs ready for download (index 0..images-1)")
+    attempts: int = Field(default=0, description="Times a worker has picked the job up")
+    error: str | None = Field(default=None, description="Failure reason when status is failed")
+
+
+class CreateEditSessionRequest(BaseModel):
+    """JSON body for POST /images/sessions (the image can also be sent as multipart)."""
+
+    imageBase64: str = Field(..., min_length=1, description="The starting image as base64, or a data: URL")
+
+
+class EditSessionVersion(BaseModel):
+    """One stored version of an edit session's working image."""
+
+    version: int = Field(..., description="0 is the initial image; each edit step adds the next number")
+    parent: int | None = Field(default=None, description="Version the edit started from (None for version 0)")
+    prompt: str | None = Field(default=None, description="Edit instruction that produced this version")
+    model: str | None = None
+    mediaType: str = Field(default="image/png", description="Type of the stored image")
+    bytes: int = Field(..., description="Size of the stored image")
+    url: str = Field(..., description="GET this for the image (variant query parameters work too)")
+
+
+class EditSessionResponse(BaseModel):
+    """An edit session and its history, from POST/GET /images/sessions."""
+
+    session_id: str = Field(..., description="Short id; later edits refer to the working image through it")
+    head: int = Field(..., description="Version the next edit starts from")
+    versions: list[EditSessionVersion]
+
+
+class EditSessionStepResponse(BaseModel):
+    """Response of POST /images/sessions/{id}/edit: the new version, without the image itself."""
+
+    session_id: str
+    head: int = Field(..., description="The new version, now the head")
+    version: EditSessionVersion
+
+
+class RevertEditSessionRequest(BaseModel):
+    """Request body for POST /images/sessions/{id}/revert."""
+
+    version: int = Field(..., ge=0, description="Version to make the head again; later versions are kept")
@@ -29,4 +29,6 @@ class VideoStatusResponse(BaseModel):
     """Response for GET /videos/jobs/{id}/status."""
 
     job_id: str
-    status: str = Field(..., description="pending | completed | failed")
+    status: str = Field(..., description="queued | in_progress | completed | failed")
+    progress: int | None = Field(default=None, description="Percent complete, when reported upstream")
+    error: str | None = Field(default=None, description="Failure reason when status is failed")
@@ -1,6 +1,19 @@
 """Business logic services."""
 
-from app.services.image_service import ImageService
-from app.services.video_service import VideoService
+__all__ = ["AsyncImageService", "AsyncVideoService", "ImageService", "VideoService"]
 
-__all__ = ["ImageService", "VideoService"]
+_EXPORTS = {
+    "AsyncImageService": "app.services.image_service",
+    "ImageService": "app.services.image_service",
+    "AsyncVideoService": "app.services.video_service",
+    "VideoService": "app.services.video_service",
+}
+
+
+def __getattr__(name: str):
+    # Lazy: the service modules import the OpenAI SDK, which light submodules (derivatives workers) don't need.
+    if name in _EXPORTS:
+        import importlib
+
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
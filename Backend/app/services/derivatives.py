@@ -0,0 +1,177 @@
+"""Resized / re-encoded image variants (thumbnails, WebP, AVIF, JPEG) and upload references, rendered on a process pool."""
+
+import asyncio
+import functools
+import hashlib
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from app.metrics import time_stage
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+    from app.services.image_cache import ImageCache
+
+# Pillow is imported on first use: the API process only needs it for supported_formats(), and
+# pool workers import just this module, so neither pays for it (or the SDK) at startup.
+
+MEDIA_TYPES = {"png": "image/png", "jpeg": "image/jpeg", "webp": "image/webp", "avif": "image/avif"}
+REFERENCE_JPEG_QUALITY = 90
+EXIF_ORIENTATION = 0x0112
+
+
+@functools.cache
+def supported_formats() -> frozenset[str]:
+    """Formats this Pillow build can encode (AVIF needs libavif)."""
+    from PIL import features
+
+    return frozenset(f for f in MEDIA_TYPES if f in ("png", "jpeg") or features.check(f))
+
+
+@dataclass(frozen=True)
+class DerivativeSpec:
+    """Requested variant: fit within width x height (never upscaled), encode as format at quality."""
+
+    width: int | None = None
+    height: int | None = None
+    format: str = "png"
+    quality: int | None = None
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES[self.format]
+
+    @property
+    def key(self) -> str:
+        return f"{self.width or 0}x{self.height or 0}.{self.format}.q{self.quality or 0}"
+
+
+def render_derivative(data: bytes, spec: DerivativeSpec) -> bytes:
+    """Decode, downscale and re-encode one image. Runs in a worker process."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as im:
+        im.load()
+        if spec.width or spec.height:
+            im.thumbnail((spec.width or im.width, spec.height or im.height), Image.Resampling.LANCZOS)
+        if spec.format == "jpeg" and im.mode != "RGB":
+            im = _flatten(im)
+        options: dict = {}
+        if spec.quality is not None and spec.format != "png":
+            options["quality"] = spec.quality
+        out = io.BytesIO()
+        im.save(out, format=spec.format.upper(), **options)
+        return out.getvalue()
+
+
+def render_reference(path: str, width: int, height: int, crop: bool, lossy: bool) -> bytes | None:
+    """
+    Apply EXIF orientation to the image file at path, then fit within width x height (or cover-crop to exactly
+    that size) and re-encode: JPEG when lossy and there is no transparency, else PNG. Returns None when the
+    upload can be sent as it is (already within bounds and upright, or not smaller re-encoded). Runs in a
+    worker process, which reads the file itself rather than receiving its bytes.
+    """
+    from PIL import Image, ImageOps
+
+    size = os.path.getsize(path)
+    with Image.open(path) as im:
+        oriented = im.getexif().get(EXIF_ORIENTATION, 1) != 1
+        fits = im.size == (width, height) if crop else im.width <= width and im.height <= height
+        if fits and not oriented:
+            return None
+        alpha = _has_alpha(im)
+        im = ImageOps.exif_transpose(im)
+        if im.mode not in ("RGB", "RGBA", "L", "LA"):
+            im = im.convert("RGBA" if alpha else "RGB")
+        if crop:
+            im = ImageOps.fit(im, (width, height), Image.Resampling.LANCZOS)
+        else:
+            im.thumbnail((width, height), Image.Resampling.LANCZOS)
+        out = io.BytesIO()
+        if lossy and not alpha:
+            im.convert("RGB").save(out, format="JPEG", quality=REFERENCE_JPEG_QUALITY, optimize=True)
+        else:
+            im.save(out, format="PNG")
+    if not crop and not oriented and out.tell() >= size:
+        return None
+    return out.getvalue()
+
+
+def _has_alpha(im: "Image.Image") -> bool:
+    return im.mode in ("RGBA", "LA", "PA") or (im.mode == "P" and "transparency" in im.info)
+
+
+def _ready() -> None:
+    """Submitted at startup so workers are spawned (and Pillow imported) before the first request."""
+    import PIL.Image  # noqa: F401
+
+
+def _flatten(im: "Image.Image") -> "Image.Image":
+    """JPEG has no alpha: composite onto white rather than letting transparent pixels turn black."""
+    from PIL import Image
+
+    rgba = im.convert("RGBA")
+    background = Image.new("RGB", rgba.size, (255, 255, 255))
+    background.paste(rgba, mask=rgba.getchannel("A"))
+    return background
+
+
+class DerivativeService:
+    """
+    Render image variants off the event loop in a process pool.
+    Results are cached by (sha256 of the source bytes, spec), so repeat requests skip the encode.
+    """
+
+    def __init__(self, *, workers: int, cache: "ImageCache | None" = None) -> None:
+        # spawn, not fork: the server process has live threads (thread pool, httpx) by the time a worker starts.
+        self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self._workers = workers
+        self._cache = cache
+        self.counters = {"renders": 0, "cache_hits": 0, "errors": 0, "render_seconds_total": 0.0}
+
+    def warm_up(self) -> None:
+        for _ in range(self._workers):
+            self._executor.submit(_ready)
+
+    async def render(self, data: bytes, spec: DerivativeSpec) -> bytes:
+        digest = hashlib.sha256(data)
+        digest.update(spec.key.encode("ascii"))
+        key = digest.hexdigest()
+        if self._cache is not None:
+            cached = await self._cache.get(key)
+            if cached is not None:
+                self.counters["cache_hits"] += 1
+                return cached
+        start = time.perf_counter()
+        try:
+            with time_stage("derivative"):
+                out = await self.run(render_derivative, data, spec)
+        except Exception:
+            self.counters["errors"] += 1
+            raise
+        self.counters["renders"] += 1
+        self.counters["render_seconds_total"] += time.perf_counter() - start
+        if self._cache is not None:
+            await self._cache.put(key, out)
+        return out
+
+    async def run(self, fn, *args):
+        """Run fn(*args) on the pool; fn must live in a module the workers can import cheaply (like this one)."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "workers": self._workers,
+            "formats": sorted(supported_formats()),
+            "cache": self._cache.stats() if self._cache is not None else None,
+        }
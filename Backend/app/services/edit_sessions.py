@@ -0,0 +1,314 @@
+"""Server-side edit sessions: every version of a working image kept locally and referred to by a short id."""
+
+import asyncio
+import io
+import os
+import re
+import secrets
+import shutil
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from app.uploads import sniff_image_type
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS edit_sessions (
+    id TEXT PRIMARY KEY,
+    head INTEGER NOT NULL,
+    versions INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS edit_sessions_updated ON edit_sessions (updated_at);
+CREATE TABLE IF NOT EXISTS edit_versions (
+    session_id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    parent INTEGER,
+    prompt TEXT,
+    model TEXT,
+    media_type TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (session_id, version)
+);
+"""
+
+_SESSION_ID = re.compile(r"es_[0-9a-f]{16}")
+_EXTENSIONS = {"image/png": "png", "image/jpeg": "jpg", "image/webp": "webp"}
+
+
+@dataclass
+class EditVersion:
+    """One stored image of a session: the upload (version 0) or the result of an edit step."""
+
+    version: int
+    parent: int | None
+    prompt: str | None
+    model: str | None
+    media_type: str
+    bytes: int
+    created_at: float
+
+
+@dataclass
+class EditSession:
+    session_id: str
+    head: int  # the version the next edit starts from
+    versions: list[EditVersion]
+    created_at: float
+    updated_at: float
+
+
+class EditSessionNotFound(Exception):
+    """The session (or the version asked for) does not exist, or has expired."""
+
+
+class EditSessionStore:
+    """
+    Sessions and their version history are rows in SQLite (WAL); the images are files under
+    directory/<session_id>/<version>.<ext>, so every worker process on a host sees the same sessions.
+    An edit step reads its base version from disk instead of having the client upload it again, and only
+    the new version's metadata goes back to the client. Versions are numbered from 0 (the initial image);
+    reverting moves the head, and the next edit branches from there without deleting later versions.
+    Sessions untouched for ttl_seconds are removed, along with their files.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        directory: Path,
+        *,
+        ttl_seconds: float = 86400.0,
+        max_versions: int = 100,
+        sweep_interval: float = 3600.0,
+    ) -> None:
+        self._dir = directory
+        self._ttl = ttl_seconds
+        self._max_versions = max_versions
+        self._sweep_interval = sweep_interval
+        self._last_sweep = 0.0
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        directory.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False, timeout=30.0)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self.counters = {
+            "created": 0,
+            "edits": 0,
+            "reverts": 0,
+            "deleted": 0,
+            "expired": 0,
+            "bytes_stored": 0,
+            # Base images sent upstream from the store instead of being uploaded by the client again.
+            "bytes_by_reference": 0,
+        }
+
+    # --- storage (runs in a thread) ---
+
+    def _folder(self, session_id: str) -> Path:
+        # Ids come from URLs; anything but the generated form could point outside the directory.
+        if _SESSION_ID.fullmatch(session_id) is None:
+            raise EditSessionNotFound(session_id)
+        return self._dir / session_id
+
+    def _path(self, session_id: str, version: int, media_type: str) -> Path:
+        return self._folder(session_id) / f"{version}.{_EXTENSIONS[media_type]}"
+
+    def _write_tmp(self, session_id: str, data: bytes) -> Path:
+        folder = self._folder(session_id)
+        folder.mkdir(parents=True, exist_ok=True)
+        tmp = folder / f".{secrets.token_hex(8)}.{os.getpid()}.tmp"
+        tmp.write_bytes(data)
+        return tmp
+
+    def _create(self, session_id: str, data: bytes, media_type: str) -> None:
+        tmp = self._write_tmp(session_id, data)
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "INSERT INTO edit_sessions (id, head, versions, created_at, updated_at) VALUES (?, 0, 1, ?, ?)",
+                    (session_id, now, now),
+                )
+                self._db.execute(
+                    "INSERT INTO edit_versions (session_id, version, media_type, bytes, created_at)"
+                    " VALUES (?, 0, ?, ?, ?)",
+                    (session_id, media_type, len(data), now),
+                )
+                os.replace(tmp, self._path(session_id, 0, media_type))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                tmp.unlink(missing_ok=True)
+                raise
+
+    def _add(self, session_id: str, parent: int, prompt: str, model: str, data: bytes, media_type: str) -> int:
+        tmp = self._write_tmp(session_id, data)
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                # The new version becomes the head; the file is renamed into place before the commit,
+                # so a version row is never visible without its image.
+                row = self._db.execute(
+                    "UPDATE edit_sessions SET versions = versions + 1, head = versions, updated_at = ?"
+                    " WHERE id = ? AND updated_at >= ? AND versions < ? RETURNING head",
+                    (now, session_id, now - self._ttl, self._max_versions),
+                ).fetchone()
+                if row is None:
+                    exists = self._db.execute(
+                        "SELECT 1 FROM edit_sessions WHERE id = ? AND updated_at >= ?", (session_id, now - self._ttl)
+                    ).fetchone()
+                    if exists is None:
+                        raise EditSessionNotFound(session_id)
+                    raise ValueError(f"Edit session has reached {self._max_versions} versions; start a new one")
+                version = row["head"]
+                self._db.execute(
+                    "INSERT INTO edit_versions (session_id, version, parent, prompt, model, media_type, bytes,"
+                    " created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (session_id, version, parent, prompt, model, media_type, len(data), now),
+                )
+                os.replace(tmp, self._path(session_id, version, media_type))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                tmp.unlink(missing_ok=True)
+                raise
+        return version
+
+    def _load(self, session_id: str) -> EditSession:
+        self._folder(session_id)
+        with self._lock:
+            session = self._db.execute("SELECT * FROM edit_sessions WHERE id = ?", (session_id,)).fetchone()
+            rows = self._db.execute(
+                "SELECT * FROM edit_versions WHERE session_id = ? ORDER BY version", (session_id,)
+            ).fetchall()
+        if session is None or session["updated_at"] < time.time() - self._ttl:
+            raise EditSessionNotFound(session_id)
+        return EditSession(
+            session_id=session["id"],
+            head=session["head"],
+            versions=[
+                EditVersion(
+                    version=r["version"],
+                    parent=r["parent"],
+                    prompt=r["prompt"],
+                    model=r["model"],
+                    media_type=r["media_type"],
+                    bytes=r["bytes"],
+                    created_at=r["created_at"],
+                )
+                for r in rows
+            ],
+            created_at=session["created_at"],
+            updated_at=session["updated_at"],
+        )
+
+    def _set_head(self, session_id: str, version: int) -> None:
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute(
+                "UPDATE edit_sessions SET head = ?, updated_at = ? WHERE id = ? AND updated_at >= ? AND ? < versions"
+                " RETURNING id",
+                (version, now, session_id, now - self._ttl, version),
+            ).fetchall()
+        if not rows:
+            raise EditSessionNotFound(session_id)
+
+    def _remove(self, session_ids: list[str]) -> None:
+        with self._lock:
+            for session_id in session_ids:
+                self._db.execute("DELETE FROM edit_versions WHERE session_id = ?", (session_id,))
+                self._db.execute("DELETE FROM edit_sessions WHERE id = ?", (session_id,))
+        for session_id in session_ids:
+            shutil.rmtree(self._folder(session_id), ignore_errors=True)
+
+    def _sweep(self) -> int:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id FROM edit_sessions WHERE updated_at < ?", (time.time() - self._ttl,)
+            ).fetchall()
+        self._remove([r["id"] for r in rows])
+        return len(rows)
+
+    # --- public API ---
+
+    async def create(self, data: bytes) -> EditSession:
+        """Start a session whose version 0 is data (PNG, JPEG or WebP)."""
+        sniffed = sniff_image_type(data[:16])
+        if sniffed is None:
+            raise ValueError("The image is not a PNG, JPEG or WebP")
+        await self._maybe_sweep()
+        session_id = f"es_{secrets.token_hex(8)}"
+        await asyncio.to_thread(self._create, session_id, data, sniffed[0])
+        self.counters["created"] += 1
+        self.counters["bytes_stored"] += len(data)
+        return await self.get(session_id)
+
+    async def get(self, session_id: str) -> EditSession:
+        """The session with its full version history; raises EditSessionNotFound."""
+        return await asyncio.to_thread(self._load, session_id)
+
+    def version(self, session: EditSession, version: int | None = None) -> EditVersion:
+        """Version `version` of session (its head when None); raises EditSessionNotFound."""
+        number = session.head if version is None else version
+        if not 0 <= number < len(session.versions):
+            raise EditSessionNotFound(f"{session.session_id} version {number}")
+        return session.versions[number]
+
+    def path(self, session_id: str, version: EditVersion) -> Path:
+        return self._path(session_id, version.version, version.media_type)
+
+    async def open(self, session_id: str, version: EditVersion) -> tuple[str, BinaryIO, str]:
+        """The stored image as an SDK file tuple, to send upstream as an edit input."""
+        data = await asyncio.to_thread(self.path(session_id, version).read_bytes)
+        self.counters["bytes_by_reference"] += len(data)
+        return f"{session_id}-{version.version}.{_EXTENSIONS[version.media_type]}", io.BytesIO(data), version.media_type
+
+    async def add(self, session_id: str, parent: int, data: bytes, *, prompt: str, model: str) -> EditVersion:
+        """Store an edit result as the session's new head version and return it."""
+        sniffed = sniff_image_type(data[:16])
+        media_type = sniffed[0] if sniffed is not None else "image/png"
+        number = await asyncio.to_thread(self._add, session_id, parent, prompt, model, data, media_type)
+        self.counters["edits"] += 1
+        self.counters["bytes_stored"] += len(data)
+        return EditVersion(
+            version=number,
+            parent=parent,
+            prompt=prompt,
+            model=model,
+            media_type=media_type,
+            bytes=len(data),
+            created_at=time.time(),
+        )
+
+    async def revert(self, session_id: str, version: int) -> EditSession:
+        """Make `version` the head again; later versions stay in the history."""
+        await asyncio.to_thread(self._set_head, session_id, version)
+        self.counters["reverts"] += 1
+        return await self.get(session_id)
+
+    async def delete(self, session_id: str) -> None:
+        await self.get(session_id)
+        await asyncio.to_thread(self._remove, [session_id])
+        self.counters["deleted"] += 1
+
+    async def _maybe_sweep(self) -> None:
+        now = time.monotonic()
+        if now - self._last_sweep < self._sweep_interval:
+            return
+        self._last_sweep = now
+        self.counters["expired"] += await asyncio.to_thread(self._sweep)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def stats(self) -> dict:
+        return dict(self.counters)
@@ -0,0 +1,165 @@
+"""Per-tenant weighted fair queuing of upstream capacity, with interactive and bulk priority classes."""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass, field
+
+from app.metrics import observe_queue_wait
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+PRIORITIES = (INTERACTIVE, BULK)
+DEFAULT_TENANT = "default"
+# Tenants not listed in the weights are reported together under this label (their scheduling is still per tenant).
+OTHER_TENANTS = "other"
+# Idle tenants' finish tags are forgotten once this many are remembered.
+MAX_REMEMBERED_TENANTS = 1024
+
+
+@dataclass(frozen=True)
+class Caller:
+    """Who an upstream call is made for: the tenant whose share it uses, and its priority class."""
+
+    tenant: str = DEFAULT_TENANT
+    priority: str = INTERACTIVE
+
+
+@dataclass(order=True)
+class _Ticket:
+    rank: int
+    finish: float
+    seq: int
+    caller: Caller = field(compare=False)
+    cost: float = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class FairQueue:
+    """
+    Hands out one model's upstream capacity to waiting calls. Interactive calls always go first; bulk calls
+    get the capacity interactive traffic leaves. Within a class, tenants share by weight (self-clocked fair
+    queuing): a call's finish tag is max(virtual time, the tenant's last finish tag) + cost / weight, with
+    cost its image count (at least 1), and the smallest tag is served next. A tenant with a deep backlog
+    therefore only delays its own calls.
+
+    One dispatcher task per queue first reserves capacity (reserve: request token + concurrency slot), then
+    picks the best waiting call *at that moment* and charges its cost (image tokens), so an interactive
+    call that arrives while capacity is being waited for is still served first.
+    """
+
+    def __init__(
+        self,
+        reserve: Callable[[], Awaitable[None]],
+        unreserve: Callable[[], Awaitable[None]],
+        charge: Callable[[float], Awaitable[None]],
+        *,
+        weights: Mapping[str, float] | None = None,
+        default_weight: float = 1.0,
+    ) -> None:
+        self._reserve = reserve
+        self._unreserve = unreserve
+        self._charge = charge
+        self._weights = weights or {}
+        self._default_weight = default_weight
+        self._heap: list[_Ticket] = []
+        self._seq = itertools.count()
+        self._vtime = {p: 0.0 for p in PRIORITIES}
+        self._last_finish: dict[tuple[str, str], float] = {}
+        self._dispatcher: asyncio.Task | None = None
+        self.queued = {p: 0 for p in PRIORITIES}
+        self.counters = {
+            p: {"calls": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0} for p in PRIORITIES
+        }
+        self.tenants: dict[str, dict] = {}
+
+    def _label(self, tenant: str) -> str:
+        return tenant if tenant in self._weights or tenant == DEFAULT_TENANT else OTHER_TENANTS
+
+    def _push(self, caller: Caller, cost: float) -> _Ticket:
+        rank = PRIORITIES.index(caller.priority)
+        vtime = self._vtime[caller.priority]
+        key = (caller.priority, caller.tenant)
+        if len(self._last_finish) > MAX_REMEMBERED_TENANTS:
+            self._last_finish = {k: f for k, f in self._last_finish.items() if f > self._vtime[k[0]]}
+        start = max(vtime, self._last_finish.get(key, 0.0))
+        finish = start + max(cost, 1.0) / self._weights.get(caller.tenant, self._default_weight)
+        self._last_finish[key] = finish
+        ticket = _Ticket(rank, finish, next(self._seq), caller, cost, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._heap, ticket)
+        self.queued[caller.priority] += 1
+        return ticket
+
+    def _pop(self) -> _Ticket | None:
+        while self._heap:
+            ticket = heapq.heappop(self._heap)
+            self.queued[ticket.caller.priority] -= 1
+            if not ticket.future.done():  # done here means the waiter was cancelled
+                self._vtime[ticket.caller.priority] = ticket.finish
+                return ticket
+        return None
+
+    async def _dispatch(self) -> None:
+        try:
+            while True:
+                # Do not reserve capacity for waiters that already went away.
+                while self._heap and self._heap[0].future.done():
+                    self.queued[heapq.heappop(self._heap).caller.priority] -= 1
+                if not self._heap:
+                    return
+                await self._reserve()
+                winner = self._pop()
+                if winner is None:
+                    await self._unreserve()
+                    continue
+                if winner.cost:
+                    await self._charge(winner.cost)
+                if winner.future.done():
+                    await self._unreserve()
+                    continue
+                winner.future.set_result(None)
+        finally:
+            self._dispatcher = None
+
+    async def wait(self, caller: Caller, cost: float = 1.0) -> float:
+        """
+        Wait for the caller's turn and return the seconds waited. On return the caller holds one concurrency
+        slot (released by the governor as usual) and has been charged its tokens.
+        """
+        start = time.monotonic()
+        ticket = self._push(caller, cost)
+        if self._dispatcher is None:
+            self._dispatcher = asyncio.create_task(self._dispatch(), name="fair-queue-dispatch")
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            if ticket.future.done() and not ticket.future.cancelled():
+                await self._unreserve()  # granted just as the waiter went away
+            raise
+        waited = time.monotonic() - start
+        self._record(caller, waited)
+        return waited
+
+    def _record(self, caller: Caller, waited: float) -> None:
+        label = self._label(caller.tenant)
+        observe_queue_wait(caller.priority, label, waited)
+        for counters in (
+            self.counters[caller.priority],
+            self.tenants.setdefault(label, {"calls": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}),
+        ):
+            counters["calls"] += 1
+            counters["wait_seconds_total"] += waited
+            counters["wait_seconds_max"] = max(counters["wait_seconds_max"], waited)
+
+    def stats(self) -> dict:
+        def summary(counters: dict) -> dict:
+            calls = counters["calls"]
+            return {**counters, "wait_seconds_avg": counters["wait_seconds_total"] / calls if calls else 0.0}
+
+        return {
+            "queued": dict(self.queued),
+            "priorities": {p: summary(c) for p, c in self.counters.items()},
+            "tenants": {t: summary(c) for t, c in self.tenants.items()},
+        }
@@ -0,0 +1,161 @@
+"""Content-addressed cache for generated images: in-memory LRU plus a TTL'd disk tier."""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from app.schemas.images import GenerateImageRequest
+from app.services.image_service import _generate_kwargs
+from app.services.shared_state import SharedState, SharedStateError
+
+
+def cache_key(body: GenerateImageRequest) -> str:
+    """Hash of the request after applying the same per-model defaults as the upstream call."""
+    kwargs = _generate_kwargs(
+        body.prompt.strip(),
+        model=body.model,
+        size=body.size,
+        quality=body.quality,
+        n=body.n,
+        style=body.style,
+    )
+    canonical = json.dumps(kwargs, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ImageCache:
+    """
+    Two-tier cache of image bytes keyed by cache_key() (or any hex digest).
+    Memory tier is LRU bounded by total bytes; disk tier (optional) expires entries after ttl_seconds.
+    The shared tier (optional, a cross-host SharedState) is checked last and expires entries the same way.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_memory_bytes: int,
+        directory: Path | None = None,
+        ttl_seconds: float = 86400,
+        suffix: str = ".png",
+        shared: SharedState | None = None,
+        name: str = "images",
+    ) -> None:
+        self._max_memory_bytes = max_memory_bytes
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._dir = directory
+        self._ttl = ttl_seconds
+        self._suffix = suffix
+        self._shared = shared
+        self._name = name
+        self._last_sweep = time.monotonic()
+        self.counters = {
+            "hits_memory": 0,
+            "hits_disk": 0,
+            "hits_shared": 0,
+            "misses": 0,
+            "evictions_memory": 0,
+            "evictions_disk": 0,
+        }
+        if self._dir is not None:
+            self._dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        assert self._dir is not None
+        return self._dir / key[:2] / f"{key}{self._suffix}"
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if len(data) > self._max_memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self._max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.counters["evictions_memory"] += 1
+
+    def _read_disk(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self._ttl:
+                path.unlink(missing_ok=True)
+                self.counters["evictions_disk"] += 1
+                return None
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _sweep_disk(self) -> None:
+        """Delete expired files from the disk tier."""
+        assert self._dir is not None
+        cutoff = time.time() - self._ttl
+        for path in self._dir.glob(f"*/*{self._suffix}"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    self.counters["evictions_disk"] += 1
+            except FileNotFoundError:
+                pass
+
+    async def get(self, key: str) -> bytes | None:
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self.counters["hits_memory"] += 1
+            return data
+        if self._dir is not None:
+            data = await asyncio.to_thread(self._read_disk, key)
+            if data is not None:
+                self._remember(key, data)
+                self.counters["hits_disk"] += 1
+                return data
+        if self._shared is not None:
+            try:
+                data = await self._shared.get(f"cache:{self._name}:{key}")
+            except SharedStateError:
+                data = None
+            if data is not None:
+                self._remember(key, data)
+                self.counters["hits_shared"] += 1
+                return data
+        self.counters["misses"] += 1
+        return None
+
+    async def put(self, key: str, data: bytes) -> None:
+        self._remember(key, data)
+        if self._shared is not None:
+            try:
+                await self._shared.set(f"cache:{self._name}:{key}", data, ttl=self._ttl)
+            except SharedStateError:
+                pass
+        if self._dir is None:
+            return
+        await asyncio.to_thread(self._write_disk, key, data)
+        if time.monotonic() - self._last_sweep > min(self._ttl, 3600):
+            self._last_sweep = time.monotonic()
+            await asyncio.to_thread(self._sweep_disk)
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "max_memory_bytes": self._max_memory_bytes,
+            "disk_dir": str(self._dir) if self._dir is not None else None,
+            "shared": self._shared is not None,
+            "ttl_seconds": self._ttl,
+        }
@@ -0,0 +1,94 @@
+"""Pooled async downloader for URL-form image results, with per-host limits, a deadline and a size cap."""
+
+import asyncio
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.metrics import time_stage
+from app.services.resilience import UpstreamError
+
+FETCH_CHUNK_SIZE = 256 * 1024
+
+
+class ImageFetchError(UpstreamError):
+    """An image URL could not be fetched (HTTP error, too large, or past the deadline)."""
+
+    def __init__(self, message: str, *, timed_out: bool = False) -> None:
+        super().__init__(message)
+        self.timed_out = timed_out
+
+
+class ImageFetcher:
+    """
+    Fetches image URLs on one shared keep-alive pool. At most per_host downloads run per host; each has
+    an overall deadline (not just per read, so a slow CDN cannot hold a request) and max_bytes cap,
+    checked against Content-Length up front and while streaming.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout: float = 30.0,
+        max_bytes: int = 50 << 20,
+        max_connections: int = 32,
+        per_host: int = 8,
+    ) -> None:
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 10.0)),
+            follow_redirects=True,
+        )
+        self._timeout = timeout
+        self._max_bytes = max_bytes
+        self._per_host = per_host
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+        self.counters = {"fetches": 0, "bytes": 0, "errors": 0, "too_large": 0, "timeouts": 0}
+
+    def _slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).hostname or ""
+        slot = self._hosts.get(host)
+        if slot is None:
+            slot = self._hosts[host] = asyncio.Semaphore(self._per_host)
+        return slot
+
+    async def _download(self, url: str) -> bytes:
+        async with self._client.stream("GET", url) as resp:
+            if resp.status_code >= 400:
+                raise ImageFetchError(f"Image URL answered {resp.status_code}")
+            length = resp.headers.get("content-length")
+            if length and length.isdigit() and int(length) > self._max_bytes:
+                self.counters["too_large"] += 1
+                raise ImageFetchError(f"Image is {int(length)} bytes, over the {self._max_bytes} byte limit")
+            body = bytearray()
+            async for chunk in resp.aiter_bytes(FETCH_CHUNK_SIZE):
+                body += chunk
+                if len(body) > self._max_bytes:
+                    self.counters["too_large"] += 1
+                    raise ImageFetchError(f"Image exceeds the {self._max_bytes} byte limit")
+            return bytes(body)
+
+    async def fetch(self, url: str) -> bytes:
+        try:
+            async with self._slot(url), asyncio.timeout(self._timeout):
+                with time_stage("image_fetch"):
+                    data = await self._download(url)
+        except TimeoutError:
+            self.counters["timeouts"] += 1
+            self.counters["errors"] += 1
+            raise ImageFetchError(f"Image URL did not download within {self._timeout:.0f}s", timed_out=True) from None
+        except httpx.HTTPError as e:
+            self.counters["errors"] += 1
+            raise ImageFetchError(f"Image URL fetch failed: {e}") from e
+        except ImageFetchError:
+            self.counters["errors"] += 1
+            raise
+        self.counters["fetches"] += 1
+        self.counters["bytes"] += len(data)
+        return data
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def stats(self) -> dict:
+        return {**self.counters, "hosts": len(self._hosts), "per_host": self._per_host}
@@ -0,0 +1,311 @@
+"""Durable image generation jobs: SQLite-backed queue with leased claims and an in-process worker pool."""
+
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+from openai import APIStatusError
+
+from app.services.fair_share import BULK, Caller
+from app.services.image_service import AsyncImageService
+from app.services.resilience import UpstreamError, is_retryable
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS image_jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    request TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_until REAL,
+    images INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    available_at REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS image_jobs_claim ON image_jobs (status, created_at);
+"""
+# Queues created before jobs could be retried lack the column.
+_MIGRATIONS = ("ALTER TABLE image_jobs ADD COLUMN available_at REAL NOT NULL DEFAULT 0",)
+# Backoff before a job that failed transiently is attempted again: full jitter up to base * 2^attempt.
+RETRY_BASE_SECONDS = 5.0
+RETRY_MAX_SECONDS = 120.0
+
+
+def _is_transient(e: BaseException) -> bool:
+    """Failures worth another attempt: connection errors, timeouts, 408/409/429/5xx and our own deadline/breaker."""
+    if isinstance(e, UpstreamError) or is_retryable(e):
+        return True
+    return isinstance(e, APIStatusError) and e.status_code == 429
+
+
+@dataclass
+class ImageJob:
+    """One row of the queue."""
+
+    job_id: str
+    status: str  # queued | running | completed | failed
+    request: dict
+    attempts: int
+    images: int
+    error: str | None
+    created_at: float
+    updated_at: float
+
+
+class LeaseLost(Exception):
+    """The job's lease expired and another worker claimed it."""
+
+
+class ImageJobQueue:
+    """
+    Jobs are rows in SQLite (WAL), so they survive restarts and can be shared by several server processes.
+    A worker claims a job by taking a lease (owner + lease_until) in one IMMEDIATE transaction, renews it while
+    the upstream call runs, and can only complete a job it still owns. A job whose lease expires (crashed
+    process) is claimed again, up to max_attempts; so is a job whose upstream call failed transiently, after a
+    jittered backoff. PNGs are written under results_dir/<job_id>/<index>.png.
+    """
+
+    def __init__(
+        self,
+        service: AsyncImageService,
+        db_path: Path,
+        results_dir: Path,
+        *,
+        workers: int = 4,
+        lease_seconds: float = 120.0,
+        max_attempts: int = 3,
+        poll_interval: float = 2.0,
+    ) -> None:
+        self._service = service
+        self._results_dir = results_dir
+        self._workers = workers
+        self._lease = lease_seconds
+        self._max_attempts = max_attempts
+        self._poll_interval = poll_interval
+        self._owner_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        results_dir.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False, timeout=30.0)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        for migration in _MIGRATIONS:
+            try:
+                self._db.execute(migration)
+            except sqlite3.OperationalError:
+                pass  # already applied
+        self._lock = threading.Lock()
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        self.counters = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "retried": 0,
+            "reclaimed": 0,
+            "lease_lost": 0,
+            "worker_errors": 0,
+        }
+
+    # --- storage (runs in a thread) ---
+
+    def _execute(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def _insert(self, job_id: str, request: dict) -> None:
+        now = time.time()
+        self._execute(
+            "INSERT INTO image_jobs (id, status, request, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?)",
+            (job_id, json.dumps(request), now, now),
+        )
+
+    def _claim(self, owner: str) -> sqlite3.Row | None:
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                # Jobs that crashed on their last allowed attempt are not retried again.
+                self._db.execute(
+                    "UPDATE image_jobs SET status = 'failed', error = 'Worker lost too many times', owner = NULL,"
+                    " updated_at = ? WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                    (now, now, self._max_attempts),
+                )
+                row = self._db.execute(
+                    "SELECT id, status FROM image_jobs WHERE (status = 'queued' AND available_at <= ?)"
+                    " OR (status = 'running' AND lease_until < ?) ORDER BY created_at LIMIT 1",
+                    (now, now),
+                ).fetchone()
+                if row is None:
+                    self._db.execute("COMMIT")
+                    return None
+                claimed = self._db.execute(
+                    "UPDATE image_jobs SET status = 'running', owner = ?, lease_until = ?, attempts = attempts + 1,"
+                    " updated_at = ? WHERE id = ? RETURNING *",
+                    (owner, now + self._lease, now, row["id"]),
+                ).fetchone()
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        if row["status"] == "running":
+            self.counters["reclaimed"] += 1
+        return claimed
+
+    def _owned_update(self, job_id: str, owner: str, assignments: str, params: tuple) -> None:
+        rows = self._execute(
+            f"UPDATE image_jobs SET {assignments}, updated_at = ? WHERE id = ? AND owner = ? RETURNING id",
+            (*params, time.time(), job_id, owner),
+        )
+        if not rows:
+            raise LeaseLost(job_id)
+
+    def _write_results(self, job_id: str, images: list[bytes]) -> None:
+        tmp = self._results_dir / f".{job_id}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir()
+        for i, data in enumerate(images):
+            (tmp / f"{i}.png").write_bytes(data)
+        final = self._results_dir / job_id
+        shutil.rmtree(final, ignore_errors=True)
+        os.replace(tmp, final)
+
+    # --- public API ---
+
+    async def submit(self, request: dict, caller: Caller | None = None) -> str:
+        """
+        Queue a generate request (GenerateImageRequest.model_dump()); returns the job id. The job's upstream
+        call is queued as caller (default tenant, bulk priority unless given).
+        """
+        job_id = f"imgjob_{uuid.uuid4().hex}"
+        caller = caller or Caller(priority=BULK)
+        request = {**request, "caller": {"tenant": caller.tenant, "priority": caller.priority}}
+        await asyncio.to_thread(self._insert, job_id, request)
+        self.counters["submitted"] += 1
+        self._wakeup.set()
+        return job_id
+
+    async def get(self, job_id: str) -> ImageJob | None:
+        rows = await asyncio.to_thread(self._execute, "SELECT * FROM image_jobs WHERE id = ?", (job_id,))
+        if not rows:
+            return None
+        row = rows[0]
+        return ImageJob(
+            job_id=row["id"],
+            status=row["status"],
+            request=json.loads(row["request"]),
+            attempts=row["attempts"],
+            images=row["images"],
+            error=row["error"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+        )
+
+    def result_path(self, job_id: str, index: int) -> Path:
+        return self._results_dir / job_id / f"{index}.png"
+
+    def start(self) -> None:
+        for i in range(self._workers):
+            owner = f"{self._owner_prefix}:{i}"
+            self._tasks.append(asyncio.create_task(self._work(owner), name=f"image-job-worker-{i}"))
+
+    async def close(self) -> None:
+        """Stop the workers; jobs they were running go back to the queue for the next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE image_jobs SET status = 'queued', owner = NULL, lease_until = NULL, attempts = attempts - 1"
+            " WHERE status = 'running' AND owner LIKE ?",
+            (f"{self._owner_prefix}:%",),
+        )
+        self._db.close()
+
+    # --- workers ---
+
+    async def _work(self, owner: str) -> None:
+        while True:
+            try:
+                row = await asyncio.to_thread(self._claim, owner)
+                if row is None:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), self._poll_interval)
+                    except TimeoutError:
+                        pass
+                    continue
+                await self._run(row, owner)
+            except LeaseLost:
+                self.counters["lease_lost"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # e.g. the database is locked or the results disk failed; a claimed job's lease runs out and
+                # it is claimed again, and this worker stays in the pool.
+                self.counters["worker_errors"] += 1
+                await asyncio.sleep(self._poll_interval)
+
+    async def _run(self, row: sqlite3.Row, owner: str) -> None:
+        job_id = row["id"]
+        request = json.loads(row["request"])
+        caller = Caller(**request.pop("caller", {"priority": BULK}))
+        renew = asyncio.create_task(self._renew(job_id, owner))
+        try:
+            images = await self._service.for_caller(caller).generate_all(**request)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            if _is_transient(e) and row["attempts"] < self._max_attempts:
+                delay = random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** row["attempts"]))
+                await asyncio.to_thread(
+                    self._owned_update,
+                    job_id,
+                    owner,
+                    "status = 'queued', owner = NULL, lease_until = NULL, available_at = ?, error = ?",
+                    (time.time() + delay, error),
+                )
+                self.counters["retried"] += 1
+                return
+            await asyncio.to_thread(
+                self._owned_update, job_id, owner, "status = 'failed', owner = NULL, error = ?", (error,)
+            )
+            self.counters["failed"] += 1
+            return
+        finally:
+            renew.cancel()
+        await asyncio.to_thread(self._write_results, job_id, images)
+        await asyncio.to_thread(
+            self._owned_update,
+            job_id,
+            owner,
+            "status = 'completed', owner = NULL, error = NULL, images = ?",
+            (len(images),),
+        )
+        self.counters["completed"] += 1
+
+    async def _renew(self, job_id: str, owner: str) -> None:
+        while True:
+            await asyncio.sleep(self._lease / 3)
+            try:
+                await asyncio.to_thread(
+                    self._owned_update, job_id, owner, "lease_until = ?", (time.time() + self._lease,)
+                )
+            except LeaseLost:
+                return  # the final update will raise LeaseLost again and the result is dropped
+
+    def stats(self) -> dict:
+        return {**self.counters, "workers": sum(not task.done() for task in self._tasks)}
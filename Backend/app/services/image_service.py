@@ -1,10 +1,19 @@
 """Image generation and editing via OpenAI API."""
 
+import asyncio
 import base64
-import io
+from collections.abc import AsyncIterator
 from typing import BinaryIO
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+
+from app.metrics import time_stage
+from app.services.fair_share import Caller
+from app.services.image_fetch import ImageFetcher
+from app.services.rate_limit import UpstreamGovernor
+from app.services.resilience import Resilience
+from app.services.references import ReferencePreparer, edit_target
+from app.services.upstream import UploadInput, call_upstream, rewind
 
 
 # Supported models and options (aligned with OpenAI API)
@@ -14,6 +23,17 @@ IMAGE_SIZES = {
     "dall-e-3": ["1024x1024", "1792x1024", "1024x1792"],
     "gpt-image": ["1024x1024", "1536x1024", "1024x1536", "auto"],
 }
+# Conservative per-model quotas (requests / images per minute); override with UPSTREAM_RATE_LIMITS.
+IMAGE_MODEL_LIMITS = {
+    "dall-e-2": {"rpm": 500, "ipm": 500},
+    "dall-e-3": {"rpm": 500, "ipm": 500},
+    "gpt-image-1": {"rpm": 50, "ipm": 50},
+    "gpt-image-1-mini": {"rpm": 100, "ipm": 100},
+    "gpt-image-1.5": {"rpm": 50, "ipm": 50},
+}
+# Bounds for URL-form results fetched without an ImageFetcher (sync service, CLI-style use).
+URL_FETCH_TIMEOUT = 30.0
+URL_FETCH_MAX_BYTES = 50 << 20
 
 
 def _read_image_bytes(item) -> bytes:
@@ -22,10 +42,60 @@ def _read_image_bytes(item) -> bytes:
         return base64.b64decode(item.b64_json)
     if getattr(item, "url", None):
         import urllib.request
-        return urllib.request.urlopen(item.url).read()
+        with urllib.request.urlopen(item.url, timeout=URL_FETCH_TIMEOUT) as resp:
+            data = resp.read(URL_FETCH_MAX_BYTES + 1)
+        if len(data) > URL_FETCH_MAX_BYTES:
+            raise ValueError(f"Image at {item.url} exceeds the {URL_FETCH_MAX_BYTES} byte limit")
+        return data
     raise ValueError(f"Unexpected response format: {item}")
 
 
+async def _read_image_bytes_async(item, fetcher: ImageFetcher | None = None) -> bytes:
+    """Async variant of _read_image_bytes; URLs go through the shared fetcher (else a thread)."""
+    if getattr(item, "b64_json", None):
+        with time_stage("b64_decode"):
+            return base64.b64decode(item.b64_json)
+    if fetcher is not None and getattr(item, "url", None):
+        return await fetcher.fetch(item.url)
+    return await asyncio.to_thread(_read_image_bytes, item)
+
+
+async def _b64_of(item, fetcher: ImageFetcher | None = None) -> str:
+    """The item's base64 text as upstream sent it (no decode); URL results are fetched and encoded."""
+    if getattr(item, "b64_json", None):
+        return item.b64_json
+    data = await _read_image_bytes_async(item, fetcher)
+    with time_stage("b64_encode"):
+        return base64.b64encode(data).decode("ascii")
+
+
+def _generate_kwargs(
+    prompt: str,
+    *,
+    model: str,
+    size: str | None,
+    quality: str | None,
+    n: int,
+    style: str | None,
+) -> dict:
+    """Build images.generate kwargs, applying per-model defaults and limits."""
+    if model == "dall-e-3":
+        n = 1
+    size = size or ("auto" if model.startswith("gpt-image") else "1024x1024")
+    kwargs: dict = {
+        "model": model,
+        "prompt": prompt,
+        "n": n,
+        "size": size,
+        "response_format": "b64_json",
+    }
+    if quality:
+        kwargs["quality"] = quality
+    if model == "dall-e-3" and style:
+        kwargs["style"] = style
+    return kwargs
+
+
 class ImageService:
     """Generate and edit images using OpenAI models."""
 
@@ -46,21 +116,7 @@ class ImageService:
         Generate image(s) from a text prompt. Returns the first image as PNG bytes.
         For n>1 the API returns multiple; we return the first only for the API response.
         """
-        if model == "dall-e-3":
-            n = 1
-        size = size or ("auto" if model.startswith("gpt-image") else "1024x1024")
-        kwargs: dict = {
-            "model": model,
-            "prompt": prompt,
-            "n": n,
-            "size": size,
-        }
-        if quality:
-            kwargs["quality"] = quality
-        if model == "dall-e-3" and style:
-            kwargs["style"] = style
-        kwargs["response_format"] = "b64_json"
-
+        kwargs = _generate_kwargs(prompt, model=model, size=size, quality=quality, n=n, style=style)
         resp = self._client.images.generate(**kwargs)
         if not resp.data:
             raise ValueError("No image data in response")
@@ -77,21 +133,7 @@ class ImageService:
         style: str | None = None,
     ) -> list[bytes]:
         """Generate up to n images; returns list of PNG bytes (DALL-E 3 only supports n=1)."""
-        if model == "dall-e-3":
-            n = 1
-        size = size or ("auto" if model.startswith("gpt-image") else "1024x1024")
-        kwargs: dict = {
-            "model": model,
-            "prompt": prompt,
-            "n": n,
-            "size": size,
-            "response_format": "b64_json",
-        }
-        if quality:
-            kwargs["quality"] = quality
-        if model == "dall-e-3" and style:
-            kwargs["style"] = style
-
+        kwargs = _generate_kwargs(prompt, model=model, size=size, quality=quality, n=n, style=style)
         resp = self._client.images.generate(**kwargs)
         return [_read_image_bytes(item) for item in resp.data]
 
@@ -116,3 +158,209 @@ class ImageService:
         if not resp.data:
             raise ValueError("No image data in response")
         return _read_image_bytes(resp.data[0])
+
+
+class AsyncImageService:
+    """
+    Async counterpart of ImageService; upstream calls do not block the event loop.
+    caller (tenant and priority class) places this service's calls in the governor's fair queue.
+    deadline overrides the endpoint deadline of each call (background jobs are not bound by request timeouts).
+    """
+
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        *,
+        governor: UpstreamGovernor | None = None,
+        resilience: Resilience | None = None,
+        references: ReferencePreparer | None = None,
+        fetcher: ImageFetcher | None = None,
+        caller: Caller | None = None,
+        deadline: float | None = None,
+    ) -> None:
+        self._client = client
+        self._governor = governor
+        self._resilience = resilience
+        self._references = references
+        self._fetcher = fetcher
+        self._caller = caller
+        self._deadline = deadline
+
+    def for_caller(self, caller: Caller) -> "AsyncImageService":
+        """The same service, making its calls on behalf of caller."""
+        return AsyncImageService(
+            self._client,
+            governor=self._governor,
+            resilience=self._resilience,
+            references=self._references,
+            fetcher=self._fetcher,
+            caller=caller,
+            deadline=self._deadline,
+        )
+
+    async def _call(self, raw_method, endpoint: str, quota_model: str, *, images: int, **kwargs):
+        """Invoke a with_raw_response method through the upstream protections; return the parsed result."""
+        raw = await call_upstream(
+            raw_method,
+            endpoint=endpoint,
+            quota_model=quota_model,
+            images=images,
+            governor=self._governor,
+            caller=self._caller,
+            resilience=self._resilience,
+            deadline=self._deadline,
+            **kwargs,
+        )
+        return raw.parse()
+
+    async def _generate(self, prompt: str, **options) -> list:
+        kwargs = _generate_kwargs(prompt, **options)
+        resp = await self._call(
+            self._client.images.with_raw_response.generate, "images.generate", kwargs["model"], images=kwargs["n"], **kwargs
+        )
+        return resp.data or []
+
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        model: str = "gpt-image-1.5",
+        size: str | None = None,
+        quality: str | None = None,
+        n: int = 1,
+        style: str | None = None,
+    ) -> bytes:
+        """Generate image(s) from a text prompt. Returns the first image as PNG bytes."""
+        data = await self._generate(prompt, model=model, size=size, quality=quality, n=n, style=style)
+        if not data:
+            raise ValueError("No image data in response")
+        return await _read_image_bytes_async(data[0], self._fetcher)
+
+    async def generate_b64(
+        self,
+        prompt: str,
+        *,
+        model: str = "gpt-image-1.5",
+        size: str | None = None,
+        quality: str | None = None,
+        n: int = 1,
+        style: str | None = None,
+    ) -> tuple[str, str | None]:
+        """Like generate(), but return the first image's base64 text as upstream sent it, and the revised prompt."""
+        data = await self._generate(prompt, model=model, size=size, quality=quality, n=n, style=style)
+        if not data:
+            raise ValueError("No image data in response")
+        return await _b64_of(data[0], self._fetcher), getattr(data[0], "revised_prompt", None)
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        *,
+        model: str = "gpt-image-1.5",
+        size: str | None = None,
+        quality: str | None = None,
+        partial_images: int = 2,
+    ) -> AsyncIterator[dict]:
+        """
+        Stream one gpt-image generation. Yields {"type": "partial_image", "index", "b64_json"} for each
+        partial frame, then {"type": "completed", "b64_json"}. Base64 is passed through without decoding.
+        Retries and the rate governor apply until upstream starts answering, not mid-stream.
+        """
+        if not model.startswith("gpt-image"):
+            raise ValueError("Partial image streaming is only supported by gpt-image models")
+        kwargs = _generate_kwargs(prompt, model=model, size=size, quality=quality, n=1, style=None)
+        stream = await self._call(
+            self._client.images.with_raw_response.generate,
+            "images.generate",
+            model,
+            images=1,
+            stream=True,
+            partial_images=partial_images,
+            **kwargs,
+        )
+        try:
+            async for event in stream:
+                if event.type == "image_generation.partial_image":
+                    yield {"type": "partial_image", "index": event.partial_image_index, "b64_json": event.b64_json}
+                elif event.type == "image_generation.completed":
+                    yield {"type": "completed", "b64_json": event.b64_json}
+        finally:
+            await stream.close()
+
+    async def generate_all(
+        self,
+        prompt: str,
+        *,
+        model: str = "gpt-image-1.5",
+        size: str | None = None,
+        quality: str | None = None,
+        n: int = 1,
+        style: str | None = None,
+    ) -> list[bytes]:
+        """Generate up to n images; returns list of PNG bytes (DALL-E 3 only supports n=1)."""
+        data = await self._generate(prompt, model=model, size=size, quality=quality, n=n, style=style)
+        return list(await asyncio.gather(*(_read_image_bytes_async(item, self._fetcher) for item in data)))
+
+    async def generate_all_b64(
+        self,
+        prompt: str,
+        *,
+        model: str = "gpt-image-1.5",
+        size: str | None = None,
+        quality: str | None = None,
+        n: int = 1,
+        style: str | None = None,
+    ) -> list[str]:
+        """Like generate_all(), but return the base64 text of each image as upstream sent it."""
+        data = await self._generate(prompt, model=model, size=size, quality=quality, n=n, style=style)
+        return list(await asyncio.gather(*(_b64_of(item, self._fetcher) for item in data)))
+
+    async def edit(
+        self,
+        prompt: str,
+        image_files: list[UploadInput],
+        *,
+        model: str = "gpt-image-1.5",
+    ) -> bytes:
+        """
+        Edit image(s) with a prompt. image_files: ordered list of binary file-like objects,
+        or (filename, file, content_type) tuples so the upstream sees the right image type.
+        With a ReferencePreparer, inputs are downscaled to what the model uses before upload.
+        """
+        item = await self._edit(prompt, image_files, model=model)
+        return await _read_image_bytes_async(item, self._fetcher)
+
+    async def edit_b64(
+        self,
+        prompt: str,
+        image_files: list[UploadInput],
+        *,
+        model: str = "gpt-image-1.5",
+    ) -> str:
+        """Like edit(), but return the result's base64 text as upstream sent it."""
+        item = await self._edit(prompt, image_files, model=model)
+        return await _b64_of(item, self._fetcher)
+
+    async def _edit(self, prompt: str, image_files: list[UploadInput], *, model: str):
+        if not image_files:
+            raise ValueError("At least one image is required")
+        if self._references is not None:
+            image_files = await self._references.prepare_all(image_files, edit_target(model))
+
+        async def send(**kwargs):
+            for f in image_files:
+                rewind(f)  # a retried attempt must upload the files again from the start
+            return await self._client.images.with_raw_response.edit(**kwargs)
+
+        resp = await self._call(
+            send,
+            "images.edit",
+            model,
+            images=1,
+            model=model,
+            image=image_files,
+            prompt=prompt,
+        )
+        if not resp.data:
+            raise ValueError("No image data in response")
+        return resp.data[0]
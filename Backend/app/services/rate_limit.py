@@ -0,0 +1,267 @@
+"""Client-side rate limiting for upstream OpenAI calls: token buckets plus an AIMD concurrency limit."""
+
+import asyncio
+import re
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from typing import Any
+
+from openai import RateLimitError
+
+from app.services.fair_share import Caller, FairQueue
+from app.services.resilience import UpstreamError
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class UpstreamQueueTimeout(UpstreamError):
+    """Work waited longer than the configured queue limit for upstream capacity."""
+
+    def __init__(self, model: str, waited: float, retry_after: float) -> None:
+        super().__init__(f"Upstream capacity for {model} exhausted; waited {waited:.1f}s")
+        self.retry_after = retry_after
+
+
+def parse_reset(value: str | None) -> float | None:
+    """Parse OpenAI reset durations such as '1s', '6m0s' or '250ms' into seconds."""
+    if not value:
+        return None
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(n) * _UNIT_SECONDS[unit] for n, unit in parts)
+
+
+class TokenBucket:
+    """
+    Refills `per_minute` tokens per minute up to the same capacity; waiters are served in order.
+    share is this process's part of a quota split between worker processes (applied to upstream headers too).
+    """
+
+    def __init__(self, per_minute: float, share: float = 1.0) -> None:
+        self.share = share
+        self.per_minute = per_minute * share
+        self._tokens = per_minute
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.per_minute, self._tokens + (now - self._updated) * self.per_minute / 60.0)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        amount = min(amount, self.per_minute)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) * 60.0 / self.per_minute)
+
+    def sync(self, limit: float | None, remaining: float | None, reset_seconds: float | None) -> None:
+        """Adopt the upstream view of the quota from rate-limit response headers."""
+        if limit:
+            self.per_minute = limit * self.share
+        if remaining is not None:
+            self._refill()
+            self._tokens = min(self._tokens, remaining * self.share)
+            if remaining == 0 and reset_seconds:
+                # Empty until upstream resets: express that as a debt the refill pays off.
+                self._tokens = -(reset_seconds * self.per_minute / 60.0) + 1
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+
+class AIMDLimiter:
+    """Concurrency limit that grows by ~1 per round trip on success and halves when throttled."""
+
+    def __init__(self, initial: int, minimum: int, maximum: int) -> None:
+        self.limit = float(initial)
+        self._min = minimum
+        self._max = maximum
+        self.in_flight = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, *, throttled: bool = False) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(float(self._min), self.limit / 2)
+            else:
+                self.limit = min(float(self._max), self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    async def giveback(self) -> None:
+        """Return an unused slot without counting it as a round trip."""
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+
+class ModelLimiter:
+    """
+    Requests-per-minute and images-per-minute buckets plus AIMD concurrency for one model, handed out
+    to waiting calls by a per-tenant fair queue.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        limits: Mapping[str, float],
+        concurrency: tuple[int, int, int],
+        share: float = 1.0,
+        tenant_weights: Mapping[str, float] | None = None,
+    ) -> None:
+        self.model = model
+        self.requests = TokenBucket(limits["rpm"], share) if limits.get("rpm") else None
+        self.images = TokenBucket(limits["ipm"], share) if limits.get("ipm") else None
+        self.concurrency = AIMDLimiter(*concurrency)
+        self.queue = FairQueue(self._reserve, self.concurrency.giveback, self._charge, weights=tenant_weights)
+        self.waiting = 0
+        self.counters = {"calls": 0, "throttled": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}
+
+    async def _reserve(self) -> None:
+        if self.requests is not None:
+            await self.requests.acquire()
+        await self.concurrency.acquire()
+
+    async def _charge(self, images: float) -> None:
+        if self.images is not None:
+            await self.images.acquire(images)
+
+    def retry_after(self) -> float:
+        """Rough seconds until the next request token, for the Retry-After of a call that gave up queueing."""
+        if self.requests is None or self.requests.per_minute <= 0:
+            return 1.0
+        return max(1.0, 60.0 / self.requests.per_minute)
+
+    def observe(self, headers: Mapping[str, str]) -> None:
+        def num(name: str) -> float | None:
+            value = headers.get(name)
+            try:
+                return float(value) if value is not None else None
+            except ValueError:
+                return None
+
+        if self.requests is not None:
+            self.requests.sync(
+                num("x-ratelimit-limit-requests"),
+                num("x-ratelimit-remaining-requests"),
+                parse_reset(headers.get("x-ratelimit-reset-requests")),
+            )
+        if self.images is not None:
+            self.images.sync(
+                num("x-ratelimit-limit-images"),
+                num("x-ratelimit-remaining-images"),
+                parse_reset(headers.get("x-ratelimit-reset-images")),
+            )
+
+    def stats(self) -> dict:
+        calls = self.counters["calls"]
+        return {
+            **self.counters,
+            "wait_seconds_avg": self.counters["wait_seconds_total"] / calls if calls else 0.0,
+            "queue_depth": self.waiting,
+            "in_flight": self.concurrency.in_flight,
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "rpm": self.requests.per_minute if self.requests else None,
+            "ipm": self.images.per_minute if self.images else None,
+            "fair_queue": self.queue.stats(),
+        }
+
+
+class UpstreamGovernor:
+    """
+    Admission control in front of upstream calls. Work waits for a request token, image tokens
+    and a concurrency slot; a 429 halves the model's concurrency, waits out Retry-After and
+    re-queues the call. Only a call that has waited longer than max_wait fails.
+    With several worker processes, share (1 / workers) gives each its slice of every quota.
+    Waiting calls are admitted by priority class, then by weighted fair share between tenants (FairQueue).
+    """
+
+    def __init__(
+        self,
+        limits: Mapping[str, Mapping[str, float]],
+        *,
+        default_limits: Mapping[str, float] | None = None,
+        concurrency: tuple[int, int, int] = (8, 1, 64),
+        max_wait: float = 120.0,
+        share: float = 1.0,
+        tenant_weights: Mapping[str, float] | None = None,
+    ) -> None:
+        self._limits = limits
+        self._default = default_limits or {}
+        self._concurrency = concurrency
+        self._max_wait = max_wait
+        self._share = share
+        self._tenant_weights = tenant_weights or {}
+        self._models: dict[str, ModelLimiter] = {}
+
+    def _limiter(self, model: str) -> ModelLimiter:
+        limiter = self._models.get(model)
+        if limiter is None:
+            limiter = ModelLimiter(
+                model, self._limits.get(model, self._default), self._concurrency, self._share, self._tenant_weights
+            )
+            self._models[model] = limiter
+        return limiter
+
+    async def run(
+        self, model: str, fn: Callable[[], Awaitable[Any]], *, images: int = 0, caller: Caller | None = None
+    ) -> Any:
+        """
+        Run fn() under the model's limits, queued as caller (default tenant, interactive). fn must return
+        a raw response (with .headers) so the buckets can follow upstream's rate-limit headers.
+        """
+        limiter = self._limiter(model)
+        caller = caller or Caller()
+        start = time.monotonic()
+        while True:
+            limiter.waiting += 1
+            try:
+                async with asyncio.timeout(self._max_wait - (time.monotonic() - start)):
+                    await limiter.queue.wait(caller, images)
+            except TimeoutError:
+                raise UpstreamQueueTimeout(model, time.monotonic() - start, limiter.retry_after()) from None
+            finally:
+                limiter.waiting -= 1
+            waited = time.monotonic() - start
+            limiter.counters["wait_seconds_total"] += waited
+            limiter.counters["wait_seconds_max"] = max(limiter.counters["wait_seconds_max"], waited)
+            limiter.counters["calls"] += 1
+            try:
+                raw = await fn()
+            except RateLimitError as e:
+                await limiter.concurrency.release(throttled=True)
+                limiter.counters["throttled"] += 1
+                limiter.observe(e.response.headers)
+                if getattr(e, "code", None) == "insufficient_quota":
+                    raise
+                retry_after = parse_reset(e.response.headers.get("retry-after")) or 1.0
+                if time.monotonic() - start + retry_after > self._max_wait:
+                    raise UpstreamQueueTimeout(model, time.monotonic() - start, retry_after) from e
+                await asyncio.sleep(retry_after)
+                continue
+            except BaseException:
+                await limiter.concurrency.release()
+                raise
+            await limiter.concurrency.release()
+            limiter.observe(raw.headers)
+            return raw
+
+    def stats(self) -> dict:
+        return {model: limiter.stats() for model, limiter in self._models.items()}
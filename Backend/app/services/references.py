@@ -0,0 +1,169 @@
+"""Reference image preparation: downscale and re-encode uploads to what the model uses, cached by content hash."""
+
+import asyncio
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, BinaryIO
+
+from app.metrics import time_stage
+from app.services.derivatives import render_reference
+from app.services.upstream import UploadInput, rewind
+from app.uploads import sniff_image_type
+
+if TYPE_CHECKING:
+    from app.services.derivatives import DerivativeService
+    from app.services.image_cache import ImageCache
+    from app.services.singleflight import SingleFlight
+
+# Largest reference side each image model makes use of (its biggest output side); more pixels only cost upload.
+EDIT_MAX_SIDE = {"dall-e-2": 1024}
+DEFAULT_EDIT_MAX_SIDE = 1536
+# Uploads are hashed and copied in chunks of this size, never read whole.
+CHUNK_BYTES = 1 << 20
+
+
+@dataclass(frozen=True)
+class ReferenceTarget:
+    """
+    Fit within width x height (never upscaled), or with crop=True cover-and-centre-crop to exactly that size.
+    lossy allows JPEG for images without transparency; otherwise the result is PNG.
+    """
+
+    width: int
+    height: int
+    crop: bool = False
+    lossy: bool = True
+
+    @property
+    def key(self) -> str:
+        return f"{self.width}x{self.height}.{'crop' if self.crop else 'fit'}.{'lossy' if self.lossy else 'png'}"
+
+
+def edit_target(model: str) -> ReferenceTarget:
+    """Target for images.edit inputs. dall-e-2 only accepts PNG."""
+    side = EDIT_MAX_SIDE.get(model, DEFAULT_EDIT_MAX_SIDE)
+    return ReferenceTarget(side, side, lossy=model != "dall-e-2")
+
+
+def video_target(size: str) -> ReferenceTarget:
+    """Target for videos.create input_reference: Sora uses it as the first frame, so it must match size exactly."""
+    try:
+        width, height = (int(v) for v in size.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Invalid video size {size!r}; expected WIDTHxHEIGHT") from None
+    return ReferenceTarget(width, height, crop=True)
+
+
+def _hash_file(file: BinaryIO, target_key: str) -> tuple[str, int]:
+    """sha256 of the file's content followed by the target key, and the content size."""
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := file.read(CHUNK_BYTES):
+        digest.update(chunk)
+        size += len(chunk)
+    digest.update(target_key.encode("ascii"))
+    return digest.hexdigest(), size
+
+
+def _spill(file: BinaryIO) -> str:
+    """Copy the file to a temporary path for the worker process to open; the caller removes it."""
+    file.seek(0)
+    with tempfile.NamedTemporaryFile(prefix="reference-", delete=False) as out:
+        shutil.copyfileobj(file, out, CHUNK_BYTES)
+    return out.name
+
+
+class ReferencePreparer:
+    """
+    Normalise reference images before upload: EXIF-rotate, downscale to the model's target and re-encode,
+    on the derivative worker pool when there is one (else a thread). Results are cached by (sha256 of the
+    upload, target), so a reference reused across many edits is only processed once; identical concurrent
+    uploads share one render. Images that cannot be decoded are passed through for upstream to judge.
+    Uploads are hashed in chunks and reach the worker as a temporary file, so a large spooled upload is
+    never held in memory whole.
+    """
+
+    def __init__(
+        self,
+        *,
+        cache: "ImageCache | None" = None,
+        pool: "DerivativeService | None" = None,
+        flight: "SingleFlight | None" = None,
+    ) -> None:
+        self._cache = cache
+        self._pool = pool
+        self._flight = flight
+        self.counters = {
+            "prepared": 0,
+            "normalized": 0,
+            "unchanged": 0,
+            "cache_hits": 0,
+            "errors": 0,
+            "bytes_in": 0,
+            "bytes_out": 0,
+        }
+
+    async def _normalize(self, file: BinaryIO, target: ReferenceTarget) -> bytes | None:
+        path = await asyncio.to_thread(_spill, file)
+        try:
+            args = (path, target.width, target.height, target.crop, target.lossy)
+            with time_stage("reference_normalize"):
+                if self._pool is not None:
+                    return await self._pool.run(render_reference, *args)
+                return await asyncio.to_thread(render_reference, *args)
+        finally:
+            os.unlink(path)
+
+    async def _lookup(self, key: str, file: BinaryIO, target: ReferenceTarget) -> bytes:
+        """Normalised bytes for key; b"" means send the upload unchanged (cached too, so the check is not repeated)."""
+        if self._cache is not None:
+            cached = await self._cache.get(key)
+            if cached is not None:
+                self.counters["cache_hits"] += 1
+                return cached
+        try:
+            out = await self._normalize(file, target) or b""
+        except Exception:
+            self.counters["errors"] += 1
+            return b""
+        if self._cache is not None:
+            await self._cache.put(key, out)
+        return out
+
+    async def prepare(self, upload: UploadInput, target: ReferenceTarget) -> UploadInput:
+        """Return the upload to send for target: a normalised (filename, file, content_type), or upload as given."""
+        file = upload[1] if isinstance(upload, tuple) else upload
+        rewind(upload)
+        key, size = await asyncio.to_thread(_hash_file, file, target.key)
+        if self._flight is not None:
+            out = await self._flight.do(key, lambda: self._lookup(key, file, target))
+        else:
+            out = await self._lookup(key, file, target)
+        self.counters["prepared"] += 1
+        self.counters["bytes_in"] += size
+        sniffed = sniff_image_type(out[:16]) if out else None  # always PNG or JPEG when set
+        if sniffed is None:
+            self.counters["unchanged"] += 1
+            self.counters["bytes_out"] += size
+            rewind(upload)
+            return upload
+        self.counters["normalized"] += 1
+        self.counters["bytes_out"] += len(out)
+        content_type, ext = sniffed
+        name = upload[0] if isinstance(upload, tuple) else getattr(file, "name", None) or "reference"
+        stem = str(name).rsplit("/", 1)[-1].rsplit(".", 1)[0] or "reference"
+        return f"{stem}.{ext}", io.BytesIO(out), content_type
+
+    async def prepare_all(self, uploads: list[UploadInput], target: ReferenceTarget) -> list[UploadInput]:
+        return list(await asyncio.gather(*(self.prepare(u, target) for u in uploads)))
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "cache": self._cache.stats() if self._cache is not None else None,
+            "coalesced": self._flight.counters["coalesced"] if self._flight is not None else 0,
+        }
@@ -0,0 +1,186 @@
+"""Retries with jittered backoff, per-endpoint deadlines and circuit breakers for upstream calls."""
+
+import asyncio
+import random
+import time
+import uuid
+from collections.abc import Awaitable, Callable, Mapping
+from typing import Any
+
+from openai import APIConnectionError, APIStatusError
+
+# Overall budget per endpoint (all attempts and backoff; time queued in the governor is not counted),
+# kept under the platform's 30 s request timeout.
+ENDPOINT_DEADLINES = {
+    "images.generate": 28.0,
+    "images.edit": 28.0,
+    "videos.create": 20.0,
+    "videos.remix": 20.0,
+    "videos.retrieve": 10.0,
+    "videos.download": 15.0,
+}
+DEFAULT_DEADLINE = 28.0
+# Do not start another attempt with less time than this left.
+MIN_ATTEMPT_SECONDS = 1.0
+
+
+class UpstreamError(Exception):
+    """Base for errors raised by the Backend's own upstream protection (not by OpenAI)."""
+
+
+class CircuitOpenError(UpstreamError):
+    """The endpoint's circuit breaker is open; the call was not attempted."""
+
+    def __init__(self, endpoint: str, retry_after: float) -> None:
+        super().__init__(f"Upstream {endpoint} is unavailable; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(UpstreamError):
+    """The endpoint's deadline passed before an attempt succeeded."""
+
+    def __init__(self, endpoint: str, deadline: float) -> None:
+        super().__init__(f"Upstream {endpoint} did not answer within {deadline:.0f}s")
+
+
+def is_retryable(e: BaseException) -> bool:
+    """Transient failures: connection errors, timeouts, 408/409 and 5xx. 429s are left to the governor."""
+    if isinstance(e, APIConnectionError):
+        return True
+    if isinstance(e, APIStatusError):
+        return e.status_code in (408, 409) or e.status_code >= 500
+    return False
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive transient failures and rejects calls for
+    `reset_seconds`; then lets a single probe through (half-open) and closes on its success.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float) -> None:
+        self._threshold = failure_threshold
+        self._reset = reset_seconds
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self.counters = {"opened": 0, "rejected": 0}
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self._reset:
+            return "half_open"
+        return "open"
+
+    def before_call(self, endpoint: str) -> None:
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return
+        self.counters["rejected"] += 1
+        retry_after = self._reset - (time.monotonic() - self._opened_at) if state == "open" else 1.0
+        raise CircuitOpenError(endpoint, max(retry_after, 1.0))
+
+    def abandon(self) -> None:
+        """The call was cancelled before it finished; let another probe through."""
+        self._probing = False
+
+    def record(self, ok: bool) -> None:
+        was_probe = self._probing
+        self._probing = False
+        if ok:
+            self._failures = 0
+            self._opened_at = None
+            return
+        self._failures += 1
+        if was_probe or self._failures >= self._threshold:
+            if self._opened_at is None or was_probe:
+                self.counters["opened"] += 1
+            self._opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {**self.counters, "state": self.state, "consecutive_failures": self._failures}
+
+
+class Resilience:
+    """Runs upstream calls with retries, an overall deadline and a circuit breaker per endpoint."""
+
+    def __init__(
+        self,
+        *,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        deadlines: Mapping[str, float] | None = None,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+    ) -> None:
+        self._max_attempts = max_attempts
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._deadlines = {**ENDPOINT_DEADLINES, **(deadlines or {})}
+        self._failure_threshold = failure_threshold
+        self._reset_seconds = reset_seconds
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self.counters = {"retries": 0, "deadline_exceeded": 0}
+
+    def _breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(self._failure_threshold, self._reset_seconds)
+            self._breakers[endpoint] = breaker
+        return breaker
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, min(max_delay, base * 2^attempt)]."""
+        return random.uniform(0, min(self._max_delay, self._base_delay * (2**attempt)))
+
+    async def run(
+        self,
+        endpoint: str,
+        attempt: Callable[[float, str], Awaitable[Any]],
+        *,
+        deadline: float | None = None,
+    ) -> Any:
+        """
+        Call attempt(timeout_seconds, idempotency_key) until it succeeds, fails permanently, or the
+        deadline passes. The same idempotency key is passed to every attempt of one logical call.
+        """
+        breaker = self._breaker(endpoint)
+        budget = deadline if deadline is not None else self._deadlines.get(endpoint, DEFAULT_DEADLINE)
+        end = time.monotonic() + budget
+        key = uuid.uuid4().hex
+        for n in range(self._max_attempts):
+            breaker.before_call(endpoint)
+            remaining = end - time.monotonic()
+            try:
+                async with asyncio.timeout(remaining):
+                    result = await attempt(remaining, key)
+            except asyncio.CancelledError:
+                breaker.abandon()
+                raise
+            except TimeoutError:
+                breaker.record(False)
+                self.counters["deadline_exceeded"] += 1
+                raise DeadlineExceeded(endpoint, budget) from None
+            except Exception as e:
+                if not is_retryable(e):
+                    breaker.record(True)
+                    raise
+                breaker.record(False)
+                delay = self._backoff(n)
+                if n + 1 >= self._max_attempts or end - time.monotonic() - delay < MIN_ATTEMPT_SECONDS:
+                    raise
+                self.counters["retries"] += 1
+                await asyncio.sleep(delay)
+                continue
+            breaker.record(True)
+            return result
+        raise AssertionError("unreachable")
+
+    def stats(self) -> dict:
+        return {**self.counters, "breakers": {name: b.stats() for name, b in self._breakers.items()}}
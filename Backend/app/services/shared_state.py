@@ -0,0 +1,284 @@
+"""State shared between worker processes (video job status, poller leases, worker stats, cached bytes)."""
+
+import asyncio
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shared_state (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL
+);
+"""
+
+SWEEP_INTERVAL_SECONDS = 60.0
+
+
+class SharedStateError(Exception):
+    """The shared state backend failed (connection lost, database locked, protocol error)."""
+
+
+def worker_id() -> str:
+    """Identifies this process across hosts; used as lease owner and stats key."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class SharedState(ABC):
+    """
+    Byte values under string keys with an optional TTL, as in Redis. `scope` is how far the state reaches:
+    "process" (MemoryState), "host" (SQLiteState: every worker on one machine) or "cluster" (RedisState).
+    """
+
+    scope = "process"
+
+    def __init__(self) -> None:
+        self.counters = {"reads": 0, "writes": 0, "hits": 0, "errors": 0}
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, *, ttl: float | None = None, only_new: bool = False) -> bool:
+        """Store value; with only_new=True only if the key is absent (or expired). Returns whether it was stored."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    async def scan(self, prefix: str) -> dict[str, bytes]:
+        """All live entries whose key starts with prefix."""
+
+    async def close(self) -> None:
+        pass
+
+    def _count(self, reads: int = 0, writes: int = 0, hits: int = 0) -> None:
+        self.counters["reads"] += reads
+        self.counters["writes"] += writes
+        self.counters["hits"] += hits
+
+    def stats(self) -> dict:
+        return {**self.counters, "backend": type(self).__name__, "scope": self.scope}
+
+
+class MemoryState(SharedState):
+    """Dict in this process: the single-worker default, and a stand-in for the other backends in tests."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._data: dict[str, tuple[bytes, float | None]] = {}
+
+    def _live(self, key: str) -> bytes | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._data[key]
+            return None
+        return value
+
+    async def get(self, key: str) -> bytes | None:
+        value = self._live(key)
+        self._count(reads=1, hits=value is not None)
+        return value
+
+    async def set(self, key: str, value: bytes, *, ttl: float | None = None, only_new: bool = False) -> bool:
+        if only_new and self._live(key) is not None:
+            return False
+        self._data[key] = (value, time.time() + ttl if ttl else None)
+        self._count(writes=1)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    async def scan(self, prefix: str) -> dict[str, bytes]:
+        out = {}
+        for key in [k for k in self._data if k.startswith(prefix)]:
+            value = self._live(key)
+            if value is not None:
+                out[key] = value
+        self._count(reads=1, hits=len(out))
+        return out
+
+    def stats(self) -> dict:
+        return {**super().stats(), "keys": len(self._data)}
+
+
+class SQLiteState(SharedState):
+    """
+    One SQLite table (WAL) that every worker on the host opens, like the image job queue. Put it on tmpfs
+    (sqlite:////dev/shm/...) to keep it in shared memory. Expired rows are ignored on read and swept
+    every minute.
+    """
+
+    scope = "host"
+
+    def __init__(self, path: Path) -> None:
+        super().__init__()
+        self._path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=30.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def _execute(self, sql: str, params: tuple = ()) -> list[tuple]:
+        try:
+            with self._lock:
+                if time.monotonic() - self._last_sweep > SWEEP_INTERVAL_SECONDS:
+                    self._last_sweep = time.monotonic()
+                    self._db.execute("DELETE FROM shared_state WHERE expires_at <= ?", (time.time(),))
+                return self._db.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            self.counters["errors"] += 1
+            raise SharedStateError(f"Shared state database error: {e}") from e
+
+    async def _run(self, sql: str, params: tuple = ()) -> list[tuple]:
+        return await asyncio.to_thread(self._execute, sql, params)
+
+    async def get(self, key: str) -> bytes | None:
+        rows = await self._run(
+            "SELECT value FROM shared_state WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time()),
+        )
+        self._count(reads=1, hits=bool(rows))
+        return rows[0][0] if rows else None
+
+    async def set(self, key: str, value: bytes, *, ttl: float | None = None, only_new: bool = False) -> bool:
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        if only_new:
+            rows = await self._run(
+                "INSERT INTO shared_state (key, value, expires_at) VALUES (?, ?, ?) ON CONFLICT (key) DO UPDATE"
+                " SET value = excluded.value, expires_at = excluded.expires_at"
+                " WHERE shared_state.expires_at IS NOT NULL AND shared_state.expires_at <= ? RETURNING key",
+                (key, value, expires_at, now),
+            )
+        else:
+            rows = await self._run(
+                "INSERT OR REPLACE INTO shared_state (key, value, expires_at) VALUES (?, ?, ?) RETURNING key",
+                (key, value, expires_at),
+            )
+        self._count(writes=bool(rows))
+        return bool(rows)
+
+    async def delete(self, key: str) -> None:
+        await self._run("DELETE FROM shared_state WHERE key = ?", (key,))
+
+    async def scan(self, prefix: str) -> dict[str, bytes]:
+        rows = await self._run(
+            "SELECT key, value FROM shared_state"
+            " WHERE substr(key, 1, ?) = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (len(prefix), prefix, time.time()),
+        )
+        self._count(reads=1, hits=len(rows))
+        return dict(rows)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def stats(self) -> dict:
+        return {**super().stats(), "path": str(self._path)}
+
+
+class RedisState(SharedState):
+    """
+    Any server speaking the Redis protocol (Redis, Valkey, KeyDB, ...), for workers on several hosts, through
+    redis-py's asyncio client over a pool of at most max_connections keep-alive connections (rediss:// for
+    TLS). Keys are prefixed with `namespace` so several deployments can share one server.
+    """
+
+    scope = "cluster"
+
+    def __init__(
+        self, url: str, *, namespace: str = "backend:", max_connections: int = 16, timeout: float = 5.0
+    ) -> None:
+        super().__init__()
+        # Imported here: only redis:// deployments need redis-py, and it stays out of every worker's startup.
+        from redis.asyncio import BlockingConnectionPool, Redis
+        from redis.exceptions import RedisError
+
+        self._pool = BlockingConnectionPool.from_url(
+            url,
+            max_connections=max_connections,
+            timeout=timeout,
+            socket_timeout=timeout,
+            socket_connect_timeout=timeout,
+            protocol=2,  # RESP2: servers older than Redis 6 and some compatibles have no HELLO
+        )
+        self._redis = Redis(connection_pool=self._pool)
+        self._redis_error = RedisError
+        kwargs = self._pool.connection_kwargs
+        self._server = f"{kwargs.get('host', '127.0.0.1')}:{kwargs.get('port', 6379)}/{kwargs.get('db', 0)}"
+        self._namespace = namespace
+
+    async def _call(self, command, *args, **kwargs):
+        try:
+            return await command(*args, **kwargs)
+        except self._redis_error as e:
+            self.counters["errors"] += 1
+            raise SharedStateError(f"Redis at {self._server} failed: {e!r}") from e
+
+    def _key(self, key: str) -> str:
+        return self._namespace + key
+
+    async def get(self, key: str) -> bytes | None:
+        value = await self._call(self._redis.get, self._key(key))
+        self._count(reads=1, hits=value is not None)
+        return value
+
+    async def set(self, key: str, value: bytes, *, ttl: float | None = None, only_new: bool = False) -> bool:
+        px = max(1, int(ttl * 1000)) if ttl else None
+        stored = await self._call(self._redis.set, self._key(key), value, px=px, nx=only_new)
+        self._count(writes=bool(stored))
+        return bool(stored)
+
+    async def delete(self, key: str) -> None:
+        await self._call(self._redis.delete, self._key(key))
+
+    async def _keys(self, pattern: str) -> list[bytes]:
+        return [key async for key in self._redis.scan_iter(match=pattern, count=500)]
+
+    async def scan(self, prefix: str) -> dict[str, bytes]:
+        pattern = "".join("\\" + c if c in "*?[]\\" else c for c in self._key(prefix)) + "*"
+        keys = await self._call(self._keys, pattern)
+        values = await self._call(self._redis.mget, keys) if keys else []
+        skip = len(self._namespace)
+        out = {k.decode()[skip:]: v for k, v in zip(keys, values) if v is not None}
+        self._count(reads=1, hits=len(out))
+        return out
+
+    async def close(self) -> None:
+        await self._redis.aclose(close_connection_pool=True)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "server": self._server, "max_connections": self._pool.max_connections}
+
+
+def open_shared_state(url: str) -> SharedState:
+    """
+    memory:// (this process), sqlite:///relative/path or sqlite:////absolute/path,
+    redis://[[user]:pass@]host:port/db or rediss://... (TLS).
+    """
+    scheme, _, rest = url.partition("://")
+    if scheme == "memory":
+        return MemoryState()
+    if scheme == "sqlite":
+        if not rest.startswith("/") or rest == "/":
+            raise ValueError(f"Invalid SHARED_STATE_URL {url!r}; expected sqlite:///path/to/state.sqlite3")
+        return SQLiteState(Path(rest[1:]))
+    if scheme in ("redis", "rediss"):
+        return RedisState(url)
+    raise ValueError(
+        f"Unsupported SHARED_STATE_URL {url!r}; use memory://, sqlite:///path, redis://host:port/db or rediss://..."
+    )
@@ -0,0 +1,54 @@
+"""Single entry point for upstream OpenAI calls: the rate governor around resilience (retries, deadline, breaker)."""
+
+from typing import BinaryIO
+
+from openai import NOT_GIVEN
+
+from app.metrics import time_upstream
+from app.services.fair_share import Caller
+from app.services.rate_limit import UpstreamGovernor
+from app.services.resilience import Resilience
+
+# A file-like object, or a (filename, file, content_type) tuple as the SDK accepts for multipart uploads.
+UploadInput = BinaryIO | tuple[str, BinaryIO, str]
+
+
+def rewind(upload: UploadInput) -> None:
+    """Seek an upload back to the start before (re)sending it."""
+    (upload[1] if isinstance(upload, tuple) else upload).seek(0)
+
+
+async def call_upstream(
+    raw_method,
+    *args,
+    endpoint: str,
+    quota_model: str | None = None,
+    images: int = 0,
+    governor: UpstreamGovernor | None = None,
+    caller: Caller | None = None,
+    resilience: Resilience | None = None,
+    deadline: float | None = None,
+    **kwargs,
+):
+    """
+    Call a with_raw_response (or with_streaming_response) SDK method and return its raw response.
+    quota_model=None skips the governor (cheap reads such as retrieve); caller decides the call's place in its queue.
+    The governor admits the call first; the deadline, retries and circuit breaker then apply to the upstream
+    attempts only, so time spent queued for local capacity neither uses up the deadline nor trips the breaker.
+    """
+
+    async def attempt(timeout, idempotency_key: str | None):
+        call_kwargs = dict(kwargs, timeout=timeout)
+        if idempotency_key is not None:
+            call_kwargs["extra_headers"] = {**(kwargs.get("extra_headers") or {}), "Idempotency-Key": idempotency_key}
+        with time_upstream(endpoint, quota_model):
+            return await raw_method(*args, **call_kwargs)
+
+    async def protected():
+        if resilience is None:
+            return await attempt(NOT_GIVEN, None)
+        return await resilience.run(endpoint, attempt, deadline=deadline)
+
+    if governor is None or quota_model is None:
+        return await protected()
+    return await governor.run(quota_model, protected, images=images, caller=caller)
@@ -0,0 +1,243 @@
+"""Registry of video jobs: one background poller per job, pushes status changes to watchers."""
+
+import asyncio
+import json
+import time
+from dataclasses import asdict, dataclass
+
+from openai import APIStatusError, AsyncOpenAI
+
+from app.services.shared_state import SharedState, SharedStateError, worker_id
+
+# Upstream has no job with this id (404). Kept like any finished job so it is not polled again, but never
+# reported as a job: get() raises VideoJobNotFound instead.
+NOT_FOUND = "not_found"
+TERMINAL_STATUSES = ("completed", "failed", NOT_FOUND)
+# Upstream answers that will not change on a later poll (bad or expired id, no access); 408/409/429 are transient.
+TRANSIENT_CLIENT_ERRORS = (408, 409, 429)
+# A job whose status cannot be read this many times in a row (transient errors) is given up as failed.
+MAX_POLL_ERRORS = 20
+
+
+@dataclass
+class JobState:
+    """Last known upstream state of a video job."""
+
+    job_id: str
+    status: str
+    progress: int | None = None
+    error: str | None = None
+    updated_at: float = 0.0
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class VideoJobNotFound(Exception):
+    """Upstream has no video job with this id."""
+
+
+class VideoJobTracker:
+    """
+    Polls each tracked job once per interval regardless of how many clients watch it.
+    The interval starts at min_interval, grows by `backoff` while nothing changes (up to
+    max_interval) and resets on every change. Finished jobs are kept for `retention` seconds.
+    An upstream 404 marks the id as not found and any other 4xx (but 408/409/429) fails the job, both at once;
+    transient errors fail it after MAX_POLL_ERRORS polls in a row, so a bogus id never leaves a poller behind.
+
+    With a SharedState, the worker processes agree on one upstream poller per job through a lease; it
+    writes each state to the shared store, and the other workers follow the store every min_interval.
+    A status read on any worker therefore sees the same job, and upstream is polled once per job.
+    """
+
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        *,
+        min_interval: float = 2.0,
+        max_interval: float = 30.0,
+        backoff: float = 1.5,
+        retention: float = 3600.0,
+        shared: SharedState | None = None,
+    ) -> None:
+        self._client = client
+        self._min = min_interval
+        self._max = max_interval
+        self._backoff = backoff
+        self._retention = retention
+        self._shared = shared
+        self._owner = worker_id()
+        # Outlives the longest pause between two polls of the leader, so a live leader never loses it.
+        self._lease = max_interval * 2 + 30.0
+        self._states: dict[str, JobState] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._first_poll: dict[str, asyncio.Future] = {}
+        self._watchers: dict[str, set[asyncio.Queue]] = {}
+        self.counters = {"upstream_polls": 0, "status_reads": 0, "shared_reads": 0, "shared_errors": 0}
+
+    def track(self, job_id: str) -> None:
+        """Start polling job_id in the background if it is not tracked yet."""
+        if job_id in self._tasks or job_id in self._states:
+            return
+        self._prune()
+        self._first_poll[job_id] = asyncio.get_running_loop().create_future()
+        self._tasks[job_id] = asyncio.create_task(self._poll(job_id), name=f"video-poll-{job_id}")
+
+    async def get(self, job_id: str) -> JobState:
+        """Current state; for a job not seen before this waits for its first poll. Raises VideoJobNotFound."""
+        self.counters["status_reads"] += 1
+        state = self._states.get(job_id)
+        if state is None:
+            self.track(job_id)
+            first = self._first_poll.get(job_id)
+            if first is not None:
+                await asyncio.shield(first)
+            state = self._states[job_id]
+        if state.status == NOT_FOUND:
+            raise VideoJobNotFound(job_id)
+        return state
+
+    def watch(self, job_id: str) -> asyncio.Queue:
+        """Queue that receives every state change of job_id; call unwatch() when done."""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._watchers.setdefault(job_id, set()).add(queue)
+        return queue
+
+    def unwatch(self, job_id: str, queue: asyncio.Queue) -> None:
+        watchers = self._watchers.get(job_id)
+        if watchers is not None:
+            watchers.discard(queue)
+            if not watchers:
+                del self._watchers[job_id]
+
+    def _publish(self, state: JobState) -> None:
+        self._states[state.job_id] = state
+        first = self._first_poll.pop(state.job_id, None)
+        if first is not None and not first.done():
+            first.set_result(None)
+        for queue in self._watchers.get(state.job_id, ()):
+            queue.put_nowait(state)
+
+    async def _fetch(self, job_id: str) -> JobState:
+        self.counters["upstream_polls"] += 1
+        try:
+            job = await self._client.videos.retrieve(job_id)
+        except APIStatusError as e:
+            if e.status_code == 404:
+                return JobState(job_id, NOT_FOUND, error="Video job not found", updated_at=time.time())
+            if 400 <= e.status_code < 500 and e.status_code not in TRANSIENT_CLIENT_ERRORS:
+                return JobState(job_id, "failed", error=str(e), updated_at=time.time())
+            raise
+        err = getattr(job, "error", None)
+        return JobState(
+            job_id,
+            getattr(job, "status", "unknown"),
+            progress=getattr(job, "progress", None),
+            error=str(getattr(err, "message", err)) if err else None,
+            updated_at=time.time(),
+        )
+
+    async def _lead(self, job_id: str) -> bool:
+        """Take or renew the shared poller lease for job_id; True when this process should poll upstream."""
+        if self._shared is None:
+            return True
+        key = f"video:poller:{job_id}"
+        owner = self._owner.encode()
+        try:
+            if await self._shared.set(key, owner, ttl=self._lease, only_new=True):
+                return True
+            if await self._shared.get(key) == owner:
+                await self._shared.set(key, owner, ttl=self._lease)
+                return True
+            return False
+        except SharedStateError:
+            self.counters["shared_errors"] += 1
+            return True
+
+    async def _follow(self, job_id: str) -> JobState | None:
+        """The state the leading worker last stored, if any."""
+        self.counters["shared_reads"] += 1
+        try:
+            data = await self._shared.get(f"video:job:{job_id}")
+        except SharedStateError:
+            self.counters["shared_errors"] += 1
+            return None
+        return JobState(**json.loads(data)) if data is not None else None
+
+    async def _store(self, state: JobState) -> None:
+        if self._shared is None:
+            return
+        try:
+            data = json.dumps(state.to_dict()).encode()
+            await self._shared.set(f"video:job:{state.job_id}", data, ttl=self._retention)
+        except SharedStateError:
+            self.counters["shared_errors"] += 1
+
+    async def _poll(self, job_id: str) -> None:
+        interval = self._min
+        errors = 0
+        try:
+            if self._shared is not None:
+                # Finished elsewhere (its lease may have expired since): nothing left to poll.
+                state = await self._follow(job_id)
+                if state is not None and state.done:
+                    self._publish(state)
+                    return
+            while True:
+                if not await self._lead(job_id):
+                    state = await self._follow(job_id)
+                    previous = self._states.get(job_id)
+                    if state is not None and (previous is None or previous.updated_at < state.updated_at):
+                        self._publish(state)
+                        if state.done:
+                            return
+                    await asyncio.sleep(self._min)
+                    continue
+                try:
+                    state = await self._fetch(job_id)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    errors += 1
+                    if errors >= MAX_POLL_ERRORS:
+                        error = f"Status unavailable after {errors} attempts: {e}"
+                        self._publish(JobState(job_id, "failed", error=error, updated_at=time.time()))
+                        await self._store(self._states[job_id])
+                        return
+                    if job_id not in self._states:
+                        self._publish(JobState(job_id, "unknown", error=str(e), updated_at=time.time()))
+                        await self._store(self._states[job_id])
+                    interval = min(interval * self._backoff, self._max)
+                    await asyncio.sleep(interval)
+                    continue
+                errors = 0
+                previous = self._states.get(job_id)
+                if previous is None or (previous.status, previous.progress) != (state.status, state.progress):
+                    self._publish(state)
+                    await self._store(state)
+                    interval = self._min
+                else:
+                    interval = min(interval * self._backoff, self._max)
+                if state.done:
+                    return
+                await asyncio.sleep(interval)
+        finally:
+            self._tasks.pop(job_id, None)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self._retention
+        for job_id in [j for j, s in self._states.items() if s.done and s.updated_at < cutoff]:
+            del self._states[job_id]
+
+    async def close(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {**self.counters, "active_pollers": len(self._tasks), "tracked_jobs": len(self._states)}
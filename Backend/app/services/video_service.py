@@ -1,14 +1,98 @@
 """Video generation and remix via OpenAI API."""
 
+import asyncio
+import re
 import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
 from typing import BinaryIO
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+
+from app.services.fair_share import Caller
+from app.services.rate_limit import UpstreamGovernor
+from app.services.resilience import Resilience
+from app.services.references import ReferencePreparer, video_target
+from app.services.upstream import UploadInput, call_upstream, rewind
 
 
 VIDEO_MODELS = ["sora-2", "sora-2-pro"]
+# Quota a remix is charged to when upstream does not say which model its source video used.
+DEFAULT_VIDEO_MODEL = "sora-2"
 VIDEO_SECONDS = ["4", "8", "12"]
 VIDEO_SIZES = ["720x1280", "1280x720", "1024x1792", "1792x1024"]
+# Conservative per-model job-creation quotas; override with UPSTREAM_RATE_LIMITS.
+VIDEO_MODEL_LIMITS = {
+    "sora-2": {"rpm": 25},
+    "sora-2-pro": {"rpm": 10},
+}
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(ValueError):
+    """Requested byte range lies outside the video."""
+
+    def __init__(self, size: int | None) -> None:
+        super().__init__("Requested range not satisfiable")
+        self.size = size
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    Parse a single-range Range header into inclusive (start, end) for a body of `size` bytes.
+    Returns None for headers we ignore (multi-range, other units); raises RangeNotSatisfiable.
+    """
+    m = _RANGE_RE.match(header.strip())
+    if not m or not (m.group(1) or m.group(2)):
+        return None
+    if m.group(1):
+        start = int(m.group(1))
+        end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+    else:
+        start, end = max(size - int(m.group(2)), 0), size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable(size)
+    return start, end
+
+
+@dataclass
+class VideoDownload:
+    """An open upstream video body; iterate `chunks()` once, then it closes itself."""
+
+    status_code: int
+    headers: dict[str, str]
+    _response: object
+    _skip: int = 0
+    _limit: int | None = None
+    _closed: bool = field(default=False, init=False)
+
+    async def chunks(self, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Yield body chunks as they arrive, trimmed to the range when upstream ignored it."""
+        skip, remaining = self._skip, self._limit
+        try:
+            async for chunk in self._response.iter_bytes(chunk_size):
+                if skip:
+                    if len(chunk) <= skip:
+                        skip -= len(chunk)
+                        continue
+                    chunk, skip = chunk[skip:], 0
+                if remaining is not None:
+                    chunk = chunk[:remaining]
+                    remaining -= len(chunk)
+                if chunk:
+                    yield chunk
+                if remaining == 0:
+                    break
+        finally:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        if not self._closed:
+            self._closed = True
+            await self._response.close()
 
 
 class VideoService:
@@ -81,3 +165,163 @@ class VideoService:
         """Start a remix job from an existing video. Returns new job id."""
         job = self._client.videos.remix(video_id, prompt=prompt)
         return job.id
+
+
+class AsyncVideoService:
+    """Async counterpart of VideoService built on AsyncOpenAI; caller places its calls in the governor's fair queue."""
+
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        *,
+        governor: UpstreamGovernor | None = None,
+        resilience: Resilience | None = None,
+        references: ReferencePreparer | None = None,
+        caller: Caller | None = None,
+    ) -> None:
+        self._client = client
+        self._governor = governor
+        self._resilience = resilience
+        self._references = references
+        self._caller = caller
+
+    async def _call(self, raw_method, endpoint: str, quota_model: str | None, *args, **kwargs):
+        """Invoke a with_raw_response method through the upstream protections; return the parsed result."""
+        raw = await call_upstream(
+            raw_method,
+            *args,
+            endpoint=endpoint,
+            quota_model=quota_model,
+            governor=self._governor,
+            caller=self._caller,
+            resilience=self._resilience,
+            **kwargs,
+        )
+        return raw.parse()
+
+    async def _retrieve(self, video_id: str):
+        return await self._call(self._client.videos.with_raw_response.retrieve, "videos.retrieve", None, video_id)
+
+    async def create(
+        self,
+        prompt: str,
+        *,
+        model: str = "sora-2",
+        seconds: str = "4",
+        size: str = "720x1280",
+        input_reference: UploadInput | None = None,
+    ) -> str:
+        """
+        Start a video generation job. Returns job id. With a ReferencePreparer, input_reference is
+        cropped and scaled to exactly `size` (Sora uses it as the first frame) before upload.
+        """
+        if input_reference is not None and self._references is not None:
+            input_reference = await self._references.prepare(input_reference, video_target(size))
+        kwargs: dict = {
+            "prompt": prompt,
+            "model": model,
+            "seconds": seconds,
+            "size": size,
+        }
+        if input_reference is not None:
+            kwargs["input_reference"] = input_reference
+
+        async def send(**kwargs):
+            if input_reference is not None:
+                rewind(input_reference)  # a retried attempt must upload the reference again
+            return await self._client.videos.with_raw_response.create(**kwargs)
+
+        job = await self._call(send, "videos.create", model, **kwargs)
+        return job.id
+
+    async def get_status(self, video_id: str) -> str:
+        """Return job status: e.g. pending, completed, failed."""
+        job = await self._retrieve(video_id)
+        return getattr(job, "status", "unknown")
+
+    async def download(self, video_id: str) -> bytes:
+        """Download completed video content. Raises if not completed or failed."""
+        job = await self._retrieve(video_id)
+        status = getattr(job, "status", "unknown")
+        if status == "failed":
+            raise RuntimeError(f"Video job failed: {getattr(job, 'error', None)}")
+        if status != "completed":
+            raise ValueError(f"Video not ready (status={status}). Poll until completed.")
+        resp = await self._client.videos.download_content(video_id)
+        return await resp.aread()
+
+    async def open_download(self, video_id: str, *, byte_range: str | None = None) -> VideoDownload:
+        """
+        Open a streaming download of a completed video without buffering it.
+        byte_range is a Range header value; it is forwarded upstream, and applied locally
+        if upstream answers 200 with the full body. Raises like download().
+        """
+        job = await self._retrieve(video_id)
+        status = getattr(job, "status", "unknown")
+        if status == "failed":
+            raise RuntimeError(f"Video job failed: {getattr(job, 'error', None)}")
+        if status != "completed":
+            raise ValueError(f"Video not ready (status={status}). Poll until completed.")
+        extra_headers = {"Range": byte_range} if byte_range else None
+
+        async def open_stream(video_id: str, **kwargs):
+            return await self._client.videos.with_streaming_response.download_content(video_id, **kwargs).__aenter__()
+
+        resp = await call_upstream(
+            open_stream,
+            video_id,
+            endpoint="videos.download",
+            resilience=self._resilience,
+            extra_headers=extra_headers,
+        )
+        upstream = resp.http_response
+        headers = {"Accept-Ranges": "bytes"}
+        length = upstream.headers.get("content-length")
+        if upstream.status_code == 206:
+            headers["Content-Range"] = upstream.headers.get("content-range", "")
+            if length:
+                headers["Content-Length"] = length
+            return VideoDownload(206, headers, resp)
+        span = None
+        if byte_range and length:
+            try:
+                span = parse_range(byte_range, int(length))
+            except RangeNotSatisfiable:
+                await resp.close()
+                raise
+        if span is None:
+            if length:
+                headers["Content-Length"] = length
+            return VideoDownload(200, headers, resp)
+        start, end = span
+        headers["Content-Range"] = f"bytes {start}-{end}/{length}"
+        headers["Content-Length"] = str(end - start + 1)
+        return VideoDownload(206, headers, resp, _skip=start, _limit=end - start + 1)
+
+    async def wait_until_done(
+        self,
+        video_id: str,
+        poll_interval_seconds: float = 10,
+        timeout_seconds: float | None = None,
+    ) -> str:
+        """Poll until status is completed or failed. Returns final status."""
+        start = time.monotonic()
+        while True:
+            status = await self.get_status(video_id)
+            if status in ("completed", "failed"):
+                return status
+            if timeout_seconds is not None and (time.monotonic() - start) >= timeout_seconds:
+                raise TimeoutError(f"Video job {video_id} did not complete within {timeout_seconds}s")
+            await asyncio.sleep(poll_interval_seconds)
+
+    async def remix(self, video_id: str, prompt: str) -> str:
+        """Start a remix job from an existing video. Returns new job id."""
+        # A remix renders with its source video's model, so it counts against that model's quota.
+        quota_model = None
+        if self._governor is not None:
+            source = await self._retrieve(video_id)
+            quota_model = getattr(source, "model", None) or DEFAULT_VIDEO_MODEL
+        job = await self._call(
+            self._client.videos.with_raw_response.remix, "videos.remix", quota_model, video_id, prompt=prompt
+        )
+        return job.id
@@ -0,0 +1,111 @@
+"""Local store of completed videos, keyed by job id, with size-capped LRU eviction."""
+
+import os
+import re
+import time
+from pathlib import Path
+
+_JOB_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+
+
+class VideoStoreWriter:
+    """Collects a video into a temp file; commit() publishes it to the store atomically."""
+
+    def __init__(self, store: "VideoStore", job_id: str, expected_size: int | None) -> None:
+        self._store = store
+        self._job_id = job_id
+        self._expected = expected_size
+        self._tmp = store._dir / f".{job_id}.{os.getpid()}.{time.monotonic_ns()}.part"
+        self._file = open(self._tmp, "wb")
+        self._written = 0
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+        self._written += len(chunk)
+
+    def commit(self) -> None:
+        """Publish the file if it is complete; otherwise discard it."""
+        self._file.close()
+        if self._expected is not None and self._written != self._expected:
+            self._tmp.unlink(missing_ok=True)
+            return
+        self._store._publish(self._job_id, self._tmp, self._written)
+
+    def abort(self) -> None:
+        self._file.close()
+        self._tmp.unlink(missing_ok=True)
+
+
+class VideoStore:
+    """
+    Completed MP4s on local disk. Access time is tracked via mtime, and the least recently
+    served files are deleted once the total exceeds max_bytes. accel_prefix, when set, is the
+    internal nginx location that maps to the store directory (X-Accel-Redirect).
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, *, accel_prefix: str = "") -> None:
+        self.accel_prefix = accel_prefix
+        self._dir = directory
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        for stale in self._dir.glob(".*.part"):
+            stale.unlink(missing_ok=True)
+        self._total = sum(p.stat().st_size for p in self._dir.glob("*.mp4"))
+        self.counters = {"hits": 0, "misses": 0, "stored": 0, "evictions": 0}
+
+    def _path(self, job_id: str) -> Path:
+        return self._dir / f"{job_id}.mp4"
+
+    def get(self, job_id: str) -> Path | None:
+        """Path of the stored video (and mark it recently used), or None."""
+        if not _JOB_ID_RE.match(job_id):
+            return None
+        path = self._path(job_id)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.counters["misses"] += 1
+            return None
+        self.counters["hits"] += 1
+        return path
+
+    def writer(self, job_id: str, expected_size: int | None) -> VideoStoreWriter | None:
+        """Writer for a new entry, or None if the job id or size is not storable."""
+        if not _JOB_ID_RE.match(job_id):
+            return None
+        if expected_size is not None and expected_size > self._max_bytes:
+            return None
+        return VideoStoreWriter(self, job_id, expected_size)
+
+    def _publish(self, job_id: str, tmp: Path, size: int) -> None:
+        path = self._path(job_id)
+        try:
+            self._total -= path.stat().st_size
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, path)
+        self._total += size
+        self.counters["stored"] += 1
+        self._evict()
+
+    def _evict(self) -> None:
+        if self._total <= self._max_bytes:
+            return
+        entries = []
+        for p in self._dir.glob("*.mp4"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()
+        self._total = sum(size for _, size, _ in entries)
+        for _, size, p in entries:
+            if self._total <= self._max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            self._total -= size
+            self.counters["evictions"] += 1
+
+    def stats(self) -> dict:
+        return {**self.counters, "bytes": self._total, "max_bytes": self._max_bytes}
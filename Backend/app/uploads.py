@@ -0,0 +1,101 @@
+"""Upload handling: request body size cap and image type sniffing from magic bytes."""
+
+from typing import BinaryIO
+
+from fastapi import HTTPException, UploadFile
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# (magic prefix, offset, content type, extension); the formats the image edit and video reference endpoints accept.
+IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", 0, "image/png", "png"),
+    (b"\xff\xd8\xff", 0, "image/jpeg", "jpg"),
+    (b"WEBP", 8, "image/webp", "webp"),
+)
+SNIFF_BYTES = 16
+
+
+def sniff_image_type(head: bytes) -> tuple[str, str] | None:
+    """Return (content type, extension) for a PNG, JPEG or WebP header, else None."""
+    for magic, offset, content_type, ext in IMAGE_SIGNATURES:
+        if head[offset : offset + len(magic)] == magic:
+            if content_type == "image/webp" and not head.startswith(b"RIFF"):
+                continue
+            return content_type, ext
+    return None
+
+
+async def image_upload(upload: UploadFile) -> tuple[str, BinaryIO, str]:
+    """
+    Validate an uploaded image by its magic bytes and return an SDK file tuple.
+    The spooled file is passed through as-is (no copy); the client's content type header is ignored.
+    """
+    head = await upload.read(SNIFF_BYTES)
+    await upload.seek(0)
+    sniffed = sniff_image_type(head)
+    if sniffed is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File {upload.filename or '?'} is not a PNG, JPEG or WebP image",
+        )
+    content_type, ext = sniffed
+    stem = (upload.filename or "image").rsplit(".", 1)[0] or "image"
+    return f"{stem}.{ext}", upload.file, content_type
+
+
+class UploadLimitMiddleware:
+    """
+    Reject multipart bodies over settings.max_upload_mb with 413: up front from Content-Length,
+    otherwise as soon as the streamed body crosses the limit (chunked uploads).
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _is_multipart(scope):
+            await self.app(scope, receive, send)
+            return
+        settings = getattr(scope["app"].state, "settings", None)
+        max_bytes = settings.max_upload_mb << 20 if settings is not None else 0
+        if max_bytes <= 0:
+            await self.app(scope, receive, send)
+            return
+        declared = _header(scope, b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > max_bytes:
+            await _too_large(max_bytes)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    raise HTTPException(status_code=413, detail=_too_large_detail(max_bytes))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def _too_large_detail(max_bytes: int) -> str:
+    return f"Upload exceeds {max_bytes >> 20} MB"
+
+
+def _too_large(max_bytes: int) -> JSONResponse:
+    # Connection: close so the client stops sending a body we are not going to read.
+    return JSONResponse({"detail": _too_large_detail(max_bytes)}, status_code=413, headers={"Connection": "close"})
+
+
+def _header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _is_multipart(scope: Scope) -> bool:
+    content_type = _header(scope, b"content-type") or ""
+    return content_type.startswith("multipart/form-data")
@@ -0,0 +1,41 @@
+"""Post-startup warm-up: pay one-off costs in the background instead of on the first user request."""
+
+import asyncio
+import time
+
+from starlette.datastructures import State
+
+from app.services.derivatives import supported_formats
+
+# Spawning pool workers is CPU-heavy (each imports Pillow); on a 1-vCPU host doing it during
+# startup delays the first response, so it waits until the server has been up for a moment.
+WORKER_SPAWN_DELAY_SECONDS = 2.0
+
+
+class WarmUp:
+    """
+    Runs once after startup without delaying it: opens the pooled upstream connection (DNS, TCP,
+    TLS, HTTP/2) with a cheap models.list call, then spawns the derivative workers.
+    """
+
+    def __init__(self) -> None:
+        self.counters: dict = {"done": False, "seconds": 0.0, "upstream_connected": False}
+
+    async def run(self, state: State) -> None:
+        start = time.perf_counter()
+        if state.openai_client is not None:
+            try:
+                await state.openai_client.models.list(timeout=10)
+                self.counters["upstream_connected"] = True
+            except Exception as e:
+                # Any HTTP answer (even 401/404) means the connection is up; only transport errors count.
+                self.counters["upstream_connected"] = getattr(e, "status_code", None) is not None
+        if state.derivatives is not None:
+            await asyncio.sleep(WORKER_SPAWN_DELAY_SECONDS)
+            await asyncio.to_thread(state.derivatives.warm_up)
+            await asyncio.to_thread(supported_formats)
+        self.counters["done"] = True
+        self.counters["seconds"] = round(time.perf_counter() - start, 3)
+
+    def stats(self) -> dict:
+        return dict(self.counters)
@@ -0,0 +1 @@
+"""Benchmarks and load tests run against a local fake OpenAI server (no API spend)."""
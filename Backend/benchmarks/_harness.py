@@ -0,0 +1,94 @@
+"""Helpers for starting the fake OpenAI server and the Backend as subprocesses."""
+
+import contextlib
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from collections.abc import Iterator
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(url: str, timeout: float = 20.0) -> None:
+    """Block until url answers (any HTTP status) or raise TimeoutError."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return
+        except urllib.error.HTTPError:
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError(f"{url} did not come up within {timeout}s")
+
+
+@contextlib.contextmanager
+def run_process(args: list[str], health_url: str, env: dict[str, str] | None = None) -> Iterator[subprocess.Popen]:
+    """Run a server subprocess from the Backend dir until the block exits."""
+    proc = subprocess.Popen(
+        [sys.executable, *args],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **(env or {})},
+    )
+    try:
+        wait_for(health_url)
+        yield proc
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+@contextlib.contextmanager
+def fake_openai(*extra_args: str) -> Iterator[str]:
+    """Start benchmarks.fake_openai; yields its /v1 base URL."""
+    port = free_port()
+    with run_process(
+        ["-m", "benchmarks.fake_openai", "--port", str(port), *extra_args],
+        f"http://127.0.0.1:{port}/_stats",
+    ):
+        yield f"http://127.0.0.1:{port}/v1"
+
+
+@contextlib.contextmanager
+def backend_process(
+    openai_base_url: str, env: dict[str, str] | None = None, *uvicorn_args: str
+) -> Iterator[tuple[str, subprocess.Popen]]:
+    """Start the Backend pointed at openai_base_url; yields its base URL and process."""
+    port = free_port()
+    with run_process(
+        ["-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning", *uvicorn_args],
+        f"http://127.0.0.1:{port}/health",
+        env={"OPENAI_BASE_URL": openai_base_url, "OPENAI_API_KEY": "sk-fake", **(env or {})},
+    ) as proc:
+        yield f"http://127.0.0.1:{port}", proc
+
+
+@contextlib.contextmanager
+def backend(openai_base_url: str, env: dict[str, str] | None = None, *uvicorn_args: str) -> Iterator[str]:
+    """Start the Backend pointed at openai_base_url; yields its base URL."""
+    with backend_process(openai_base_url, env, *uvicorn_args) as (base_url, _):
+        yield base_url
+
+
+def rss_mb(pid: int) -> tuple[float, float] | None:
+    """(current, peak) resident set size of pid in MB, from /proc; None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+    except OSError:
+        return None
+    return int(fields["VmRSS"].split()[0]) / 1024, int(fields["VmHWM"].split()[0]) / 1024
@@ -0,0 +1,75 @@
+"""
+Microbenchmark: per-request cost of the OpenAI client dependency.
+
+"per-request" rebuilds what the old dependency did on every call: get_settings()
+(re-reading .env files) plus a fresh AsyncOpenAI with its own connection pool, so
+each upstream call also opens a new connection. "shared" uses one client built
+once, as the app lifespan now does. Both variants issue sequential images.generate
+calls to the fake OpenAI server with zero simulated latency.
+
+    python -m benchmarks.client_overhead --calls 200
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from openai import AsyncOpenAI
+
+from app.config import get_settings
+
+# The old dependency re-read the .env files on every call; get_settings is memoised now.
+_load_settings = get_settings.__wrapped__
+from app.dependencies import build_async_openai_client
+from benchmarks._harness import fake_openai
+
+
+def _bench_construction(calls: int) -> tuple[float, float]:
+    """Return (old, new) microseconds for obtaining a client, without any I/O."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        AsyncOpenAI(api_key=_load_settings().effective_openai_key)
+    old = (time.perf_counter() - start) / calls * 1e6
+    shared = object()
+    state = type("State", (), {"openai_client": shared})()
+    start = time.perf_counter()
+    for _ in range(calls):
+        _ = state.openai_client
+    new = (time.perf_counter() - start) / calls * 1e6
+    return old, new
+
+
+async def _bench_calls(calls: int) -> tuple[float, float]:
+    """Return (old, new) milliseconds per images.generate round trip."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        client = AsyncOpenAI(api_key=_load_settings().effective_openai_key)
+        await client.images.generate(prompt="bench", model="gpt-image-1.5")
+        await client.close()
+    old = (time.perf_counter() - start) / calls * 1e3
+
+    client = build_async_openai_client(get_settings())
+    start = time.perf_counter()
+    for _ in range(calls):
+        await client.images.generate(prompt="bench", model="gpt-image-1.5")
+    new = (time.perf_counter() - start) / calls * 1e3
+    await client.close()
+    return old, new
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+    with fake_openai("--latency", "0") as openai_url:
+        os.environ["OPENAI_BASE_URL"] = openai_url
+        os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+        old_us, new_us = _bench_construction(args.calls)
+        old_ms, new_ms = asyncio.run(_bench_calls(args.calls))
+    print(f"client acquisition: per-request {old_us:,.0f} us, shared {new_us:,.2f} us")
+    print(f"generate round trip: per-request {old_ms:.2f} ms, shared {new_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
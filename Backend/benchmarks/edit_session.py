@@ -0,0 +1,115 @@
+"""
+Byte benchmark: a chain of iterative edits, re-uploading the working image each step vs an edit session.
+
+The fake upstream returns images padded to --image-kb, so transfer sizes are realistic. Request and response
+bodies between the client and the Backend are counted (headers are not):
+
+- re-upload: every step posts the current image to /api/images/edit and downloads the full result,
+- re-upload (JSON): the same with Accept: application/json, i.e. imageBase64 both ways as the frontend does,
+- session: one upload to /api/images/sessions, then /sessions/{id}/edit per step (metadata only), then one
+  download of the final version.
+
+The totals include the session's one upload and one download; the per-step figure excludes them.
+
+    python -m benchmarks.edit_session --steps 10 --image-kb 1500
+"""
+
+import argparse
+import asyncio
+import base64
+import time
+
+import httpx
+
+from benchmarks._harness import backend, fake_openai
+from benchmarks.fake_openai import padded_png
+
+
+class _Counter:
+    def __init__(self) -> None:
+        self.up = 0
+        self.down = 0
+        self.steps = 0  # bytes of the edit steps alone (both directions)
+
+    async def request(self, request: httpx.Request) -> None:
+        self.up += len(request.read())
+
+    async def response(self, response: httpx.Response) -> None:
+        self.down += len(await response.aread())
+
+
+def _client(base_url: str, counter: _Counter) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=base_url,
+        timeout=60,
+        event_hooks={"request": [counter.request], "response": [counter.response]},
+    )
+
+
+async def _reupload(base_url: str, image: bytes, steps: int, as_json: bool) -> _Counter:
+    counter = _Counter()
+    headers = {"Accept": "application/json"} if as_json else {}
+    async with _client(base_url, counter) as client:
+        for i in range(steps):
+            resp = await client.post(
+                "/api/images/edit",
+                data={"prompt": f"step {i}"},
+                files=[("files", ("current.png", image, "image/png"))],
+                headers=headers,
+            )
+            resp.raise_for_status()
+            image = base64.b64decode(resp.json()["imageBase64"]) if as_json else resp.content
+    counter.steps = counter.up + counter.down
+    return counter
+
+
+async def _session(base_url: str, image: bytes, steps: int) -> _Counter:
+    counter = _Counter()
+    async with _client(base_url, counter) as client:
+        resp = await client.post("/api/images/sessions", files={"file": ("start.png", image, "image/png")})
+        resp.raise_for_status()
+        session_id = resp.json()["session_id"]
+        before = counter.up + counter.down
+        for i in range(steps):
+            resp = await client.post(f"/api/images/sessions/{session_id}/edit", data={"prompt": f"step {i}"})
+            resp.raise_for_status()
+        counter.steps = counter.up + counter.down - before
+        (await client.get(resp.json()["version"]["url"])).raise_for_status()
+        history = (await client.get(f"/api/images/sessions/{session_id}")).json()
+        assert len(history["versions"]) == steps + 1, history
+    return counter
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--image-kb", type=int, default=1500, help="Size of the starting image and of every result")
+    parser.add_argument("--latency", type=float, default=0.1, help="Fake upstream seconds per edit")
+    args = parser.parse_args()
+    image = padded_png(args.image_kb * 1024)
+    env = {"EDIT_SESSIONS_DIR": ".cache/bench_edit_sessions", "EDIT_SESSIONS_DB": ".cache/bench_edit_sessions.sqlite3"}
+    with (
+        fake_openai("--latency", str(args.latency), "--image-bytes", str(len(image))) as openai_url,
+        backend(openai_url, env) as base_url,
+    ):
+        results = {}
+        for label, run in (
+            ("re-upload", lambda: _reupload(base_url, image, args.steps, as_json=False)),
+            ("re-upload (JSON)", lambda: _reupload(base_url, image, args.steps, as_json=True)),
+            ("session", lambda: _session(base_url, image, args.steps)),
+        ):
+            start = time.perf_counter()
+            counter = asyncio.run(run())
+            results[label] = (counter, time.perf_counter() - start)
+    baseline = results["re-upload"][0].up + results["re-upload"][0].down
+    for label, (counter, seconds) in results.items():
+        total = counter.up + counter.down
+        print(
+            f"{label:>17}: up {counter.up / 1e6:7.2f} MB, down {counter.down / 1e6:7.2f} MB,"
+            f" total {total / 1e6:7.2f} MB ({total / baseline:6.1%}), {counter.steps / args.steps / 1e3:9.1f} kB"
+            f" per edit step, in {seconds:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Load benchmark: interactive latency while another tenant floods the same upstream quota.
+
+The Backend's governor is limited to --rpm image requests per minute. One tenant ("campaign") posts a
+--bulk-items batch at once; after its burst has used up the quota, another tenant ("studio") sends
+--interactive generate calls one after another. Three runs are compared:
+
+- studio alone (the baseline),
+- studio with the campaign batch queued as bulk (the default for /api/images/batch),
+- studio with the same batch forced to X-Priority: interactive, so only the per-tenant fair share separates them.
+
+    python -m benchmarks.fair_share --rpm 60 --bulk-items 100 --interactive 10
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks._harness import backend, fake_openai
+from benchmarks.load import percentile
+
+
+async def _run(base_url: str, args: argparse.Namespace, bulk_priority: str | None) -> dict:
+    async with httpx.AsyncClient(base_url=base_url, timeout=900, limits=httpx.Limits(max_connections=None)) as client:
+
+        async def campaign() -> tuple[int, float]:
+            headers = {"X-Tenant-ID": "campaign"}
+            if bulk_priority:
+                headers["X-Priority"] = bulk_priority
+            body = {
+                "items": [{"prompt": f"campaign {i}"} for i in range(args.bulk_items)],
+                "concurrency": args.bulk_items,
+            }
+            start = time.perf_counter()
+            ok = 0
+            async with client.stream("POST", "/api/images/batch", json=body, headers=headers) as resp:
+                async for line in resp.aiter_lines():
+                    ok += bool(line) and json.loads(line)["status"] == "ok"
+            return ok, time.perf_counter() - start
+
+        async def studio() -> list[float]:
+            latencies = []
+            for i in range(args.interactive):
+                start = time.perf_counter()
+                resp = await client.post(
+                    "/api/images/generate",
+                    json={"prompt": f"studio {i}"},
+                    headers={"X-Tenant-ID": "studio", "Cache-Control": "no-cache"},
+                )
+                resp.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+            return latencies
+
+        bulk = asyncio.create_task(campaign()) if bulk_priority is not None else None
+        await asyncio.sleep(args.head_start)
+        latencies = sorted(await studio())
+        bulk_ok, bulk_wall = await bulk if bulk is not None else (0, 0.0)
+        queue = (await client.get("/stats")).json()["governor"]["gpt-image-1.5"]["fair_queue"]
+    return {
+        "interactive_p50": percentile(latencies, 50),
+        "interactive_p95": percentile(latencies, 95),
+        "bulk_ok": bulk_ok,
+        "bulk_wall": bulk_wall,
+        "queue": queue,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rpm", type=int, default=60, help="Backend quota for gpt-image-1.5 (requests and images/min)")
+    parser.add_argument("--bulk-items", type=int, default=100)
+    parser.add_argument("--interactive", type=int, default=10, help="Sequential interactive generate calls")
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake upstream seconds per image")
+    parser.add_argument("--head-start", type=float, default=2.0, help="Seconds the batch runs before studio starts")
+    args = parser.parse_args()
+    env = {
+        "UPSTREAM_RATE_LIMITS": json.dumps({"gpt-image-1.5": {"rpm": args.rpm, "ipm": args.rpm}}),
+        "UPSTREAM_MAX_QUEUE_SECONDS": "900",
+        "IMAGE_BATCH_MAX_CONCURRENCY": str(args.bulk_items),
+        "TENANT_WEIGHTS": json.dumps({"campaign": 1, "studio": 1}),
+        # The tenants name themselves with X-Tenant-ID.
+        "TRUST_CLIENT_HEADERS": "true",
+    }
+    for label, bulk_priority in (("alone", None), ("bulk batch", "bulk"), ("batch as interactive", "interactive")):
+        with fake_openai("--latency", str(args.latency)) as openai_url, backend(openai_url, env) as base_url:
+            r = asyncio.run(_run(base_url, args, bulk_priority))
+        waits = r["queue"]["tenants"]
+        print(
+            f"{label:>20}: studio p50 {r['interactive_p50']:6.2f}s p95 {r['interactive_p95']:6.2f}s"
+            + (f" | campaign {r['bulk_ok']}/{args.bulk_items} ok in {r['bulk_wall']:.1f}s" if bulk_priority else "")
+            + " | avg queue wait "
+            + ", ".join(f"{t} {w['wait_seconds_avg']:.2f}s" for t, w in sorted(waits.items()))
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Local stand-in for the OpenAI image and video endpoints used by the Backend.
+
+Responses are shaped like the real API so the openai SDK parses them; latency is
+simulated with asyncio.sleep so many calls can overlap. Run standalone:
+
+    python -m benchmarks.fake_openai --port 9100 --latency 2.0
+    python -m benchmarks.fake_openai --latency 2.0 --latency-dist lognormal --latency-spread 0.5 --error-rate 0.02
+
+then point the Backend at it with OPENAI_BASE_URL=http://127.0.0.1:9100/v1.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import random
+import time
+import math
+import uuid
+import zlib
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+# 1x1 transparent PNG
+PNG_BYTES = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+)
+PNG_B64 = base64.b64encode(PNG_BYTES).decode("ascii")
+
+
+def padded_png(size: int) -> bytes:
+    """The 1x1 PNG grown to about size bytes with a private ancillary chunk, which decoders skip."""
+    if size <= len(PNG_BYTES) + 12:
+        return PNG_BYTES
+    payload = bytes(size - len(PNG_BYTES) - 12)
+    chunk = len(payload).to_bytes(4, "big") + b"paDd" + payload
+    chunk += zlib.crc32(chunk[4:]).to_bytes(4, "big")
+    return PNG_BYTES[:-12] + chunk + PNG_BYTES[-12:]  # before IEND
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+def create_fake_app(
+    *,
+    image_latency: float = 2.0,
+    video_create_latency: float = 0.2,
+    video_render_seconds: float = 5.0,
+    video_bytes: int = 1 << 20,
+    latency_dist: str = "fixed",
+    latency_spread: float = 0.5,
+    image_rpm: int | None = None,
+    error_rate: float = 0.0,
+    error_status: int = 500,
+    hang_rate: float = 0.0,
+    seed: int | None = None,
+    image_bytes: int = 0,
+) -> FastAPI:
+    """
+    Build the fake server. video_render_seconds is how long a job stays in_progress.
+    image_rpm enforces a per-minute image request quota (429 + x-ratelimit-* headers).
+    Fault injection on image and video-create calls: error_rate answers error_status (500 by default),
+    hang_rate never answers (until the client gives up). stats["attempts"] counts every such call.
+    Latencies are means: latency_dist draws each call's delay from fixed, uniform (mean +- spread * mean),
+    exponential, or lognormal (sigma = spread) around them, seeded by seed like the faults.
+    image_bytes pads every returned image to about that size (realistic transfer sizes; still a 1x1 PNG).
+    """
+    if latency_dist not in LATENCY_DISTRIBUTIONS:
+        raise ValueError(f"latency_dist must be one of {LATENCY_DISTRIBUTIONS}")
+    app = FastAPI(title="Fake OpenAI")
+    videos: dict[str, dict] = {}
+    stats = {
+        "images": 0,
+        "videos": 0,
+        "attempts": 0,
+        "in_flight": 0,
+        "max_in_flight": 0,
+        "rate_limited": 0,
+        "faults": 0,
+    }
+    rng = random.Random(seed)
+    image_b64 = base64.b64encode(padded_png(image_bytes)).decode("ascii") if image_bytes else PNG_B64
+
+    async def _fault() -> JSONResponse | None:
+        """Maybe inject a failure: an error_status response, or a hang."""
+        stats["attempts"] += 1
+        roll = rng.random()
+        if roll < error_rate:
+            stats["faults"] += 1
+            kind = "server_error" if error_status >= 500 else "invalid_request_error"
+            return JSONResponse({"error": {"message": "Injected failure", "type": kind}}, status_code=error_status)
+        if roll < error_rate + hang_rate:
+            stats["faults"] += 1
+            await asyncio.sleep(3600)
+        return None
+    window = {"start": time.monotonic(), "used": 0}
+
+    def _quota_headers() -> dict[str, str]:
+        if image_rpm is None:
+            return {}
+        reset = max(0.0, 60.0 - (time.monotonic() - window["start"]))
+        return {
+            "x-ratelimit-limit-requests": str(image_rpm),
+            "x-ratelimit-remaining-requests": str(max(0, image_rpm - window["used"])),
+            "x-ratelimit-reset-requests": f"{reset:.3f}s",
+        }
+
+    def _take_quota() -> JSONResponse | None:
+        """Consume one image request from the quota; a 429 response if it is exhausted."""
+        if image_rpm is None:
+            return None
+        if time.monotonic() - window["start"] >= 60.0:
+            window["start"], window["used"] = time.monotonic(), 0
+        if window["used"] >= image_rpm:
+            stats["rate_limited"] += 1
+            headers = _quota_headers()
+            headers["retry-after"] = str(max(1, int(float(headers["x-ratelimit-reset-requests"][:-1]) + 1)))
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                status_code=429,
+                headers=headers,
+            )
+        window["used"] += 1
+        return None
+
+    def _sample(mean: float) -> float:
+        if mean <= 0 or latency_dist == "fixed":
+            return mean
+        if latency_dist == "uniform":
+            return max(0.0, rng.uniform(mean * (1 - latency_spread), mean * (1 + latency_spread)))
+        if latency_dist == "exponential":
+            return rng.expovariate(1 / mean)
+        # lognormal with the requested mean: mu = ln(mean) - sigma^2 / 2
+        return rng.lognormvariate(math.log(mean) - latency_spread**2 / 2, latency_spread)
+
+    async def _simulate(latency: float) -> None:
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            await asyncio.sleep(_sample(latency))
+        finally:
+            stats["in_flight"] -= 1
+
+    def _image_response(n: int) -> dict:
+        return {"created": int(time.time()), "data": [{"b64_json": image_b64} for _ in range(n)]}
+
+    def _video_obj(video_id: str) -> dict:
+        job = videos.get(video_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail={"error": {"message": "No such video"}})
+        elapsed = time.monotonic() - job["started"]
+        done = elapsed >= video_render_seconds
+        return {
+            "id": video_id,
+            "object": "video",
+            "created_at": int(job["created_at"]),
+            "completed_at": int(time.time()) if done else None,
+            "error": None,
+            "expires_at": None,
+            "model": job["model"],
+            "progress": 100 if done else int(100 * elapsed / video_render_seconds),
+            "prompt": job["prompt"],
+            "remixed_from_video_id": job.get("remixed_from"),
+            "seconds": job["seconds"],
+            "size": job["size"],
+            "status": "completed" if done else "in_progress",
+        }
+
+    def _new_video(prompt: str, model: str, seconds: str, size: str, remixed_from: str | None = None) -> str:
+        video_id = f"video_{uuid.uuid4().hex[:24]}"
+        videos[video_id] = {
+            "prompt": prompt,
+            "model": model,
+            "seconds": seconds,
+            "size": size,
+            "created_at": time.time(),
+            "started": time.monotonic(),
+            "remixed_from": remixed_from,
+        }
+        stats["videos"] += 1
+        return video_id
+
+    @app.post("/v1/images/generations")
+    async def images_generate(request: Request) -> Response:
+        body = await request.json()
+        if (failed := await _fault()) is not None:
+            return failed
+        if (limited := _take_quota()) is not None:
+            return limited
+        if body.get("stream"):
+            return StreamingResponse(
+                _image_events(int(body.get("partial_images") or 0)),
+                media_type="text/event-stream",
+                headers=_quota_headers(),
+            )
+        await _simulate(image_latency)
+        stats["images"] += 1
+        return JSONResponse(_image_response(int(body.get("n") or 1)), headers=_quota_headers())
+
+    async def _image_events(partial_images: int):
+        # Partial frames spread evenly over the latency, then the final image.
+        step = image_latency / (partial_images + 1)
+        for index in range(partial_images):
+            await _simulate(step)
+            event = {"type": "image_generation.partial_image", "partial_image_index": index, "b64_json": PNG_B64}
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        await _simulate(step)
+        stats["images"] += 1
+        event = {"type": "image_generation.completed", "b64_json": image_b64}
+        yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    @app.post("/v1/images/edits")
+    async def images_edit(request: Request) -> Response:
+        await request.form()
+        if (failed := await _fault()) is not None:
+            return failed
+        if (limited := _take_quota()) is not None:
+            return limited
+        await _simulate(image_latency)
+        stats["images"] += 1
+        return JSONResponse(_image_response(1), headers=_quota_headers())
+
+    @app.post("/v1/videos")
+    async def videos_create(request: Request) -> Response:
+        if request.headers.get("content-type", "").startswith("multipart/"):
+            body = dict(await request.form())
+        else:
+            body = await request.json()
+        if (failed := await _fault()) is not None:
+            return failed
+        await _simulate(video_create_latency)
+        video_id = _new_video(
+            str(body.get("prompt", "")),
+            str(body.get("model", "sora-2")),
+            str(body.get("seconds", "4")),
+            str(body.get("size", "720x1280")),
+        )
+        return JSONResponse(_video_obj(video_id))
+
+    @app.get("/v1/videos/{video_id}")
+    async def videos_retrieve(video_id: str) -> dict:
+        return _video_obj(video_id)
+
+    @app.post("/v1/videos/{video_id}/remix")
+    async def videos_remix(video_id: str, request: Request) -> dict:
+        source = _video_obj(video_id)
+        body = await request.json()
+        await _simulate(video_create_latency)
+        new_id = _new_video(body.get("prompt", ""), source["model"], source["seconds"], source["size"], video_id)
+        return _video_obj(new_id)
+
+    @app.get("/v1/videos/{video_id}/content")
+    async def videos_content(video_id: str) -> Response:
+        if _video_obj(video_id)["status"] != "completed":
+            raise HTTPException(status_code=400, detail={"error": {"message": "Video not ready"}})
+        return Response(content=b"\0" * video_bytes, media_type="video/mp4")
+
+    @app.get("/_stats")
+    async def fake_stats() -> dict:
+        return stats
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the fake OpenAI server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=2.0, help="Seconds per image call")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="fixed", help="Distribution of call latencies")
+    parser.add_argument("--latency-spread", type=float, default=0.5, help="uniform: +- fraction of the mean; lognormal: sigma")
+    parser.add_argument("--video-create-latency", type=float, default=0.2, help="Mean seconds per video create / remix call")
+    parser.add_argument("--video-render-seconds", type=float, default=5.0)
+    parser.add_argument("--video-bytes", type=int, default=1 << 20, help="Size of downloaded video content")
+    parser.add_argument("--image-rpm", type=int, help="Per-minute image request quota (429 beyond it)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=500, help="Status of injected errors")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Fraction of calls that never answer")
+    parser.add_argument("--seed", type=int, help="Seed for fault injection and latency sampling")
+    parser.add_argument("--image-bytes", type=int, default=0, help="Pad returned images to about this size")
+    args = parser.parse_args()
+    app = create_fake_app(
+        image_latency=args.latency,
+        video_create_latency=args.video_create_latency,
+        video_render_seconds=args.video_render_seconds,
+        video_bytes=args.video_bytes,
+        latency_dist=args.latency_dist,
+        latency_spread=args.latency_spread,
+        image_rpm=args.image_rpm,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        hang_rate=args.hang_rate,
+        seed=args.seed,
+        image_bytes=args.image_bytes,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
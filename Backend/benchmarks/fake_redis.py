@@ -0,0 +1,115 @@
+"""
+Local stand-in for a Redis server, speaking just enough RESP2 for RedisState's redis-py client
+(SHARED_STATE_URL=redis://...).
+
+Keys live in one dict with millisecond expiry, like the real server. Run standalone:
+
+    python -m benchmarks.fake_redis --port 6390
+
+then start the Backend workers with SHARED_STATE_URL=redis://127.0.0.1:6390/0.
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import time
+
+
+class FakeRedis:
+    """Handles GET, SET (PX/EX/NX), DEL, SCAN, MGET, PING, AUTH and SELECT; other commands answer an error."""
+
+    def __init__(self, password: str | None = None) -> None:
+        self._data: dict[bytes, tuple[bytes, float | None]] = {}
+        self._password = password
+        self.commands = 0
+
+    def _get(self, key: bytes) -> bytes | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.time():
+            del self._data[key]
+            return None
+        return entry[0]
+
+    def execute(self, args: list[bytes]):
+        self.commands += 1
+        name = args[0].upper().decode()
+        if name == "PING":
+            return b"PONG"
+        if name == "AUTH":
+            return b"OK" if self._password is None or args[-1].decode() == self._password else ValueError("WRONGPASS")
+        if name == "SELECT":
+            return b"OK"
+        if name == "GET":
+            return self._get(args[1])
+        if name == "MGET":
+            return [self._get(k) for k in args[1:]]
+        if name == "SET":
+            key, value, options = args[1], args[2], [a.upper() for a in args[3:]]
+            expires_at = None
+            if b"PX" in options:
+                expires_at = time.time() + int(args[3 + options.index(b"PX") + 1]) / 1000
+            elif b"EX" in options:
+                expires_at = time.time() + int(args[3 + options.index(b"EX") + 1])
+            if b"NX" in options and self._get(key) is not None:
+                return None
+            self._data[key] = (value, expires_at)
+            return b"OK"
+        if name == "DEL":
+            return sum(self._data.pop(k, None) is not None for k in args[1:])
+        if name == "SCAN":
+            pattern = args[args.index(b"MATCH") + 1].decode() if b"MATCH" in args else "*"
+            keys = [k for k in list(self._data) if self._get(k) is not None and fnmatch.fnmatchcase(k.decode(), pattern)]
+            return [b"0", keys]
+        return ValueError(f"ERR unknown command '{name}'")
+
+    @staticmethod
+    def encode(reply) -> bytes:
+        if reply is None:
+            return b"$-1\r\n"
+        if isinstance(reply, ValueError):
+            return b"-%s\r\n" % str(reply).encode()
+        if isinstance(reply, int):
+            return b":%d\r\n" % reply
+        if isinstance(reply, list):
+            return b"*%d\r\n" % len(reply) + b"".join(FakeRedis.encode(r) for r in reply)
+        if reply in (b"OK", b"PONG"):
+            return b"+%s\r\n" % reply
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    break
+                args = []
+                for _ in range(int(header[1:-2])):
+                    length = int((await reader.readline())[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                writer.write(self.encode(self.execute(args)))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host: str, port: int, password: str | None = None) -> None:
+    server = await asyncio.start_server(FakeRedis(password).handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the fake Redis server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    parser.add_argument("--password", help="Require AUTH with this password")
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.password))
+
+
+if __name__ == "__main__":
+    main()
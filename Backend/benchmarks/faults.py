@@ -0,0 +1,171 @@
+"""
+Fault-injection benchmark and check for the resilience layer (retries, deadlines, circuit breaker).
+
+Scenarios, each run with RESILIENCE_ENABLED off and on unless noted:
+  flaky    - 30% of upstream calls answer 500 and 10% hang; hangs are cut at --deadline, and with
+             resilience on failed attempts are retried
+  outage   - every upstream call answers 500; with the breaker, later calls fail fast (503) without
+             reaching upstream
+  rejected - every upstream call answers 400; never retried and never counted against the breaker
+  hang     - every upstream call hangs (resilience on only); image generates end in 504 at the 28 s
+             endpoint deadline and video creates at the 20 s one
+
+Every run asserts its expected status mix and upstream call counts and exits non-zero on a mismatch.
+
+    python -m benchmarks.faults --requests 60
+    python -m benchmarks.faults --scenarios flaky outage rejected   # skip the ~30 s hang scenario
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+from benchmarks._harness import backend, fake_openai
+
+SCENARIOS = {
+    "flaky": ["--error-rate", "0.3", "--hang-rate", "0.1", "--seed", "7"],
+    "outage": ["--error-rate", "1.0"],
+    "rejected": ["--error-rate", "1.0", "--error-status", "400"],
+    "hang": ["--hang-rate", "1.0"],
+}
+# Settings defaults the checks rely on.
+MAX_ATTEMPTS = 3
+BREAKER_THRESHOLD = 5
+# app.services.resilience.ENDPOINT_DEADLINES, used as-is by the hang scenario.
+IMAGE_DEADLINE = 28.0
+VIDEO_DEADLINE = 20.0
+# Allowed overshoot of a deadline (event loop and HTTP round trips).
+SLACK_SECONDS = 1.5
+
+
+def _summary(results: list[tuple[int, float]]) -> dict:
+    codes: dict[int, int] = {}
+    for code, _ in results:
+        codes[code] = codes.get(code, 0) + 1
+    latencies = sorted(t for _, t in results)
+    tail = latencies[len(latencies) // 2 :]
+    return {
+        "statuses": codes,
+        "p50_s": round(statistics.median(latencies), 3),
+        "min_s": round(latencies[0], 3),
+        "max_s": round(latencies[-1], 3),
+        "slowest_half_p50_s": round(statistics.median(tail), 3),
+    }
+
+
+async def _run(base_url: str, path: str, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+
+        async def one(i: int) -> tuple[int, float]:
+            async with semaphore:
+                start = time.perf_counter()
+                resp = await client.post(path, json={"prompt": f"fault {i}"}, headers={"Cache-Control": "no-cache"})
+                return resp.status_code, time.perf_counter() - start
+
+        return _summary(await asyncio.gather(*(one(i) for i in range(requests))))
+
+
+def _check(scenario: str, on: bool, result: dict, args: argparse.Namespace) -> None:
+    """Assert the run behaved as the resilience settings promise."""
+    n = args.requests
+    statuses, calls, resilience = result.get("statuses"), result["upstream_calls"], result["resilience"]
+    if scenario == "flaky":
+        allowed = {200, 502, 503, 504} if on else {200, 502, 504}
+        assert set(statuses) <= allowed, f"unexpected statuses {statuses}"
+        # A hanging attempt is cut at the deadline, whether by the resilience layer or the SDK timeout.
+        assert result["max_s"] <= args.deadline + SLACK_SECONDS, f"a request outlived the deadline: {result['max_s']}s"
+        if on:
+            assert resilience["retries"] > 0, "no failed attempt was retried"
+            assert calls <= n * MAX_ATTEMPTS, f"{calls} upstream calls for {n} requests"
+        else:
+            assert calls == n, f"{calls} upstream calls for {n} requests without retries"
+    elif scenario == "outage":
+        if on:
+            assert set(statuses) <= {502, 503} and statuses.get(503), f"breaker never failed fast: {statuses}"
+            assert resilience["breakers"]["images.generate"]["opened"] >= 1, "breaker never opened"
+            # Once open, no further attempt starts; only those already running when it opened can finish.
+            assert calls <= BREAKER_THRESHOLD + args.concurrency, f"{calls} upstream calls during an outage"
+        else:
+            assert statuses == {502: n}, f"unexpected statuses {statuses}"
+            assert calls == n, f"{calls} upstream calls for {n} requests without retries"
+    elif scenario == "rejected":
+        assert statuses == {400: n}, f"unexpected statuses {statuses}"
+        assert calls == n, f"{calls} upstream calls for {n} requests: a 4xx was retried"
+        if on:
+            assert resilience["retries"] == 0, "a 4xx was retried"
+            assert resilience["breakers"]["images.generate"]["state"] == "closed", "4xx errors opened the breaker"
+    elif scenario == "hang":
+        for path, deadline in (("images", IMAGE_DEADLINE), ("videos", VIDEO_DEADLINE)):
+            part = result[path]
+            assert part["statuses"] == {504: n}, f"{path}: unexpected statuses {part['statuses']}"
+            assert deadline - SLACK_SECONDS <= part["min_s"] and part["max_s"] <= deadline + SLACK_SECONDS, (
+                f"{path}: requests ended after {part['min_s']}-{part['max_s']}s, not at the {deadline:.0f}s deadline"
+            )
+        assert resilience["retries"] == 0, "an attempt was retried with no time left"
+
+
+def _scenario(scenario: str, on: bool, args: argparse.Namespace) -> dict:
+    env = {
+        "RESILIENCE_ENABLED": "true" if on else "false",
+        "RATE_LIMIT_ENABLED": "false",
+        "OPENAI_MAX_RETRIES": "0",
+        "OPENAI_TIMEOUT": str(args.deadline),
+        "UPSTREAM_DEADLINES": json.dumps({"images.generate": args.deadline}),
+    }
+    if scenario == "hang":
+        # The endpoints' own deadlines; the SDK timeout must not end the attempt first.
+        env["OPENAI_TIMEOUT"] = "60"
+        del env["UPSTREAM_DEADLINES"]
+    with fake_openai("--latency", str(args.latency), *SCENARIOS[scenario]) as openai_url:
+        with backend(openai_url, env) as base_url:
+            if scenario == "hang":
+                images, videos = asyncio.run(_hang(base_url, args))
+                result = {"images": images, "videos": videos}
+            else:
+                result = asyncio.run(_run(base_url, "/api/images/generate", args.requests, args.concurrency))
+            result["resilience"] = httpx.get(f"{base_url}/stats").json().get("resilience")
+        result["upstream_calls"] = httpx.get(openai_url.removesuffix("/v1") + "/_stats").json()["attempts"]
+    return result
+
+
+async def _hang(base_url: str, args: argparse.Namespace) -> tuple[dict, dict]:
+    # Both endpoints at once, every request in parallel, so the scenario takes one deadline.
+    return await asyncio.gather(
+        _run(base_url, "/api/images/generate", args.requests, args.requests),
+        _run(base_url, "/api/videos/generate", args.requests, args.requests),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", "-n", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--deadline", type=float, default=5.0, help="images.generate deadline for the run")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    args = parser.parse_args()
+    failures = []
+    for scenario in args.scenarios:
+        for on in (False, True):
+            if scenario == "hang" and not on:
+                continue
+            result = _scenario(scenario, on, args)
+            label = "on" if on else "off"
+            try:
+                _check(scenario, on, result, args)
+                verdict = "ok"
+            except AssertionError as e:
+                failures.append(f"{scenario} resilience {label}: {e}")
+                verdict = f"FAILED: {e}"
+            print(f"{scenario:>8} resilience {label:>3}: {result} -> {verdict}")
+    if failures:
+        raise SystemExit("\n".join(failures))
+
+
+if __name__ == "__main__":
+    main()
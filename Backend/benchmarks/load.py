@@ -0,0 +1,342 @@
+"""
+Load suite: one scenario per Backend route, run against the fake OpenAI server, for catching regressions.
+
+Starts the fake server (latency distribution and error rate configurable) and a single-worker Backend,
+then runs each scenario in turn: --requests calls with at most --concurrency in flight. Per scenario it
+reports p50/p95/p99 latency, throughput (successful calls per second), error rate and the Backend's
+peak RSS while the scenario ran. Upstream faults are retried by the Backend like in production, so
+--error-rate shows up as latency first and as errors only once retries run out. The Backend's
+per-model quotas (50 image rpm for gpt-image-1.5, 25 for sora-2) are raised to --quota-rpm so the
+suite measures the Backend rather than the token bucket; pass the real figures to include queueing.
+
+Scenarios (images.* and videos.* follow app/routers):
+  images.generate   POST /api/images/generate
+  images.edit       POST /api/images/edit (multipart, one PNG)
+  images.batch      POST /api/images/batch (4 items, NDJSON read to the end)
+  images.stream     POST /api/images/generate/stream (SSE read to the completed event)
+  images.jobs       POST /api/images/jobs, poll status, download: end-to-end
+  images.session    POST /api/images/sessions/{id}/edit (one step on a shared edit session)
+  videos.generate   POST /api/videos/generate
+  videos.reference  POST /api/videos/generate-with-reference (multipart)
+  videos.status     GET  /api/videos/jobs/{id}/status
+  videos.download   GET  /api/videos/jobs/{id}/download (proxied from upstream; the local store is off)
+  videos.remix      POST /api/videos/remix
+
+    python -m benchmarks.load --requests 50 --concurrency 10 --output load.json
+    python -m benchmarks.load --scenarios images.generate,videos.download --latency-dist lognormal
+    python -m benchmarks.load --output new.json --baseline load.json --tolerance 0.25
+
+With --baseline, exits 1 if any scenario's p95 or error rate grew, or its throughput fell, by more than
+--tolerance; compare runs from the same machine.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks._harness import BACKEND_DIR, backend_process, fake_openai, rss_mb
+from benchmarks.fake_openai import LATENCY_DISTRIBUTIONS, PNG_BYTES
+
+Scenario = Callable[[httpx.AsyncClient, int, dict], Awaitable[None]]
+
+JOB_POLL_SECONDS = 0.05
+
+
+def _check(resp: httpx.Response) -> httpx.Response:
+    if resp.status_code >= 400:
+        raise RuntimeError(f"{resp.request.method} {resp.request.url.path} -> {resp.status_code}")
+    return resp
+
+
+async def images_generate(client: httpx.AsyncClient, i: int, ctx: dict) -> None:
+    # Distinct prompts so request coalescing does not merge the calls.
+    _check(await client.post("/api/images/generate", json={"prompt": f"load {i}"}))
+
+
+async def images_edit(client: httpx.AsyncClient, i: int, ctx: dict) -> None:
+    files = [("files", ("in.png", PNG_BYTES, "image/png"))]
+    _check(await client.post("/api/images/edit", data={"prompt": f"load {i}"}, files=files))
+
+
+async def images_session(client: httpx.AsyncClient, i: int, ctx: dict) -> None:
+    _check(await client.post(f"/api/images/sessions/{ctx['session_id']}/edit", data={"prompt": f"load {i}"}))
+
+
+async def images_batch(client: httpx.AsyncClient, i: int, ctx: dict) -> None:
+    items = [{"prompt": f"load {i}.{k}"} for k in range(4)]
+    async with client.stream("POST", "/api/images/batch", json={"items": items}) as resp:
+        _check(resp)
+        async for line in resp.aiter_lines():
+            if line and json.loads(line)["status"] != "ok":
+                raise RuntimeError(f"batch item failed: {json.loads(line)['error']}")
+
+
+async def images_stream(client: httpx.AsyncClient, i: int, ctx: dict) -> None:
+    async with client.stream("POST", "/api/images/generate/stream", json={"prompt": f"load {i}"}) as resp:
+        _check(resp)
+        async for line in resp.aiter_lines():
+            if line == "event: completed":
+                return
+            if line == "event: error":
+                raise RuntimeError("stream error event")
+    raise RuntimeError("stream ended without a completed event")
+
+
+async def images_jobs(client: httpx.AsyncClient, i: int, ctx: dict) -> None:
+    job_id = _check(await client.post("/api/images/jobs", json={"prompt": f"load {i}"})).json()["job_id"]
+    while True:
+        status = _check(await client.get(f"/api/images/jobs/{job_id}/status")).json()
+        if status["status"] == "completed":
+            break
+        if status["status"] == "failed":
+            raise RuntimeError(f"image job failed: {status['error']}")
+        await asyncio.sleep(JOB_POLL_SECONDS)
+    _check(await client.get(f"/api/images/jobs/{job_id}/download"))
+
+
+async def videos_generate(client: httpx.AsyncClient, i: int, ctx: dict) -> None:
+    _check(await client.post("/api/videos/generate", json={"prompt": f"load {i}"}))
+
+
+async def videos_reference(client: httpx.AsyncClient, i: int, ctx: dict) -> None:
+    files = {"reference": ("ref.png", PNG_BYTES, "image/png")}
+    _check(await client.post("/api/videos/generate-with-reference", data={"prompt": f"load {i}"}, files=files))
+
+
+async def videos_status(client: httpx.AsyncClient, i: int, ctx: dict) -> None:
+    _check(await client.get(f"/api/videos/jobs/{ctx['video_id']}/status"))
+
+
+async def videos_download(client: httpx.AsyncClient, i: int, ctx: dict) -> None:
+    async with client.stream("GET", f"/api/videos/jobs/{ctx['video_id']}/download") as resp:
+        _check(resp)
+        async for _ in resp.aiter_raw():
+            pass
+
+
+async def videos_remix(client: httpx.AsyncClient, i: int, ctx: dict) -> None:
+    _check(await client.post("/api/videos/remix", json={"video_id": ctx["video_id"], "prompt": f"load {i}"}))
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "images.generate": images_generate,
+    "images.edit": images_edit,
+    "images.batch": images_batch,
+    "images.stream": images_stream,
+    "images.jobs": images_jobs,
+    "images.session": images_session,
+    "videos.generate": videos_generate,
+    "videos.reference": videos_reference,
+    "videos.status": videos_status,
+    "videos.download": videos_download,
+    "videos.remix": videos_remix,
+}
+
+
+async def _completed_video(client: httpx.AsyncClient, timeout: float = 60.0) -> str:
+    """Create one video and wait until it is downloadable (for the status/download/remix scenarios)."""
+    video_id = _check(await client.post("/api/videos/generate", json={"prompt": "load fixture"})).json()["job_id"]
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if _check(await client.get(f"/api/videos/jobs/{video_id}/status")).json()["status"] == "completed":
+            return video_id
+        await asyncio.sleep(0.2)
+    raise TimeoutError(f"fixture video {video_id} did not complete within {timeout}s")
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Linear-interpolated percentile (q in 0..100) of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+async def _run_scenario(
+    client: httpx.AsyncClient, scenario: Scenario, ctx: dict, pid: int, requests: int, concurrency: int
+) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors: list[str] = []
+    rss_samples: list[float] = []
+    done = asyncio.Event()
+
+    async def sample_rss() -> None:
+        while not done.is_set():
+            if (rss := rss_mb(pid)) is not None:
+                rss_samples.append(rss[0])
+            await asyncio.sleep(0.1)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            t0 = time.perf_counter()
+            try:
+                await scenario(client, i, ctx)
+            except Exception as e:
+                errors.append(str(e) or type(e).__name__)
+                return
+            latencies.append(time.perf_counter() - t0)
+
+    sampler = asyncio.create_task(sample_rss())
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    wall = time.perf_counter() - start
+    done.set()
+    await sampler
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "ok": len(latencies),
+        "errors": len(errors),
+        "error_rate": round(len(errors) / requests, 4),
+        "first_error": errors[0] if errors else None,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1e3, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1e3, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1e3, 1),
+        "max_ms": round(latencies[-1] * 1e3, 1) if latencies else 0.0,
+        "rss_mb": round(max(rss_samples), 1) if rss_samples else None,
+    }
+
+
+async def _run(base_url: str, pid: int, names: list[str], requests: int, concurrency: int) -> dict[str, dict]:
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        ctx: dict = {}
+        if any(name in ("videos.status", "videos.download", "videos.remix") for name in names):
+            ctx["video_id"] = await _completed_video(client)
+        if "images.session" in names:
+            files = {"file": ("start.png", PNG_BYTES, "image/png")}
+            ctx["session_id"] = _check(await client.post("/api/images/sessions", files=files)).json()["session_id"]
+        results = {}
+        for name in names:
+            results[name] = await _run_scenario(client, SCENARIOS[name], ctx, pid, requests, concurrency)
+            print(_format_row(name, results[name]), file=sys.stderr)
+        return results
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def _format_row(name: str, r: dict) -> str:
+    rss = f"{r['rss_mb']:7.1f}" if r["rss_mb"] is not None else "      -"
+    return (
+        f"{name:<17} {r['ok']:>4}/{r['requests']:<4} {r['throughput_rps']:8.2f}/s "
+        f"p50 {r['p50_ms']:8.1f}  p95 {r['p95_ms']:8.1f}  p99 {r['p99_ms']:8.1f} ms  "
+        f"err {r['error_rate']:6.2%}  rss {rss} MB"
+    )
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], tolerance: float) -> list[str]:
+    """Regression messages for scenarios slower (p95) or with less throughput than baseline beyond tolerance."""
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if before["p95_ms"] > 0 and current["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']} -> {current['p95_ms']} ms")
+        if current["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['throughput_rps']} -> {current['throughput_rps']} /s")
+        if current["error_rate"] > before["error_rate"] + tolerance * max(before["error_rate"], 0.01):
+            regressions.append(f"{name}: error rate {before['error_rate']:.2%} -> {current['error_rate']:.2%}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset to run")
+    parser.add_argument("--requests", "-n", type=int, default=50, help="Calls per scenario")
+    parser.add_argument("--concurrency", "-c", type=int, default=10, help="Calls in flight per scenario")
+    parser.add_argument("--latency", type=float, default=0.5, help="Mean fake upstream seconds per image call")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--latency-spread", type=float, default=0.5, help="uniform: +- fraction of the mean; lognormal: sigma")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of upstream calls answered with 500")
+    parser.add_argument("--video-render-seconds", type=float, default=1.0)
+    parser.add_argument("--video-bytes", type=int, default=1 << 20)
+    parser.add_argument("--quota-rpm", type=int, default=100_000, help="Backend per-model rpm/ipm for the models used")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for fake latency sampling and faults")
+    parser.add_argument("--output", "-o", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Earlier --output file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression vs --baseline")
+    args = parser.parse_args()
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    if unknown := [name for name in names if name not in SCENARIOS]:
+        parser.error(f"unknown scenarios: {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+
+    fake_args = [
+        "--latency", str(args.latency),
+        "--latency-dist", args.latency_dist,
+        "--latency-spread", str(args.latency_spread),
+        "--error-rate", str(args.error_rate),
+        "--video-render-seconds", str(args.video_render_seconds),
+        "--video-bytes", str(args.video_bytes),
+        "--seed", str(args.seed),
+    ]
+    with tempfile.TemporaryDirectory(prefix="backend-load-") as tmp:
+        # Caches and the video store off so every call reaches the fake upstream; job state in a scratch dir.
+        env = {
+            "IMAGE_CACHE_ENABLED": "false",
+            "VIDEO_STORE_DIR": "",
+            "VIDEO_POLL_MIN_INTERVAL": "0.2",
+            "IMAGE_JOBS_DB": f"{tmp}/jobs.sqlite3",
+            "IMAGE_JOBS_DIR": f"{tmp}/jobs",
+            "EDIT_SESSIONS_DB": f"{tmp}/edit_sessions.sqlite3",
+            "EDIT_SESSIONS_DIR": f"{tmp}/edit_sessions",
+            "EDIT_SESSION_MAX_VERSIONS": "1000000",
+            "IMAGE_STREAM_MAX_CONCURRENCY": str(args.concurrency),
+            "UPSTREAM_RATE_LIMITS": json.dumps(
+                {model: {"rpm": args.quota_rpm, "ipm": args.quota_rpm} for model in ("gpt-image-1.5", "sora-2")}
+            ),
+        }
+        with fake_openai(*fake_args) as openai_url, backend_process(openai_url, env) as (base_url, proc):
+            results = asyncio.run(_run(base_url, proc.pid, names, args.requests, args.concurrency))
+            peak = rss_mb(proc.pid)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+            "backend_peak_rss_mb": round(peak[1], 1) if peak is not None else None,
+        },
+        "scenarios": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["scenarios"], args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
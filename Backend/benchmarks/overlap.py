@@ -0,0 +1,64 @@
+"""
+Load benchmark: do concurrent /api/images/generate calls overlap in one worker?
+
+Starts the fake OpenAI server (fixed per-call latency) and a single-worker Backend,
+fires N concurrent generate requests while probing /health, and reports wall time.
+With a non-blocking Backend, wall time stays close to one upstream latency rather
+than N of them, and /health keeps answering in milliseconds.
+
+    python -m benchmarks.overlap --requests 100 --latency 2
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks._harness import backend, fake_openai
+
+
+async def _run(base_url: str, requests: int) -> dict:
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=httpx.Limits(max_connections=None)) as client:
+        health_latencies: list[float] = []
+        done = asyncio.Event()
+
+        async def probe_health() -> None:
+            while not done.is_set():
+                t0 = time.perf_counter()
+                await client.get("/health")
+                health_latencies.append(time.perf_counter() - t0)
+                await asyncio.sleep(0.1)
+
+        async def one(i: int) -> int:
+            resp = await client.post("/api/images/generate", json={"prompt": f"overlap test {i}"})
+            return resp.status_code
+
+        prober = asyncio.create_task(probe_health())
+        start = time.perf_counter()
+        codes = await asyncio.gather(*(one(i) for i in range(requests)))
+        wall = time.perf_counter() - start
+        done.set()
+        await prober
+    return {
+        "requests": requests,
+        "ok": sum(1 for c in codes if c == 200),
+        "wall_seconds": round(wall, 3),
+        "health_max_ms": round(max(health_latencies, default=0) * 1000, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", "-n", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=2.0, help="Fake upstream seconds per image")
+    args = parser.parse_args()
+    with fake_openai("--latency", str(args.latency)) as openai_url, backend(openai_url) as base_url:
+        result = asyncio.run(_run(base_url, args.requests))
+    serial = args.requests * args.latency
+    print(f"{result['ok']}/{result['requests']} ok in {result['wall_seconds']}s "
+          f"(serial would be {serial:.0f}s); max /health latency {result['health_max_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Load benchmark: throughput against an upstream quota, with and without the rate governor.
+
+The fake OpenAI server allows --rpm image requests per minute and answers 429 beyond
+that. A burst of --requests generate calls is sent to the Backend; the report shows
+how many succeeded, how many 429s reached the client, and how many upstream 429s
+were provoked (a retry storm shows up as a large upstream count).
+
+    python -m benchmarks.rate_limit --rpm 120 --requests 150
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks._harness import backend, fake_openai
+
+
+async def _burst(base_url: str, requests: int) -> tuple[dict[int, int], float]:
+    async with httpx.AsyncClient(base_url=base_url, timeout=600, limits=httpx.Limits(max_connections=None)) as client:
+
+        async def one(i: int) -> int:
+            resp = await client.post(
+                "/api/images/generate",
+                json={"prompt": f"quota test {i}"},
+                headers={"Cache-Control": "no-cache"},
+            )
+            return resp.status_code
+
+        start = time.perf_counter()
+        codes = await asyncio.gather(*(one(i) for i in range(requests)))
+    counts: dict[int, int] = {}
+    for code in codes:
+        counts[code] = counts.get(code, 0) + 1
+    return counts, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rpm", type=int, default=120, help="Fake upstream quota (image requests/minute)")
+    parser.add_argument("--requests", "-n", type=int, default=150)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+    limits = json.dumps({"gpt-image-1.5": {"rpm": args.rpm, "ipm": args.rpm}})
+    for label, env in (
+        ("governor off", {"RATE_LIMIT_ENABLED": "false"}),
+        ("governor on", {"RATE_LIMIT_ENABLED": "true", "UPSTREAM_RATE_LIMITS": limits}),
+    ):
+        with fake_openai("--latency", str(args.latency), "--image-rpm", str(args.rpm)) as openai_url:
+            with backend(openai_url, env) as base_url:
+                counts, wall = asyncio.run(_burst(base_url, args.requests))
+                stats = httpx.get(openai_url.removesuffix("/v1") + "/_stats").json()
+        ok = counts.get(200, 0)
+        print(f"{label:>12}: {ok}/{args.requests} ok in {wall:.1f}s "
+              f"({ok / wall * 60:.0f}/min), client statuses {counts}, upstream 429s {stats['rate_limited']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Cold-start benchmark: import time and time-to-first-response, for tracking regressions.
+
+Import time comes from `python -X importtime -c "import app.main"` (cumulative microseconds
+per top-level package). Time-to-first-response starts a fresh uvicorn process against the
+fake OpenAI server and measures process spawn -> first /health 200, then the first and the
+second POST /api/images/generate (the first one pays for anything still lazy). Each
+measurement is repeated --runs times; medians are reported.
+
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --runs 5 --json > startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks._harness import BACKEND_DIR, fake_openai, free_port
+
+TRACKED_IMPORTS = ("app.main", "app.routers", "app.dependencies", "openai", "fastapi", "prometheus_client", "PIL")
+
+
+def _import_times() -> dict[str, float]:
+    """Cumulative import milliseconds for the tracked modules in a fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, float] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line.split("|"))
+        if name in TRACKED_IMPORTS and cumulative.isdigit():
+            times[name] = int(cumulative) / 1000
+    return times
+
+
+def _poll(url: str, body: bytes | None = None, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+            urllib.request.urlopen(request, timeout=timeout).read()
+            return
+        except urllib.error.HTTPError:
+            raise
+        except (urllib.error.URLError, ConnectionError):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{url} did not answer within {timeout}s")
+            time.sleep(0.005)
+
+
+def _first_response(openai_url: str, env: dict[str, str]) -> dict[str, float]:
+    """Milliseconds from spawn to the first /health and from ready to the first two generates."""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    body = json.dumps({"prompt": "startup"}).encode()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "OPENAI_BASE_URL": openai_url, "OPENAI_API_KEY": "sk-fake", **env},
+    )
+    try:
+        _poll(f"{base}/health")
+        ready = time.perf_counter()
+        _poll(f"{base}/api/images/generate", body)
+        first = time.perf_counter()
+        _poll(f"{base}/api/images/generate", body)
+        second = time.perf_counter()
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return {
+        "health_ms": (ready - start) * 1e3,
+        "first_generate_ms": (first - ready) * 1e3,
+        "second_generate_ms": (second - first) * 1e3,
+    }
+
+
+def _median(samples: list[dict[str, float]]) -> dict[str, float]:
+    return {key: round(statistics.median(s[key] for s in samples), 1) for key in samples[0]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print one JSON object instead of a table")
+    args = parser.parse_args()
+
+    imports = [_import_times() for _ in range(args.runs)]
+    import_ms = {name: round(statistics.median(run.get(name, 0.0) for run in imports), 1) for name in TRACKED_IMPORTS}
+    # Caches off so each generate reaches the (zero-latency) fake upstream; warm-up on and off for comparison.
+    base_env = {"IMAGE_CACHE_ENABLED": "false", "IMAGE_JOBS_DB": "", "OPENAI_HTTP2": "false"}
+    with fake_openai("--latency", "0") as openai_url:
+        startup = {
+            label: _median([_first_response(openai_url, {**base_env, "WARM_UP": flag}) for _ in range(args.runs)])
+            for label, flag in (("warm_up", "true"), ("no_warm_up", "false"))
+        }
+    result = {"runs": args.runs, "import_ms": import_ms, "startup_ms": startup}
+
+    if args.json:
+        print(json.dumps(result))
+        return
+    print("import (cumulative, median ms):")
+    for name, ms in import_ms.items():
+        print(f"  {name:<20} {ms:8.1f}")
+    print("startup (median ms):")
+    for label, timings in startup.items():
+        print(f"  {label:<11} " + "  ".join(f"{key} {value:7.1f}" for key, value in timings.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Multi-worker entry point: gunicorn managing uvicorn workers, with the app preloaded.
+
+    pip install gunicorn
+    gunicorn -c gunicorn.conf.py app.main:app
+
+The app module (FastAPI, the OpenAI SDK, the schemas) is imported once in the master and forked, so the
+workers share those pages and a restarted worker is serving within milliseconds. Sockets, files, threads
+and process pools are only created per worker, in the app lifespan.
+
+Workers default to WEB_CONCURRENCY, else one per CPU. Unless SHARED_STATE_URL is set, all of them share
+.cache/shared_state.sqlite3, so video job status and /stats/workers are the same on every worker. Prometheus
+metrics are merged across workers through PROMETHEUS_MULTIPROC_DIR (a fresh temporary directory by default).
+"""
+
+import multiprocessing
+import os
+import tempfile
+
+from app.config import get_settings
+
+# Reads .env into the environment first, so values set there are respected below.
+_settings = get_settings()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY") or multiprocessing.cpu_count())
+preload_app = True
+graceful_timeout = 30
+keepalive = 5
+
+try:
+    import uvicorn_worker  # noqa: F401  (the maintained home of the worker class)
+
+    worker_class = "uvicorn_worker.UvicornWorker"
+except ImportError:
+    worker_class = "uvicorn.workers.UvicornWorker"
+
+# The workers read these when they build their components: quotas are split by WEB_CONCURRENCY.
+os.environ["WEB_CONCURRENCY"] = str(workers)
+if _settings.shared_state_url == "memory://" and workers > 1:
+    os.environ["SHARED_STATE_URL"] = "sqlite:///.cache/shared_state.sqlite3"
+get_settings.cache_clear()
+
+# Must be set before prometheus_client is imported (by the preloaded app), and start out empty.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="backend-metrics-"))
+
+
+def child_exit(server, worker) -> None:
+    """Drop a dead worker's live gauges from the merged metrics."""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -7,19 +7,27 @@ Supports:
 - Edit images: one or more input images + prompt (e.g. replace object in image 1 with object from image 2).
 - Generate videos from a prompt (Sora 2), with optional image reference; polls until done and saves.
 - Remix an existing video with a new prompt.
+- Batch: run a JSONL/CSV manifest of the above concurrently, rate limited, resumable via a checkpoint file.
 
 Requires an API key: set OPENAI_API_KEY or API_KEY in the environment, or put API_KEY=... in a .env file at the repo root (or in this directory).
 """
 
 import argparse
 import base64
+import csv
+import json
 import os
+import queue
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from urllib.parse import urlsplit
 
 try:
-    from openai import OpenAI
+    import httpx
+    from openai import APIStatusError, OpenAI
 except ImportError:
     print("Install the OpenAI client: pip install openai", file=sys.stderr)
     sys.exit(1)
@@ -59,11 +67,13 @@ VIDEO_SECONDS = ["4", "8", "12"]
 VIDEO_SIZES = ["720x1280", "1280x720", "1024x1792", "1792x1024"]
 
 
-def get_client():
+def get_client(max_retries: int | None = None):
     key = os.environ.get("OPENAI_API_KEY") or os.environ.get("API_KEY")
     if not key:
         print("Set OPENAI_API_KEY or API_KEY in your environment or in a .env file.", file=sys.stderr)
         sys.exit(1)
+    if max_retries is not None:
+        return OpenAI(api_key=key, max_retries=max_retries)
     return OpenAI(api_key=key)
 
 
@@ -96,21 +106,11 @@ def cmd_generate_image(client: OpenAI, args: argparse.Namespace) -> None:
     out_path = Path(args.output or "output_image.png")
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    for i, item in enumerate(resp.data):
-        if getattr(item, "b64_json", None):
-            data = base64.b64decode(item.b64_json)
-        elif getattr(item, "url", None):
-            import urllib.request
-            data = urllib.request.urlopen(item.url).read()
-        else:
-            print("Unexpected response format", item, file=sys.stderr)
-            continue
-        if len(resp.data) == 1:
-            path = out_path
-        else:
-            path = out_path.parent / f"{out_path.stem}_{i}{out_path.suffix}"
-        with open(path, "wb") as f:
-            f.write(data)
+    if len(resp.data) == 1:
+        paths = [out_path]
+    else:
+        paths = [out_path.parent / f"{out_path.stem}_{i}{out_path.suffix}" for i in range(len(resp.data))]
+    for path in _save_images(resp.data, paths):
         print(f"Saved: {path}")
 
 
@@ -143,35 +143,247 @@ def cmd_edit_image(client: OpenAI, args: argparse.Namespace) -> None:
 
     out_path = Path(args.output or "output_edit.png")
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    item = resp.data[0]
-    if getattr(item, "b64_json", None):
-        data = base64.b64decode(item.b64_json)
-    elif getattr(item, "url", None):
-        import urllib.request
-        data = urllib.request.urlopen(item.url).read()
-    else:
-        print("Unexpected response format", item, file=sys.stderr)
+    if not _save_images(resp.data[:1], [out_path]):
         sys.exit(1)
-    with open(out_path, "wb") as f:
-        f.write(data)
     print(f"Saved: {out_path}")
 
 
-def _poll_video_until_done(client: OpenAI, video_id: str, poll_interval: int = 10) -> None:
-    while True:
-        job = client.videos.retrieve(video_id)
-        status = getattr(job, "status", None) or getattr(job, "status", "unknown")
-        print(f"  Video status: {status}")
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+VIDEO_MAX_POLL_ERRORS = 20  # failed status checks in a row before a video job is given up
+
+# URL-form image results (dall-e with response_format=url): one pooled client per process, shared by batch threads.
+IMAGE_FETCH_TIMEOUT = 60.0  # whole download, not per read, so a slow CDN cannot pin a thread
+IMAGE_FETCH_MAX_BYTES = 50 * 1024 * 1024
+IMAGE_FETCH_PER_HOST = 8
+_image_http: "httpx.Client | None" = None
+_image_hosts: dict[str, threading.BoundedSemaphore] = {}
+_image_lock = threading.Lock()
+
+
+def _image_fetch_slot(host: str) -> tuple["httpx.Client", threading.BoundedSemaphore]:
+    global _image_http
+    with _image_lock:
+        if _image_http is None:
+            _image_http = httpx.Client(
+                timeout=httpx.Timeout(30.0, connect=10.0),
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=16),
+                follow_redirects=True,
+            )
+        slot = _image_hosts.setdefault(host, threading.BoundedSemaphore(IMAGE_FETCH_PER_HOST))
+    return _image_http, slot
+
+
+def _download_image(url: str, out_path: Path) -> None:
+    """Stream an image URL to out_path (via a .part file) within IMAGE_FETCH_TIMEOUT and IMAGE_FETCH_MAX_BYTES."""
+    http, slot = _image_fetch_slot(urlsplit(url).hostname or "")
+    deadline = time.monotonic() + IMAGE_FETCH_TIMEOUT
+    part = out_path.with_name(out_path.name + ".part")
+    with slot, http.stream("GET", url) as resp:
+        resp.raise_for_status()
+        length = resp.headers.get("content-length")
+        if length and length.isdigit() and int(length) > IMAGE_FETCH_MAX_BYTES:
+            raise ValueError(f"Image at {url} is {int(length)} bytes, over the {IMAGE_FETCH_MAX_BYTES} byte limit")
+        written = 0
+        try:
+            with open(part, "wb") as f:
+                for chunk in resp.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    written += len(chunk)
+                    if written > IMAGE_FETCH_MAX_BYTES:
+                        raise ValueError(f"Image at {url} exceeds the {IMAGE_FETCH_MAX_BYTES} byte limit")
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(f"Image at {url} did not download within {IMAGE_FETCH_TIMEOUT:.0f}s")
+                    f.write(chunk)
+        except BaseException:
+            part.unlink(missing_ok=True)
+            raise
+    os.replace(part, out_path)
+
+
+def _save_images(items: list, paths: list[Path]) -> list[Path]:
+    """Write each response item (b64_json or url) to its path; URL items download in parallel. Returns saved paths."""
+    saved: list[Path] = []
+    downloads: list[tuple[str, Path]] = []
+    for item, path in zip(items, paths):
+        if getattr(item, "b64_json", None):
+            with open(path, "wb") as f:
+                f.write(base64.b64decode(item.b64_json))
+            saved.append(path)
+        elif getattr(item, "url", None):
+            downloads.append((item.url, path))
+        else:
+            print("Unexpected response format", item, file=sys.stderr)
+    if downloads:
+        with ThreadPoolExecutor(max_workers=len(downloads), thread_name_prefix="image-download") as pool:
+            for (_, path), future in [(d, pool.submit(_download_image, *d)) for d in downloads]:
+                future.result()
+                saved.append(path)
+    return saved
+
+
+def _download_video(client: OpenAI, video_id: str, out_path: Path) -> None:
+    """Stream the finished MP4 to out_path in chunks (via a .part file), never holding it in memory."""
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    part = out_path.with_name(out_path.name + ".part")
+    try:
+        with client.videos.with_streaming_response.download_content(video_id) as resp:
+            with open(part, "wb") as f:
+                for chunk in resp.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+    os.replace(part, out_path)
+
+
+class VideoWatcher:
+    """
+    Polls any number of video jobs: one scheduler thread hands the jobs that are due to a pool of
+    poll_workers threads, so slow status checks overlap. Each job is polled every min_interval while its
+    status or progress changes, backing off by 1.5x (up to max_interval) while it does not, and is given
+    up after VIDEO_MAX_POLL_ERRORS failed checks in a row. Completed videos are streamed to disk on a
+    small download pool; on_done(error) fires per job.
+    """
+
+    def __init__(
+        self,
+        client: OpenAI,
+        *,
+        min_interval: float = 5,
+        max_interval: float = 30,
+        poll_workers: int = 8,
+        download_workers: int = 4,
+    ):
+        self._client = client
+        self._min = min_interval
+        self._max = max_interval
+        self._jobs: dict[str, dict] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._polls = ThreadPoolExecutor(max_workers=poll_workers, thread_name_prefix="video-poll")
+        self._downloads = ThreadPoolExecutor(max_workers=download_workers, thread_name_prefix="video-download")
+        self._thread = threading.Thread(target=self._run, name="video-poller", daemon=True)
+        self._thread.start()
+
+    def watch(self, video_id: str, out_path: Path, on_done) -> None:
+        with self._cond:
+            self._jobs[video_id] = {
+                "out_path": out_path,
+                "on_done": on_done,
+                "next_poll": time.monotonic(),
+                "interval": self._min,
+                "seen": None,
+                "polling": False,
+                "errors": 0,
+            }
+            self._cond.notify()
+
+    def close(self) -> None:
+        """Wait until every watched job has finished downloading (or failed), then stop."""
+        with self._cond:
+            while self._jobs:
+                self._cond.wait()
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self._polls.shutdown(wait=True)
+        self._downloads.shutdown(wait=True)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed:
+                    # Jobs with a status check already running are not scheduled again until it reports back.
+                    waiting = {vid: job for vid, job in self._jobs.items() if "done" not in job and not job["polling"]}
+                    due = [vid for vid, job in waiting.items() if job["next_poll"] <= time.monotonic()]
+                    if due:
+                        break
+                    upcoming = [job["next_poll"] for job in waiting.values()]
+                    self._cond.wait(timeout=min(upcoming) - time.monotonic() if upcoming else None)
+                if self._closed:
+                    return
+                for video_id in due:
+                    self._jobs[video_id]["polling"] = True
+            for video_id in due:
+                self._polls.submit(self._poll, video_id)
+
+    def _reschedule(self, job: dict) -> None:
+        with self._cond:
+            job["next_poll"] = time.monotonic() + job["interval"]
+            job["polling"] = False
+            self._cond.notify_all()  # close() waits on the same condition
+
+    def _poll(self, video_id: str) -> None:
+        job = self._jobs[video_id]
+        try:
+            video = self._client.videos.retrieve(video_id)
+        except Exception as e:
+            if isinstance(e, APIStatusError) and 400 <= e.status_code < 500 and e.status_code not in (408, 409, 429):
+                # A bad id or a job we may not see will never succeed; stop polling it.
+                job["done"] = True
+                self._finish(video_id, f"Status check failed: {e}")
+                return
+            # Transient errors (the client already retried) push the next poll back, up to a limit.
+            job["errors"] += 1
+            if job["errors"] >= VIDEO_MAX_POLL_ERRORS:
+                job["done"] = True
+                self._finish(video_id, f"Status check failed {job['errors']} times in a row: {e}")
+                return
+            print(f"  {video_id}: status check failed ({e}); retrying", file=sys.stderr)
+            self._reschedule(job)
+            return
+        job["errors"] = 0
+        status = getattr(video, "status", "unknown")
+        progress = getattr(video, "progress", None)
+        if (status, progress) != job["seen"]:
+            print(f"  {video_id}: {status}" + (f" {progress}%" if progress is not None else ""))
+            job["seen"] = (status, progress)
+            job["interval"] = self._min
+        else:
+            job["interval"] = min(job["interval"] * 1.5, self._max)
         if status == "completed":
+            job["done"] = True
+            self._downloads.submit(self._download, video_id)
+        elif status == "failed":
+            job["done"] = True
+            self._finish(video_id, f"Video job failed: {getattr(video, 'error', None)}")
+        else:
+            self._reschedule(job)
+
+    def _download(self, video_id: str) -> None:
+        out_path = self._jobs[video_id]["out_path"]
+        try:
+            _download_video(self._client, video_id, out_path)
+        except Exception as e:
+            self._finish(video_id, f"Download failed: {e}")
             return
-        if status == "failed":
-            err = getattr(job, "error", None)
-            raise RuntimeError(f"Video job failed: {err}")
-        time.sleep(poll_interval)
+        print(f"Saved: {out_path}")
+        self._finish(video_id, None)
+
+    def _finish(self, video_id: str, error: str | None) -> None:
+        with self._cond:
+            job = self._jobs.pop(video_id)
+            self._cond.notify_all()
+        job["on_done"](error)
+
+
+def _wait_and_save(client: OpenAI, video_id: str, out_path: Path, args: argparse.Namespace) -> None:
+    """Watch one job until it finishes and stream it to out_path; raises on failure."""
+    errors = []
+    watcher = VideoWatcher(
+        client,
+        min_interval=getattr(args, "poll_interval", 10),
+        max_interval=max(getattr(args, "max_poll_interval", 30), getattr(args, "poll_interval", 10)),
+        poll_workers=1,
+        download_workers=1,
+    )
+    watcher.watch(video_id, out_path, errors.append)
+    watcher.close()
+    if errors[0] is not None:
+        raise RuntimeError(errors[0])
 
 
-def cmd_generate_video(client: OpenAI, args: argparse.Namespace) -> None:
-    """Generate video from prompt; optional image reference. Polls until complete and saves."""
+def _submit_video(client: OpenAI, args: argparse.Namespace) -> str:
+    """Create a video job; returns its id."""
     kwargs = {
         "prompt": args.prompt,
         "model": getattr(args, "model", None) or "sora-2",
@@ -186,39 +398,208 @@ def cmd_generate_video(client: OpenAI, args: argparse.Namespace) -> None:
     finally:
         if kwargs.get("input_reference"):
             kwargs["input_reference"].close()
+    print(f"Video job created: {job.id}")
+    return job.id
+
 
-    video_id = job.id
-    print(f"Video job created: {video_id}")
+def _submit_remix(client: OpenAI, args: argparse.Namespace) -> str:
+    """Create a remix job; returns its id."""
+    job = client.videos.remix(args.video_id, prompt=args.prompt)
+    print(f"Remix job created: {job.id}")
+    return job.id
 
+
+def cmd_generate_video(client: OpenAI, args: argparse.Namespace) -> None:
+    """Generate video from prompt; optional image reference. Polls until complete and saves."""
+    video_id = _submit_video(client, args)
     if not args.no_wait:
-        _poll_video_until_done(client, video_id, poll_interval=getattr(args, "poll_interval", 10))
-        out_path = Path(args.output or "output_video.mp4")
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        resp = client.videos.download_content(video_id)
-        content = resp.read()
-        with open(out_path, "wb") as f:
-            f.write(content)
-        print(f"Saved: {out_path}")
+        _wait_and_save(client, video_id, Path(args.output or "output_video.mp4"), args)
     else:
         print("Skipping wait. To download later: use remix or call videos.download_content with this id.")
 
 
 def cmd_remix_video(client: OpenAI, args: argparse.Namespace) -> None:
     """Remix an existing video with a new prompt. Polls until complete and saves."""
-    video_id = args.video_id
-    job = client.videos.remix(video_id, prompt=args.prompt)
-    new_id = job.id
-    print(f"Remix job created: {new_id}")
-
+    new_id = _submit_remix(client, args)
     if not args.no_wait:
-        _poll_video_until_done(client, new_id, poll_interval=getattr(args, "poll_interval", 10))
-        out_path = Path(args.output or "output_remix.mp4")
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        resp = client.videos.download_content(new_id)
-        content = resp.read()
-        with open(out_path, "wb") as f:
-            f.write(content)
-        print(f"Saved: {out_path}")
+        _wait_and_save(client, new_id, Path(args.output or "output_remix.mp4"), args)
+
+# --- batch ---
+
+BATCH_COMMANDS = {
+    "generate-image": (cmd_generate_image, ".png"),
+    "edit-image": (cmd_edit_image, ".png"),
+    "generate-video": (cmd_generate_video, ".mp4"),
+    "remix-video": (cmd_remix_video, ".mp4"),
+}
+# Video ops are submitted by the batch workers and then waited on together by one VideoWatcher.
+BATCH_VIDEO_SUBMITTERS = {"generate-video": _submit_video, "remix-video": _submit_remix}
+# Per-operation defaults, matching the single-command flags.
+BATCH_DEFAULTS = {
+    "model": None,
+    "size": None,
+    "quality": None,
+    "n": 1,
+    "style": None,
+    "output_format": None,
+    "images": None,
+    "image": None,
+    "seconds": None,
+    "input_reference": None,
+    "video_id": None,
+    "no_wait": False,
+}
+
+
+class RateLimiter:
+    """Spaces call starts evenly at `per_minute` across all threads (0 disables)."""
+
+    def __init__(self, per_minute: float) -> None:
+        self._interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self._interval
+        time.sleep(max(0.0, start - now))
+
+
+def _read_manifest(path: Path) -> list[dict]:
+    """Load manifest items from JSONL (one object per line) or CSV (header row); assigns ids where missing."""
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="") as f:
+            rows = [{k: v for k, v in row.items() if v not in (None, "")} for row in csv.DictReader(f)]
+        for row in rows:
+            if "images" in row:
+                row["images"] = row["images"].split(";")
+            if "n" in row:
+                row["n"] = int(row["n"])
+    else:
+        with open(path) as f:
+            rows = [json.loads(line) for line in f if line.strip() and not line.lstrip().startswith("#")]
+    for i, row in enumerate(rows):
+        row["id"] = str(row.get("id") or f"item-{i + 1}")
+        if row.get("op") not in BATCH_COMMANDS:
+            raise ValueError(f"{row['id']}: op must be one of {', '.join(BATCH_COMMANDS)}")
+        if not row.get("prompt"):
+            raise ValueError(f"{row['id']}: prompt is required")
+    ids = [row["id"] for row in rows]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Manifest item ids must be unique")
+    return rows
+
+
+def _read_checkpoint(path: Path) -> set[str]:
+    if not path.is_file():
+        return set()
+    with open(path) as f:
+        return {json.loads(line)["id"] for line in f if line.strip()}
+
+
+def _run_item(client: OpenAI, item: dict, out_dir: Path, limiter: RateLimiter, watcher: VideoWatcher, report) -> None:
+    """
+    Run one manifest item and pass its result dict to report(); never raises. Video items only
+    submit here and are handed to the shared watcher, so they do not hold a worker while rendering.
+    """
+    handler, suffix = BATCH_COMMANDS[item["op"]]
+    fields = {**BATCH_DEFAULTS, **{k: v for k, v in item.items() if k not in ("id", "op")}}
+    fields["output"] = fields.get("output") or str(out_dir / f"{item['id']}{suffix}")
+    args = argparse.Namespace(**fields)
+    limiter.wait()
+    start = time.perf_counter()
+
+    def finish(error: str | None) -> None:
+        report({
+            "id": item["id"],
+            "op": item["op"],
+            "status": "error" if error else "ok",
+            "seconds": round(time.perf_counter() - start, 3),
+            "output": None if error else fields["output"],
+            "error": error,
+        })
+
+    try:
+        if item["op"] in BATCH_VIDEO_SUBMITTERS:
+            video_id = BATCH_VIDEO_SUBMITTERS[item["op"]](client, args)
+            if not args.no_wait:
+                watcher.watch(video_id, Path(fields["output"]), finish)
+                return
+        else:
+            handler(client, args)
+    except SystemExit:
+        finish("aborted; see the message printed above")
+        return
+    except Exception as e:
+        finish(str(e) or type(e).__name__)
+        return
+    finish(None)
+
+
+def cmd_batch(client: OpenAI, args: argparse.Namespace) -> None:
+    """Run every manifest item with bounded concurrency; finished ids go to the checkpoint so reruns skip them."""
+    manifest = Path(args.manifest)
+    try:
+        items = _read_manifest(manifest)
+    except (OSError, ValueError) as e:
+        print(f"Invalid manifest: {e}", file=sys.stderr)
+        sys.exit(1)
+    checkpoint = Path(args.checkpoint or f"{manifest}.checkpoint.jsonl")
+    report_path = Path(args.report or f"{manifest}.results.jsonl")
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    done = _read_checkpoint(checkpoint)
+    pending = [item for item in items if item["id"] not in done]
+    print(f"{len(items)} items, {len(items) - len(pending)} already done, running {len(pending)} "
+          f"with concurrency {args.concurrency}")
+
+    limiter = RateLimiter(args.rpm)
+    finished: queue.Queue = queue.Queue()
+    results = []
+    start = time.perf_counter()
+    watcher = VideoWatcher(client, min_interval=args.poll_interval, max_interval=args.max_poll_interval)
+    with open(checkpoint, "a") as ckpt, ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for item in pending:
+            pool.submit(_run_item, client, item, out_dir, limiter, watcher, finished.put)
+        while len(results) < len(pending):
+            result = finished.get()
+            results.append(result)
+            if result["status"] == "ok":
+                ckpt.write(json.dumps({"id": result["id"]}) + "\n")
+                ckpt.flush()
+            print(f"[{len(results)}/{len(pending)}] {result['id']} {result['status']} "
+                  f"{result['seconds']}s{' ' + result['error'] if result['error'] else ''}")
+    watcher.close()
+
+    skipped = [
+        {"id": item["id"], "op": item["op"], "status": "skipped", "seconds": 0.0, "output": None, "error": None}
+        for item in items
+        if item["id"] in done
+    ]
+    _write_report(report_path, skipped + results)
+    failed = sum(1 for r in results if r["status"] != "ok")
+    print(f"Done in {time.perf_counter() - start:.1f}s: {len(results) - failed} ok, {failed} failed. Report: {report_path}")
+    if failed:
+        sys.exit(2)
+
+
+def _write_report(path: Path, results: list[dict]) -> None:
+    """Per-item results as JSONL, or CSV when the path ends in .csv."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() == ".csv":
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["id", "op", "status", "seconds", "output", "error"])
+            writer.writeheader()
+            writer.writerows(results)
+        return
+    with open(path, "w") as f:
+        for result in results:
+            f.write(json.dumps(result) + "\n")
 
 
 def main():
@@ -239,6 +620,9 @@ Examples:
 
   # Remix a video
   python openai_media.py remix-video --video-id video_xxx --prompt "Extend with the cat taking a bow" --output remix.mp4
+
+  # Batch: run a manifest (JSONL or CSV, one operation per item) 8 at a time, at most 50 calls/min
+  python openai_media.py batch --manifest assets.jsonl --concurrency 8 --rpm 50 --out-dir out/
 """
     )
     parser.add_argument("--api-key", default=os.environ.get("OPENAI_API_KEY") or os.environ.get("API_KEY"), help="OpenAI API key (or set OPENAI_API_KEY / API_KEY, or use .env)")
@@ -271,7 +655,8 @@ Examples:
     p_vid.add_argument("--input-reference", "-r", help="Optional image file to guide generation")
     p_vid.add_argument("--output", "-o", help="Output path (default: output_video.mp4)")
     p_vid.add_argument("--no-wait", action="store_true", help="Do not wait for completion; only print job id")
-    p_vid.add_argument("--poll-interval", type=int, default=10, help="Seconds between status polls (default: 10)")
+    p_vid.add_argument("--poll-interval", type=float, default=10, help="Seconds between status polls while the job changes (default: 10)")
+    p_vid.add_argument("--max-poll-interval", type=float, default=30, help="Poll interval ceiling while nothing changes (default: 30)")
 
     # --- remix-video ---
     p_remix = sub.add_parser("remix-video", help="Remix an existing video with a new prompt")
@@ -279,12 +664,25 @@ Examples:
     p_remix.add_argument("--prompt", "-p", required=True, help="New prompt for the remix")
     p_remix.add_argument("--output", "-o", help="Output path (default: output_remix.mp4)")
     p_remix.add_argument("--no-wait", action="store_true", help="Do not wait for completion")
-    p_remix.add_argument("--poll-interval", type=int, default=10, help="Seconds between status polls")
+    p_remix.add_argument("--poll-interval", type=float, default=10, help="Seconds between status polls while the job changes")
+    p_remix.add_argument("--max-poll-interval", type=float, default=30, help="Poll interval ceiling while nothing changes")
+
+    # --- batch ---
+    p_batch = sub.add_parser("batch", help="Run a JSONL/CSV manifest of operations concurrently; reruns skip finished items")
+    p_batch.add_argument("--manifest", "-f", required=True, help="JSONL objects or CSV rows with op, prompt and the command's options (id optional)")
+    p_batch.add_argument("--concurrency", "-c", type=int, default=4, help="Items in flight at once (default: 4)")
+    p_batch.add_argument("--rpm", type=float, default=0, help="Max item starts per minute across all workers (default: unlimited)")
+    p_batch.add_argument("--out-dir", default="batch_output", help="Directory for items without an output path (default: batch_output)")
+    p_batch.add_argument("--checkpoint", help="Finished-id file (default: <manifest>.checkpoint.jsonl)")
+    p_batch.add_argument("--report", help="Per-item results, .jsonl or .csv (default: <manifest>.results.jsonl)")
+    p_batch.add_argument("--poll-interval", type=float, default=5, help="Video status poll interval while jobs change (default: 5)")
+    p_batch.add_argument("--max-poll-interval", type=float, default=30, help="Video poll interval ceiling (default: 30)")
+    p_batch.add_argument("--max-retries", type=int, default=5, help="Client retries on 429/5xx per call (default: 5)")
 
     args = parser.parse_args()
     if args.api_key:
         os.environ["OPENAI_API_KEY"] = args.api_key
-    client = get_client()
+    client = get_client(getattr(args, "max_retries", None))
 
     if args.command == "generate-image":
         cmd_generate_image(client, args)
@@ -294,6 +692,8 @@ Examples:
         cmd_generate_video(client, args)
     elif args.command == "remix-video":
         cmd_remix_video(client, args)
+    elif args.command == "batch":
+        cmd_batch(client, args)
     else:
         parser.print_help()
         sys.exit(1)